@@ -0,0 +1,66 @@
+"""
+Throughput of the asyncio facades with many concurrent clients.
+
+Run from the project root:
+    python -m benchmarks.bench_async [--clients 1000] [--workers 1,4,16,64]
+
+Each client is a coroutine that deposits into its own account through one
+AsyncBankService on a CachedPersistenceLayer with a group-commit write-ahead
+log. The executor size bounds how many deposits are in flight; commits that
+wait together share an fsync. "sequential" awaits the same deposits one at a
+time, as a single client would.
+"""
+import argparse
+import asyncio
+import shutil
+import tempfile
+import time
+
+from src.services.async_services import AsyncBankService
+from src.services.auth_service import AuthService
+from src.utils.cached_persistence import CachedPersistenceLayer
+
+def bench(clients: int, workers: int, sequential: bool = False) -> float:
+    data_dir = tempfile.mkdtemp(prefix="bench_async_")
+    try:
+        persistence = CachedPersistenceLayer(data_dir, flush_interval=1.0, ledger_format="jsonl", durability="batch")
+        user = AuthService(persistence).register("bench", "Password123", "b@test.com", "1234567890")
+        bank = AsyncBankService(persistence, max_workers=workers)
+        account_ids = [bank.service.create_account(user, "CURRENT", 0.0).account_id for _ in range(clients)]
+
+        async def run():
+            if sequential:
+                for account_id in account_ids:
+                    await bank.deposit(account_id, 1.0)
+            else:
+                await asyncio.gather(*[bank.deposit(account_id, 1.0) for account_id in account_ids])
+
+        start = time.perf_counter()
+        asyncio.run(run())
+        elapsed = time.perf_counter() - start
+        bank.close()
+        persistence.close()
+        return clients / elapsed
+    finally:
+        shutil.rmtree(data_dir)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--workers", default="1,4,16,64")
+    args = parser.parse_args()
+
+    # BankService writes audit lines to data/audit.log; send them somewhere disposable.
+    audit_dir = tempfile.mkdtemp(prefix="bench_async_audit_")
+    import src.services.audit_service as audit_module
+    audit_module.AuditService.__init__.__defaults__ = (f"{audit_dir}/audit.log",)
+
+    print(f"Deposits per second ({args.clients} concurrent clients)")
+    print(f"  {'workers':>10} {'deposits/s':>12}")
+    print(f"  {'sequential':>10} {bench(args.clients, 1, sequential=True):>12.0f}")
+    for workers in (int(n) for n in args.workers.split(",")):
+        print(f"  {workers:>10} {bench(args.clients, workers):>12.0f}")
+    shutil.rmtree(audit_dir)
+
+if __name__ == "__main__":
+    main()
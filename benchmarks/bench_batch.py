@@ -0,0 +1,68 @@
+"""
+Payroll throughput: one BankService.transfer() per payment against a single
+execute_batch() call.
+
+Run from the project root:
+    python -m benchmarks.bench_batch [--payments 2000] [--employees 500]
+
+One employer account pays `--payments` salaries spread over `--employees`
+accounts, on a PersistenceLayer with a JSON-Lines ledger.
+"""
+import argparse
+import contextlib
+import io
+import shutil
+import tempfile
+import time
+
+from src.services.auth_service import AuthService
+from src.services.bank_service import BankService
+from src.utils.persistence import PersistenceLayer
+
+def setup(data_dir: str, employees: int):
+    persistence = PersistenceLayer(data_dir, ledger_format="jsonl", codec="fast")
+    bank = BankService(persistence)
+    user = AuthService(persistence).register("employer", "Password123", "e@test.com", "1234567890")
+    payroll = bank.create_account(user, "CURRENT", 10_000_000.0).account_id
+    with persistence.unit_of_work():
+        staff = [bank.create_account(user, "CURRENT", 0.0).account_id for _ in range(employees)]
+    return persistence, bank, payroll, staff
+
+def bench(payments: int, employees: int, batched: bool) -> float:
+    data_dir = tempfile.mkdtemp(prefix="bench_batch_")
+    try:
+        persistence, bank, payroll, staff = setup(data_dir, employees)
+        rows = [{"from_account_id": payroll, "to_account_id": staff[i % employees], "amount": 100.0 + i % 7}
+                for i in range(payments)]
+        start = time.perf_counter()
+        if batched:
+            report = bank.execute_batch(rows)
+            assert report.failed == 0
+        else:
+            with contextlib.redirect_stdout(io.StringIO()):
+                for row in rows:
+                    bank.transfer(row["from_account_id"], row["to_account_id"], row["amount"])
+        elapsed = time.perf_counter() - start
+        persistence.close()
+        return payments / elapsed
+    finally:
+        shutil.rmtree(data_dir)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payments", type=int, default=2000)
+    parser.add_argument("--employees", type=int, default=500)
+    args = parser.parse_args()
+
+    # BankService writes audit lines to data/audit.log; send them somewhere disposable.
+    audit_dir = tempfile.mkdtemp(prefix="bench_batch_audit_")
+    import src.services.audit_service as audit_module
+    audit_module.AuditService.__init__.__defaults__ = (f"{audit_dir}/audit.log",)
+
+    print(f"Payments per second ({args.payments} payments to {args.employees} accounts)")
+    print(f"  {'transfer() per row':<20} {bench(args.payments, args.employees, False):>10.0f}")
+    print(f"  {'execute_batch()':<20} {bench(args.payments, args.employees, True):>10.0f}")
+    shutil.rmtree(audit_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Size and speed of the persistence codecs.
+
+Run from the project root:
+    python -m benchmarks.bench_codecs [--accounts 50000]
+
+Encodes and decodes an accounts.json-shaped collection with every codec
+available here.
+"""
+import argparse
+import time
+import uuid
+
+from src.utils import json_codecs
+
+def make_accounts(count: int):
+    accounts = {}
+    for i in range(count):
+        account_id = str(uuid.uuid4())
+        accounts[account_id] = {
+            "account_id": account_id,
+            "user_id": str(uuid.uuid4()),
+            "account_type": "SAVINGS",
+            "balance": i * 1.25,
+            "created_at": "2024-01-01T10:00:00.000000",
+            "interest_rate": 0.04,
+        }
+    return accounts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=50000)
+    args = parser.parse_args()
+
+    accounts = make_accounts(args.accounts)
+    names = ["pretty", "compact"] + (["orjson"] if json_codecs.orjson is not None else [])
+    print(f"{args.accounts} accounts")
+    print(f"  {'codec':<8} {'size (KB)':>10} {'encode ms':>10} {'decode ms':>10}")
+    for name in names:
+        codec = json_codecs.get_codec(name)
+        start = time.perf_counter()
+        payload = codec.dumps(accounts)
+        encoded = time.perf_counter()
+        json_codecs.loads(payload)
+        decoded = time.perf_counter()
+        print(f"  {name:<8} {len(payload) / 1024:>10.0f} {(encoded - start) * 1000:>10.1f} {(decoded - encoded) * 1000:>10.1f}")
+
+if __name__ == "__main__":
+    main()
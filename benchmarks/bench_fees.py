@@ -0,0 +1,76 @@
+"""
+Cost of assessing fees on every current account.
+
+Run from the project root:
+    python -m benchmarks.bench_fees [--accounts 100000]
+
+"per-account loop" charges each account the way single operations do: one
+Account object, save_account() and log_transaction() per charge, inside one
+unit of work. "engine" is FeeEngine.apply(): one load of all accounts, one
+assessment pass (vectorized when NumPy is installed), and bulk writes.
+"""
+import argparse
+import shutil
+import tempfile
+import time
+import uuid
+
+from src.models.account import Account
+from src.models.transaction import Transaction, TransactionType
+from src.services.fee_engine import FeeEngine, np
+from src.services.interest_engine import DAYS_PER_YEAR
+from src.utils.persistence import PersistenceLayer
+
+def baseline(persistence, period_days: int = 30):
+    engine = FeeEngine(persistence)
+    with persistence.unit_of_work():
+        for acc_data in persistence.get_all_accounts():
+            if acc_data["account_type"] != "CURRENT":
+                continue
+            acc = Account.from_dict(acc_data)
+            charges = []
+            if acc.balance < 0:
+                charges.append((-acc.balance * engine.overdraft_rate * period_days / DAYS_PER_YEAR,
+                                f"Overdraft Interest ({period_days} days)"))
+            if acc.balance < engine.waiver_balance:
+                charges.append((engine.maintenance_fee, "Maintenance Fee"))
+            for amount, description in charges:
+                acc.balance -= amount
+                persistence.log_transaction(Transaction(
+                    str(uuid.uuid4()), acc.account_id, amount, TransactionType.FEE,
+                    description=description).to_dict())
+            if charges:
+                persistence.save_account(acc.to_dict())
+
+def populate(persistence, count: int):
+    accounts = [{"account_id": str(uuid.uuid4()), "user_id": "bench", "balance": float(i % 3000 - 1000),
+                 "created_at": "2024-01-01T00:00:00", "is_active": True, "account_type": "CURRENT",
+                 "overdraft_limit": 1000.0}
+                for i in range(count)]
+    persistence.save_accounts(accounts)
+
+def bench(count: int, run) -> float:
+    data_dir = tempfile.mkdtemp(prefix="bench_fees_")
+    try:
+        persistence = PersistenceLayer(data_dir, ledger_format="jsonl", codec="fast")
+        populate(persistence, count)
+        start = time.perf_counter()
+        run(persistence)
+        elapsed = time.perf_counter() - start
+        persistence.close()
+        return elapsed * 1000
+    finally:
+        shutil.rmtree(data_dir)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{args.accounts} current accounts "
+          f"(NumPy {'available' if np is not None else 'not installed'}; times in ms)")
+    print(f"  per-account loop {bench(args.accounts, baseline):>10.1f}")
+    print(f"  engine           {bench(args.accounts, lambda p: FeeEngine(p).apply()):>10.1f}")
+
+if __name__ == "__main__":
+    main()
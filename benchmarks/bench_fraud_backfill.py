@@ -0,0 +1,83 @@
+"""
+Throughput of re-scoring a whole ledger with the fraud rules.
+
+Run from the project root:
+    python -m benchmarks.bench_fraud_backfill [--rows 200000] [--accounts 2000] [--workers 1,2,4]
+
+"one at a time" is what re-scoring looked like before: read every row,
+build a Transaction, run FraudDetectionService.evaluate() and save each flag
+with save_fraud_flag(). "backfill" is FraudBackfillService.run(): ledger
+segments scored by a process pool, the velocity rule in one ordered pass,
+and the new flags written in bulk. The ledger is a JSON-Lines file.
+"""
+import argparse
+import random
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from src.models.transaction import Transaction
+from src.services.fraud_backfill import FraudBackfillService
+from src.services.fraud_service import FraudDetectionService
+from src.utils.persistence import PersistenceLayer
+
+def make_rows(account_ids, count, start):
+    rows = []
+    for n in range(count):
+        amount = 20000.0 if random.random() < 0.001 else round(random.uniform(1, 500), 2)
+        rows.append({"transaction_id": str(uuid.uuid4()), "account_id": random.choice(account_ids), "amount": amount,
+                     "transaction_type": random.choice(("DEPOSIT", "WITHDRAWAL")),
+                     "timestamp": (start + timedelta(seconds=n)).isoformat(),
+                     "description": "crypto" if random.random() < 0.001 else "Deposit",
+                     "related_account_id": None})
+    return rows
+
+def baseline(persistence):
+    fraud = FraudDetectionService(persistence)
+    fraud.velocity.warmed = True  # scoring from the start of the ledger
+    flags = 0
+    for record in persistence.get_all_transactions():
+        transaction = Transaction.from_dict(record)
+        reasons = fraud.evaluate(transaction)
+        if reasons:
+            persistence.save_fraud_flag(fraud.flag_record(transaction, reasons))
+            flags += 1
+    return flags
+
+def bench(rows, run) -> float:
+    data_dir = tempfile.mkdtemp(prefix="bench_backfill_")
+    try:
+        persistence = PersistenceLayer(data_dir, ledger_format="jsonl", codec="fast")
+        persistence.ledger.append_many(rows)
+        start = time.perf_counter()
+        flags = run(persistence)
+        elapsed = time.perf_counter() - start
+        persistence.close()
+        return elapsed, flags
+    finally:
+        shutil.rmtree(data_dir)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--accounts", type=int, default=2000)
+    parser.add_argument("--workers", default="1,2,4")
+    args = parser.parse_args()
+
+    random.seed(7)
+    account_ids = [str(uuid.uuid4()) for _ in range(args.accounts)]
+    rows = make_rows(account_ids, args.rows, datetime(2024, 1, 1))
+
+    print(f"{args.rows} ledger rows over {args.accounts} accounts")
+    elapsed, flags = bench(rows, baseline)
+    print(f"  one at a time        {elapsed:>7.2f}s {args.rows / elapsed:>10,.0f} tx/sec  {flags} flags")
+    for workers in (int(n) for n in args.workers.split(",")):
+        def run(persistence):
+            return FraudBackfillService(persistence, workers=workers).run().new_flags
+        elapsed, flags = bench(rows, run)
+        print(f"  backfill, {workers} worker(s) {elapsed:>7.2f}s {args.rows / elapsed:>10,.0f} tx/sec  {flags} flags")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Deposit latency with fraud checks inline and on the background pipeline.
+
+Run from the project root:
+    python -m benchmarks.bench_fraud_pipeline [--deposits 2000] [--rule-ms 0,1,5]
+
+--rule-ms makes every fraud check wait that long, standing in for rules that
+look things up (a remote score, a database). "inline" runs the checks inside
+each deposit's unit of work, as before; "pipeline" hands them to
+BankService.start_fraud_pipeline(), and its drain time (waiting for the
+queue to empty) is reported separately. Deposits go round-robin to 100
+accounts, and every 50th is large enough to be flagged.
+"""
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+
+import src.services.audit_service as audit_module
+from src.services.auth_service import AuthService
+from src.services.bank_service import BankService
+
+def bench(deposits: int, rule_ms: float, pipeline: bool):
+    data_dir = tempfile.mkdtemp(prefix="bench_fraud_")
+    defaults = audit_module.AuditService.__init__.__defaults__
+    audit_module.AuditService.__init__.__defaults__ = (f"{data_dir}/audit.log",)
+    try:
+        from src.utils.persistence import PersistenceLayer
+        persistence = PersistenceLayer(data_dir, ledger_format="jsonl", codec="fast")
+        bank = BankService(persistence)
+        evaluate = bank.fraud_service.evaluate
+        def costly_evaluate(transaction):
+            time.sleep(rule_ms / 1000)
+            return evaluate(transaction)
+        bank.fraud_service.evaluate = costly_evaluate
+        if pipeline:
+            bank.start_fraud_pipeline(sync_threshold=float("inf"))
+        user = AuthService(persistence).register("bench", "Password123", "b@test.com", "1234567890")
+        account_ids = [bank.create_account(user, "SAVINGS", 0.0).account_id for _ in range(100)]
+
+        latencies = []
+        for n in range(deposits):
+            start = time.perf_counter()
+            bank.deposit(account_ids[n % 100], 20000.0 if n % 50 == 0 else 1.0)
+            latencies.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        bank.close()
+        drain = (time.perf_counter() - start) * 1000
+        flags = len(persistence.get_fraud_flags())
+        persistence.close()
+        latencies.sort()
+        return statistics.mean(latencies), latencies[int(len(latencies) * 0.99)], drain, flags
+    finally:
+        audit_module.AuditService.__init__.__defaults__ = defaults
+        shutil.rmtree(data_dir)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--deposits", type=int, default=2000)
+    parser.add_argument("--rule-ms", default="0,1,5")
+    args = parser.parse_args()
+
+    print(f"{args.deposits} deposits (latency in ms)")
+    print(f"  {'rule ms':>7} {'mode':<9} {'mean':>8} {'p99':>8} {'drain':>9} {'flags':>6}")
+    for rule_ms in (float(v) for v in args.rule_ms.split(",")):
+        for mode in ("inline", "pipeline"):
+            mean, p99, drain, flags = bench(args.deposits, rule_ms, mode == "pipeline")
+            print(f"  {rule_ms:>7g} {mode:<9} {mean:>8.3f} {p99:>8.3f} {drain:>9.1f} {flags:>6}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Cost of applying interest to every savings account.
+
+Run from the project root:
+    python -m benchmarks.bench_interest [--users 2000] [--accounts-per-user 2]
+
+"per-user loop" is the original calculate_interest(): one accounts lookup per
+user and one save_account()/log_transaction() per account, inside a single
+unit of work. "engine" is InterestEngine.apply(): one load of all accounts, one
+interest pass (vectorized if NumPy is installed), and bulk writes.
+"""
+import argparse
+import shutil
+import tempfile
+import time
+import uuid
+
+from src.models.account import Account
+from src.models.transaction import Transaction, TransactionType
+from src.services.interest_engine import InterestEngine, np
+from src.utils.persistence import PersistenceLayer
+
+def baseline(persistence):
+    count = 0
+    with persistence.unit_of_work():
+        for user_data in persistence.get_all_users():
+            for acc_data in persistence.get_accounts_for_user(user_data["user_id"]):
+                if acc_data["account_type"] == "SAVINGS":
+                    acc = Account.from_dict(acc_data)
+                    interest = acc.balance * acc.interest_rate
+                    if interest > 0:
+                        acc.deposit(interest)
+                        persistence.save_account(acc.to_dict())
+                        persistence.log_transaction(Transaction(
+                            str(uuid.uuid4()), acc.account_id, interest, TransactionType.INTEREST,
+                            description="Annual Interest Applied").to_dict())
+                        count += 1
+    return count
+
+def populate(persistence, users: int, per_user: int):
+    accounts = []
+    with persistence.unit_of_work():
+        for i in range(users):
+            user_id = str(uuid.uuid4())
+            persistence.save_user({"user_id": user_id, "username": f"user{i}", "password_hash": "x",
+                                   "email": f"u{i}@test.com", "phone": "1234567890", "is_admin": False,
+                                   "created_at": "2024-01-01T00:00:00", "accounts": []})
+            for _ in range(per_user):
+                accounts.append({"account_id": str(uuid.uuid4()), "user_id": user_id, "balance": 1000.0,
+                                 "created_at": "2024-01-01T00:00:00", "is_active": True,
+                                 "account_type": "SAVINGS"})
+        persistence.save_accounts(accounts)
+
+def bench(users: int, per_user: int, run) -> float:
+    data_dir = tempfile.mkdtemp(prefix="bench_interest_")
+    try:
+        persistence = PersistenceLayer(data_dir, ledger_format="jsonl", codec="fast")
+        populate(persistence, users, per_user)
+        start = time.perf_counter()
+        run(persistence)
+        elapsed = time.perf_counter() - start
+        persistence.close()
+        return elapsed * 1000
+    finally:
+        shutil.rmtree(data_dir)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--accounts-per-user", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{args.users} users x {args.accounts_per_user} savings accounts "
+          f"(NumPy {'available' if np is not None else 'not installed'}; times in ms)")
+    print(f"  per-user loop {bench(args.users, args.accounts_per_user, baseline):>10.1f}")
+    print(f"  engine        {bench(args.users, args.accounts_per_user, lambda p: InterestEngine(p).apply()):>10.1f}")
+
+if __name__ == "__main__":
+    main()
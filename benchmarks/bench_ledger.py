@@ -0,0 +1,69 @@
+"""
+Read cost of the ledger formats.
+
+Run from the project root:
+    python -m benchmarks.bench_ledger [--rows 200000] [--accounts 1000]
+
+Fills each ledger with the same random transactions, then times a cold
+per-account lookup (fresh layer, as in a new process), a warm one, and a full
+read of every record.
+"""
+import argparse
+import random
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from src.utils.persistence import PersistenceLayer
+
+def make_transactions(rows: int, accounts: int):
+    account_ids = [str(uuid.uuid4()) for _ in range(accounts)]
+    start = datetime(2024, 1, 1)
+    transactions = []
+    for i in range(rows):
+        transactions.append({
+            "transaction_id": str(uuid.uuid4()),
+            "account_id": random.choice(account_ids),
+            "amount": round(random.uniform(1, 500), 2),
+            "transaction_type": "DEPOSIT",
+            "timestamp": (start + timedelta(seconds=i)).isoformat(),
+            "description": "Deposit",
+            "related_account_id": None
+        })
+    return account_ids, transactions
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--accounts", type=int, default=1000)
+    args = parser.parse_args()
+
+    account_ids, transactions = make_transactions(args.rows, args.accounts)
+    target = account_ids[0]
+    print(f"{args.rows} transactions over {args.accounts} accounts (times in ms)")
+    print(f"  {'format':<8} {'cold lookup':>12} {'warm lookup':>12} {'read all':>10}")
+    for ledger_format in ("json", "jsonl", "binary"):
+        data_dir = tempfile.mkdtemp(prefix="bench_ledger_")
+        try:
+            writer = PersistenceLayer(data_dir, ledger_format=ledger_format)
+            writer.ledger.append_many(transactions)
+            writer.close()
+
+            reader = PersistenceLayer(data_dir, ledger_format=ledger_format)
+            cold = timed(lambda: reader.get_transactions_for_account(target))
+            warm = timed(lambda: reader.get_transactions_for_account(target))
+            full = timed(reader.get_all_transactions)
+            reader.close()
+            print(f"  {ledger_format:<8} {cold:>12.1f} {warm:>12.1f} {full:>10.1f}")
+        finally:
+            shutil.rmtree(data_dir)
+
+if __name__ == "__main__":
+    main()
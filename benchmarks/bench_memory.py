@@ -0,0 +1,56 @@
+"""
+Memory held by a transaction history in each in-memory representation.
+
+Run from the project root:
+    python -m benchmarks.bench_memory [--rows 1000000] [--accounts 1000]
+
+Builds the same random history as a list of dicts (what the persistence
+layers return), a list of Transaction objects, and a TransactionBatch, and
+reports the memory each one keeps alive, measured with tracemalloc.
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from benchmarks.bench_ledger import make_transactions
+from src.models.transaction import Transaction
+from src.models.transaction_batch import TransactionBatch
+from src.utils.json_codecs import dumps_line, loads
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size / (1024 * 1024), elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--accounts", type=int, default=1000)
+    args = parser.parse_args()
+
+    _, transactions = make_transactions(args.rows, args.accounts)
+    # Stored as JSON lines, so each representation is built from freshly
+    # parsed records and owns all of its strings.
+    lines = [dumps_line(t) for t in transactions]
+    del transactions
+
+    print(f"{args.rows} transactions over {args.accounts} accounts")
+    print(f"  {'representation':<20} {'MiB':>10} {'build s':>10}")
+    builders = (
+        ("dicts", lambda: [loads(line) for line in lines]),
+        ("Transaction objects", lambda: [Transaction.from_dict(loads(line)) for line in lines]),
+        ("TransactionBatch", lambda: TransactionBatch(loads(line) for line in lines)),
+    )
+    for name, build in builders:
+        size, elapsed = measure(build)
+        print(f"  {name:<20} {size:>10.1f} {elapsed:>10.2f}")
+
+if __name__ == "__main__":
+    main()
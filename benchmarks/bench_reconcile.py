@@ -0,0 +1,92 @@
+"""
+Reconciliation time over a large ledger.
+
+Run from the project root:
+    python -m benchmarks.bench_reconcile [--rows 1000000] [--accounts 10000] [--workers 1,2,4] [--format jsonl]
+
+Writes a consistent ledger (deposits plus paired transfer legs) and matching
+account balances, then times a full reconcile() for each worker count, and an
+incremental run after 1000 more rows are appended.
+"""
+import argparse
+import random
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from src.models.transaction import signed_amount
+from src.services.reconciliation_service import ReconciliationService
+from src.utils.persistence import PersistenceLayer
+
+def make_rows(account_ids, count, start):
+    rows = []
+    while len(rows) < count:
+        when = (start + timedelta(seconds=len(rows))).isoformat()
+        source, target = random.sample(account_ids, 2)
+        amount = round(random.uniform(1, 500), 2)
+        if random.random() < 0.5:
+            rows.append({"transaction_id": str(uuid.uuid4()), "account_id": source, "amount": amount,
+                         "transaction_type": "DEPOSIT", "timestamp": when, "description": "Deposit",
+                         "related_account_id": None})
+        else:
+            rows.append({"transaction_id": str(uuid.uuid4()), "account_id": source, "amount": amount,
+                         "transaction_type": "TRANSFER", "timestamp": when,
+                         "description": f"Transfer to {target}", "related_account_id": target})
+            rows.append({"transaction_id": str(uuid.uuid4()), "account_id": target, "amount": amount,
+                         "transaction_type": "TRANSFER", "timestamp": when,
+                         "description": f"Transfer from {source}", "related_account_id": source})
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--accounts", type=int, default=10000)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--format", default="jsonl", choices=["jsonl", "partitioned", "binary"])
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="bench_reconcile_")
+    try:
+        persistence = PersistenceLayer(data_dir, ledger_format=args.format, codec="fast")
+        user_id = str(uuid.uuid4())
+        account_ids = [str(uuid.uuid4()) for _ in range(args.accounts)]
+        balances = dict.fromkeys(account_ids, 0.0)
+        start = datetime(2024, 1, 1)
+        for offset in range(0, args.rows, 100000):
+            rows = make_rows(account_ids, min(100000, args.rows - offset), start + timedelta(seconds=offset))
+            for row in rows:
+                balances[row["account_id"]] += signed_amount(row)
+            persistence.ledger.append_many(rows)
+        persistence.save_user({"user_id": user_id, "username": "bench", "password_hash": "x",
+                               "email": "b@test.com", "phone": "1234567890", "is_admin": False,
+                               "created_at": start.isoformat(), "accounts": account_ids})
+        persistence.save_accounts([{"account_id": a, "user_id": user_id, "balance": b,
+                                    "created_at": start.isoformat(), "is_active": True,
+                                    "account_type": "CURRENT"} for a, b in balances.items()])
+
+        print(f"{args.rows} {args.format} ledger rows over {args.accounts} accounts (times in s)")
+        for workers in (int(n) for n in args.workers.split(",")):
+            service = ReconciliationService(persistence, workers=workers)
+            began = time.perf_counter()
+            report = service.reconcile(incremental=False)
+            elapsed = time.perf_counter() - began
+            print(f"  full, {workers} worker(s) {elapsed:>10.2f}  ({len(report.issues)} issues)")
+
+        extra = make_rows(account_ids, 1000, start + timedelta(days=400))
+        persistence.ledger.append_many(extra)
+        changed = {}
+        for row in extra:
+            changed[row["account_id"]] = changed.get(row["account_id"], balances[row["account_id"]]) + signed_amount(row)
+        persistence.save_accounts([dict(persistence.get_account(a), balance=b) for a, b in changed.items()])
+        began = time.perf_counter()
+        report = service.reconcile(incremental=True)
+        elapsed = time.perf_counter() - began
+        print(f"  incremental (+1000 rows)  {elapsed:>8.2f}  ({len(report.issues)} issues)")
+        persistence.close()
+    finally:
+        shutil.rmtree(data_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Speed of the generated model serializers against the hand-written ones they
+replaced.
+
+Run from the project root:
+    python -m benchmarks.bench_serialization [--records 20000] [--repeat 5]
+
+For each model, times from_dict() over a list of records (eager and with
+lazy timestamps) and to_dict() over the loaded objects. "baseline" is the
+original implementation: the dataclass constructor, Enum(value) lookups,
+datetime.fromisoformat and the if/elif account-type dispatch.
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from src.models.account import Account, SavingsAccount, CurrentAccount, FixedDepositAccount
+from src.models.loan import Loan, LoanStatus
+from src.models.transaction import Transaction, TransactionType
+
+# The implementations before serializers were generated, kept for comparison.
+def baseline_transaction_from_dict(data):
+    tx = Transaction(
+        transaction_id=data["transaction_id"],
+        account_id=data["account_id"],
+        amount=data["amount"],
+        transaction_type=TransactionType(data["transaction_type"]),
+        description=data.get("description", ""),
+        related_account_id=data.get("related_account_id")
+    )
+    tx.timestamp = datetime.fromisoformat(data["timestamp"])
+    return tx
+
+def baseline_transaction_to_dict(tx):
+    return {
+        "transaction_id": tx.transaction_id,
+        "account_id": tx.account_id,
+        "amount": tx.amount,
+        "transaction_type": tx.transaction_type.value,
+        "timestamp": tx.timestamp.isoformat(),
+        "description": tx.description,
+        "related_account_id": tx.related_account_id
+    }
+
+def baseline_account_from_dict(data):
+    if data["account_type"] == "SAVINGS":
+        cls = SavingsAccount
+    elif data["account_type"] == "CURRENT":
+        cls = CurrentAccount
+    elif data["account_type"] == "FIXED_DEPOSIT":
+        acc = FixedDepositAccount(
+            account_id=data["account_id"],
+            user_id=data["user_id"],
+            balance=data["balance"],
+            is_active=data["is_active"],
+            term_months=data.get("term_months", 12)
+        )
+        acc.created_at = datetime.fromisoformat(data["created_at"])
+        acc.maturity_date = datetime.fromisoformat(data["maturity_date"])
+        return acc
+    else:
+        raise ValueError(f"Unknown account type: {data['account_type']}")
+    acc = cls(
+        account_id=data["account_id"],
+        user_id=data["user_id"],
+        balance=data["balance"],
+        is_active=data["is_active"]
+    )
+    acc.created_at = datetime.fromisoformat(data["created_at"])
+    return acc
+
+def baseline_account_to_dict(acc):
+    data = {
+        "account_id": acc.account_id,
+        "user_id": acc.user_id,
+        "balance": acc.balance,
+        "created_at": acc.created_at.isoformat(),
+        "is_active": acc.is_active,
+        "account_type": acc.account_type
+    }
+    if isinstance(acc, FixedDepositAccount):
+        data["term_months"] = acc.term_months
+        data["maturity_date"] = acc.maturity_date.isoformat()
+    return data
+
+def baseline_loan_from_dict(data):
+    loan = Loan(
+        loan_id=data["loan_id"],
+        user_id=data["user_id"],
+        amount=data["amount"],
+        interest_rate=data["interest_rate"],
+        term_months=data["term_months"],
+        status=LoanStatus(data["status"])
+    )
+    loan.created_at = datetime.fromisoformat(data["created_at"])
+    loan.remaining_amount = data["remaining_amount"]
+    return loan
+
+def baseline_loan_to_dict(loan):
+    return {
+        "loan_id": loan.loan_id,
+        "user_id": loan.user_id,
+        "amount": loan.amount,
+        "interest_rate": loan.interest_rate,
+        "term_months": loan.term_months,
+        "status": loan.status.value,
+        "created_at": loan.created_at.isoformat(),
+        "remaining_amount": loan.remaining_amount
+    }
+
+def make_records(count: int):
+    start = datetime(2024, 1, 1)
+    types = list(TransactionType)
+    account_classes = (SavingsAccount, CurrentAccount, FixedDepositAccount)
+    transactions, accounts, loans = [], [], []
+    for i in range(count):
+        when = start + timedelta(seconds=i)
+        transactions.append(Transaction(str(uuid.uuid4()), str(uuid.uuid4()), 10.0 + i % 50, types[i % len(types)],
+                                        when, "Deposit").to_dict())
+        accounts.append(account_classes[i % 3](account_id=str(uuid.uuid4()), user_id=str(uuid.uuid4()),
+                                               balance=1000.0, created_at=when).to_dict())
+        loans.append(Loan(str(uuid.uuid4()), str(uuid.uuid4()), 1000.0, 0.05, 12, LoanStatus.APPROVED,
+                          when).to_dict())
+    return transactions, accounts, loans
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    transactions, accounts, loans = make_records(args.records)
+    cases = (
+        ("Transaction", transactions, baseline_transaction_from_dict, baseline_transaction_to_dict,
+         Transaction.from_dict),
+        ("Account", accounts, baseline_account_from_dict, baseline_account_to_dict, Account.from_dict),
+        ("Loan", loans, baseline_loan_from_dict, baseline_loan_to_dict, Loan.from_dict),
+    )
+    per_record = 1e9 / args.records
+    print(f"ns per record ({args.records} records, best of {args.repeat})")
+    print(f"  {'model':<12} {'operation':<10} {'baseline':>10} {'generated':>10} {'lazy':>10}")
+    for name, records, old_load, old_dump, load in cases:
+        objects = [load(r) for r in records]
+        lazy_objects = [load(r, lazy_timestamps=True) for r in records]
+        old_in = best_of(args.repeat, lambda: [old_load(r) for r in records]) * per_record
+        new_in = best_of(args.repeat, lambda: [load(r) for r in records]) * per_record
+        lazy_in = best_of(args.repeat, lambda: [load(r, lazy_timestamps=True) for r in records]) * per_record
+        print(f"  {name:<12} {'from_dict':<10} {old_in:>10.0f} {new_in:>10.0f} {lazy_in:>10.0f}")
+        old_out = best_of(args.repeat, lambda: [old_dump(o) for o in objects]) * per_record
+        new_out = best_of(args.repeat, lambda: [o.to_dict() for o in objects]) * per_record
+        lazy_out = best_of(args.repeat, lambda: [o.to_dict() for o in lazy_objects]) * per_record
+        print(f"  {name:<12} {'to_dict':<10} {old_out:>10.0f} {new_out:>10.0f} {lazy_out:>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Throughput of a shared thread-safe BankService as threads are added.
+
+Run from the project root:
+    python -m benchmarks.bench_threads [--ops 400] [--threads 1,2,4,8]
+
+Every thread transfers back and forth between its own two accounts through
+one BankService(thread_safe=True) on a CachedPersistenceLayer with a
+group-commit write-ahead log. "striped" uses the default lock table, so
+threads on different accounts only meet at the log, where waiting commits
+share an fsync. "global" uses a single stripe, i.e. one lock for everything,
+so each commit pays for its own fsync.
+"""
+import argparse
+import shutil
+import tempfile
+import threading
+import time
+
+from src.services.auth_service import AuthService
+from src.services.bank_service import BankService
+from src.utils.cached_persistence import CachedPersistenceLayer
+
+def bench(threads: int, ops: int, stripes: int) -> float:
+    data_dir = tempfile.mkdtemp(prefix="bench_threads_")
+    try:
+        persistence = CachedPersistenceLayer(data_dir, flush_interval=1.0, ledger_format="jsonl", durability="batch")
+        user = AuthService(persistence).register("bench", "Password123", "b@test.com", "1234567890")
+        bank = BankService(persistence, thread_safe=True, lock_stripes=stripes)
+        pairs = [(bank.create_account(user, "CURRENT", 1000.0).account_id,
+                  bank.create_account(user, "CURRENT", 1000.0).account_id) for _ in range(threads)]
+        per_thread = ops // threads
+
+        def worker(source, target):
+            for i in range(per_thread):
+                if i % 2:
+                    bank.transfer(target, source, 1.0)
+                else:
+                    bank.transfer(source, target, 1.0)
+
+        workers = [threading.Thread(target=worker, args=pair) for pair in pairs]
+        start = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - start
+        persistence.close()
+        return per_thread * threads / elapsed
+    finally:
+        shutil.rmtree(data_dir)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=400)
+    parser.add_argument("--threads", default="1,2,4,8")
+    args = parser.parse_args()
+
+    # BankService writes audit lines to data/audit.log; send them somewhere disposable.
+    audit_dir = tempfile.mkdtemp(prefix="bench_threads_audit_")
+    import src.services.audit_service as audit_module
+    audit_module.AuditService.__init__.__defaults__ = (f"{audit_dir}/audit.log",)
+
+    print(f"Transfers per second ({args.ops} transfers per run)")
+    print(f"  {'threads':>7} {'striped':>10} {'global':>10}")
+    for threads in (int(n) for n in args.threads.split(",")):
+        striped = bench(threads, args.ops, stripes=64)
+        global_lock = bench(threads, args.ops, stripes=1)
+        print(f"  {threads:>7} {striped:>10.0f} {global_lock:>10.0f}")
+    shutil.rmtree(audit_dir)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import sys
 import os
 import cmd
+import argparse
+from datetime import datetime
 from getpass import getpass
 
 # Add project root to path
@@ -10,22 +12,31 @@ from src.services.auth_service import AuthService
 from src.services.bank_service import BankService
 from src.services.report_service import ReportService
 from src.services.loan_service import LoanService
+from src.services.fraud_backfill import FraudBackfillService
 from src.services.fraud_service import FraudDetectionService
+from src.services.balance_service import BalanceService
+from src.services.reconciliation_service import ReconciliationService
+from src.utils.payment_files import read_payments, write_report
 from src.utils.persistence import PersistenceLayer
+from src.utils.sqlite_persistence import SqlitePersistenceLayer
 from src.utils.validators import ValidationError
 
 class BankingCLI(cmd.Cmd):
     intro = 'Welcome to the Secure Banking System. Type help or ? to list commands.\n'
     prompt = '(banking) '
 
-    def __init__(self):
+    def __init__(self, persistence: PersistenceLayer = None, background_fraud: bool = False):
         super().__init__()
-        self.persistence = PersistenceLayer()
+        self.persistence = persistence if persistence is not None else PersistenceLayer(process_safe=True)
         self.auth_service = AuthService(self.persistence)
         self.bank_service = BankService(self.persistence)
+        if background_fraud:
+            self.bank_service.start_fraud_pipeline()
         self.report_service = ReportService(self.persistence)
         self.loan_service = LoanService(self.persistence)
         self.fraud_service = FraudDetectionService(self.persistence)
+        self.balance_service = BalanceService(self.persistence)
+        self.reconciliation_service = ReconciliationService(self.persistence)
 
     def do_register(self, arg):
         """Register a new user: register <username> <email> <phone>"""
@@ -168,23 +179,85 @@ class BankingCLI(cmd.Cmd):
         except ValueError:
             print("Invalid amount.")
 
+    def do_batch_transfer(self, arg):
+        """Run a file of transfers (CSV or .jsonl): batch_transfer <file> [report.csv]"""
+        if not self.auth_service.is_authenticated():
+            print("Please login first.")
+            return
+
+        args = arg.split()
+        if len(args) not in (1, 2):
+            print("Usage: batch_transfer <file> [report.csv]")
+            return
+
+        try:
+            payments = read_payments(args[0])
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            return
+
+        report = self.bank_service.execute_batch(payments, requested_by=self.auth_service.current_user)
+        print(f"Processed {len(report.results)} payments: {report.succeeded} succeeded, {report.failed} failed.")
+        print(f"Total transferred: ${report.total_amount:.2f}")
+        for result in report.failures():
+            print(f"  Row {result.row}: {result.error}")
+        flagged = sum(1 for r in report.results if r.flagged)
+        if flagged:
+            print(f"WARNING: {flagged} transactions flagged for review.")
+        if len(args) == 2:
+            write_report(args[1], report)
+            print(f"Report written to {args[1]}.")
+
     def do_statement(self, arg):
-        """Get account statement: statement <account_id>"""
+        """Get account statement: statement <account_id> [YYYY-MM]"""
         if not self.auth_service.is_authenticated():
             print("Please login first.")
             return
         
-        if not arg:
-            print("Usage: statement <account_id>")
+        args = arg.split()
+        if len(args) not in (1, 2):
+            print("Usage: statement <account_id> [YYYY-MM]")
             return
 
         # Verify ownership
         accounts = self.bank_service.get_user_accounts(self.auth_service.current_user.user_id)
-        if arg not in [acc.account_id for acc in accounts]:
+        if args[0] not in [acc.account_id for acc in accounts]:
+            print("Account not found or access denied.")
+            return
+
+        start = end = None
+        if len(args) == 2:
+            try:
+                start = datetime.strptime(args[1], "%Y-%m")
+            except ValueError:
+                print("Invalid month, expected YYYY-MM.")
+                return
+            end = datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+        print(self.report_service.generate_account_statement(args[0], start, end, running_balance=start is not None))
+
+    def do_balance_at(self, arg):
+        """Balance of an account at the start of a day: balance_at <account_id> <YYYY-MM-DD>"""
+        if not self.auth_service.is_authenticated():
+            print("Please login first.")
+            return
+
+        args = arg.split()
+        if len(args) != 2:
+            print("Usage: balance_at <account_id> <YYYY-MM-DD>")
+            return
+
+        accounts = self.bank_service.get_user_accounts(self.auth_service.current_user.user_id)
+        if args[0] not in [acc.account_id for acc in accounts]:
             print("Account not found or access denied.")
             return
 
-        print(self.report_service.generate_account_statement(arg))
+        try:
+            when = datetime.strptime(args[1], "%Y-%m-%d")
+        except ValueError:
+            print("Invalid date, expected YYYY-MM-DD.")
+            return
+        print(f"Balance on {args[1]}: ${self.balance_service.balance_at(args[0], when):.2f}")
 
     def do_admin_report(self, arg):
         """Generate admin report (Admin only)."""
@@ -194,14 +267,127 @@ class BankingCLI(cmd.Cmd):
         
         print(self.report_service.generate_admin_report())
 
+    def do_reconcile(self, arg):
+        """Check balances, transfer legs and account references against the ledger (Admin only): reconcile [--incremental] [--workers N]"""
+        if not self.auth_service.is_authenticated() or not self.auth_service.is_admin():
+            print("Access denied. Admin only.")
+            return
+
+        parser = argparse.ArgumentParser(prog="reconcile", add_help=False)
+        parser.add_argument("--incremental", action="store_true")
+        parser.add_argument("--workers", type=int)
+        try:
+            options = parser.parse_args(arg.split())
+        except SystemExit:
+            print("Usage: reconcile [--incremental] [--workers N]")
+            return
+
+        if options.workers:
+            self.reconciliation_service.workers = options.workers
+            if options.workers > 1 and not self.reconciliation_service.parallel_scan:
+                print("Note: this ledger format is scanned in one process; --workers only applies "
+                      "to the jsonl, partitioned and binary formats.")
+        report = self.reconciliation_service.reconcile(incremental=options.incremental)
+        mode = "Incremental" if report.incremental else "Full"
+        print(f"{mode} reconciliation: {report.transactions_scanned} transactions scanned, "
+              f"{report.accounts_checked} accounts checked.")
+        if report.ok:
+            print("No issues found.")
+            return
+        print(f"{len(report.issues)} issue(s) found:")
+        for issue in report.issues:
+            print(f"  {issue.kind} {issue.subject}: {issue.detail}")
+
+    def do_fraud_backfill(self, arg):
+        """Re-score the whole ledger with the current fraud rules (Admin only): fraud_backfill [--workers N] [--chunk-size N]"""
+        if not self.auth_service.is_authenticated() or not self.auth_service.is_admin():
+            print("Access denied. Admin only.")
+            return
+
+        parser = argparse.ArgumentParser(prog="fraud_backfill", add_help=False)
+        parser.add_argument("--workers", type=int)
+        parser.add_argument("--chunk-size", type=int, default=50_000)
+        try:
+            options = parser.parse_args(arg.split())
+        except SystemExit:
+            print("Usage: fraud_backfill [--workers N] [--chunk-size N]")
+            return
+
+        backfill = FraudBackfillService(self.persistence, self.bank_service.fraud_service,
+                                        workers=options.workers, chunk_size=options.chunk_size)
+        report = backfill.run()
+        print(f"Scanned {report.scanned} transactions in {report.elapsed:.2f}s "
+              f"({report.tx_per_second:,.0f} tx/sec).")
+        print(f"New flags: {report.new_flags}, already flagged: {report.already_flagged}")
+        for rule, count in sorted(report.rule_counts.items()):
+            print(f"  {rule}: {count}")
+
+    def do_fraud_rules(self, arg):
+        """Show per-rule fraud check statistics since startup (Admin only)."""
+        if not self.auth_service.is_authenticated() or not self.auth_service.is_admin():
+            print("Access denied. Admin only.")
+            return
+
+        engine = self.bank_service.fraud_service.engine
+        print(f"Risk threshold: {engine.risk_threshold}")
+        print(f"{'Rule':<26} {'Checks':>8} {'Hits':>6} {'Hit rate':>9} {'Skipped':>8} {'Total ms':>9} {'Mean us':>8}")
+        for name, stats in engine.stats_report().items():
+            print(f"{name:<26} {stats['evaluations']:>8} {stats['hits']:>6} {stats['hit_rate']:>9.1%} "
+                  f"{stats['skipped']:>8} {stats['total_time'] * 1e3:>9.2f} {stats['mean_time'] * 1e6:>8.1f}")
+
+    def do_rebuild_checkpoints(self, arg):
+        """Recompute all balance checkpoints from the ledger (Admin only)."""
+        if not self.auth_service.is_authenticated() or not self.auth_service.is_admin():
+            print("Access denied. Admin only.")
+            return
+
+        count = self.balance_service.rebuild_checkpoints()
+        print(f"Rebuilt {count} balance checkpoints.")
+
     def do_apply_interest(self, arg):
-        """Apply interest to all savings accounts (Admin only)."""
+        """Apply interest to all savings accounts (Admin only): apply_interest [period_days] [simple|daily]"""
         if not self.auth_service.is_authenticated() or not self.auth_service.is_admin():
             print("Access denied. Admin only.")
             return
-        
-        count = self.bank_service.calculate_interest()
-        print(f"Interest applied to {count} accounts.")
+
+        args = arg.split()
+        if len(args) > 2:
+            print("Usage: apply_interest [period_days] [simple|daily]")
+            return
+        try:
+            period_days = int(args[0]) if args else 365
+            compounding = args[1] if len(args) > 1 else "simple"
+            summary = self.bank_service.apply_interest(period_days, compounding)
+        except ValueError:
+            print("Invalid period, expected a number of days.")
+            return
+        except ValidationError as e:
+            print(f"Error: {e}")
+            return
+        print(f"Interest applied to {summary.accounts} accounts.")
+        print(f"Total interest: ${summary.total_interest:.2f} ({summary.period_days} days, {summary.compounding})")
+
+    def do_apply_fees(self, arg):
+        """Charge overdraft interest and maintenance fees on all current accounts (Admin only): apply_fees [period_days]"""
+        if not self.auth_service.is_authenticated() or not self.auth_service.is_admin():
+            print("Access denied. Admin only.")
+            return
+
+        args = arg.split()
+        if len(args) > 1:
+            print("Usage: apply_fees [period_days]")
+            return
+        try:
+            summary = self.bank_service.apply_fees(int(args[0]) if args else 30)
+        except ValueError:
+            print("Invalid period, expected a number of days.")
+            return
+        except ValidationError as e:
+            print(f"Error: {e}")
+            return
+        print(f"Fees charged to {summary.accounts} accounts.")
+        print(f"Overdraft interest: ${summary.overdraft_interest:.2f}, "
+              f"maintenance fees: ${summary.maintenance_fees:.2f} ({summary.period_days} days)")
 
     def do_apply_loan(self, arg):
         """Apply for a loan: apply_loan <amount> <term_months>"""
@@ -309,8 +495,21 @@ class BankingCLI(cmd.Cmd):
 
     def do_exit(self, arg):
         """Exit the application."""
+        self.bank_service.close()
+        self.persistence.close()
         print("Goodbye!")
         return True
 
 if __name__ == '__main__':
-    BankingCLI().cmdloop()
+    parser = argparse.ArgumentParser(description="Secure Banking System")
+    parser.add_argument("--sqlite", metavar="DB_PATH", help="Use the SQLite storage backend at DB_PATH instead of data/*.json")
+    parser.add_argument("--ledger", choices=["json", "jsonl", "binary", "partitioned"], default="json",
+                        help="Transaction ledger format for the JSON backend (default: json)")
+    parser.add_argument("--background-fraud", action="store_true",
+                        help="Run fraud checks on a background thread (JSON backend only)")
+    args = parser.parse_args()
+    if args.sqlite and args.background_fraud:
+        parser.error("--background-fraud needs the JSON backend")
+
+    persistence = SqlitePersistenceLayer(args.sqlite) if args.sqlite else PersistenceLayer(ledger_format=args.ledger, process_safe=True)
+    BankingCLI(persistence, background_fraud=args.background_fraud).cmdloop()
@@ -2,10 +2,11 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import List
+from src.models.serialization import compile_serializers
 from src.models.transaction import Transaction, TransactionType
 from src.utils.validators import validate_amount, ValidationError
 
-@dataclass
+@dataclass(slots=True)
 class Account(ABC):
     account_id: str
     user_id: str
@@ -28,29 +29,15 @@ class Account(ABC):
             raise ValidationError("Insufficient funds or withdrawal limit exceeded.")
         self.balance -= amount
 
-    def to_dict(self):
-        return {
-            "account_id": self.account_id,
-            "user_id": self.user_id,
-            "balance": self.balance,
-            "created_at": self.created_at.isoformat(),
-            "is_active": self.is_active,
-            "account_type": self.account_type
-        }
-
     @staticmethod
-    def from_dict(data):
+    def from_dict(data, lazy_timestamps=False):
         # Factory method to create specific account types
-        if data["account_type"] == "SAVINGS":
-            return SavingsAccount.from_dict_specific(data)
-        elif data["account_type"] == "CURRENT":
-            return CurrentAccount.from_dict_specific(data)
-        elif data["account_type"] == "FIXED_DEPOSIT":
-            return FixedDepositAccount.from_dict_specific(data)
-        else:
+        account_class = ACCOUNT_TYPES.get(data["account_type"])
+        if account_class is None:
             raise ValueError(f"Unknown account type: {data['account_type']}")
+        return account_class.from_dict_specific(data, lazy_timestamps)
 
-@dataclass
+@dataclass(slots=True)
 class SavingsAccount(Account):
     interest_rate: float = 0.03
     min_balance: float = 500.0
@@ -59,18 +46,7 @@ class SavingsAccount(Account):
     def can_withdraw(self, amount: float) -> bool:
         return (self.balance - amount) >= self.min_balance
 
-    @classmethod
-    def from_dict_specific(cls, data):
-        acc = cls(
-            account_id=data["account_id"],
-            user_id=data["user_id"],
-            balance=data["balance"],
-            is_active=data["is_active"]
-        )
-        acc.created_at = datetime.fromisoformat(data["created_at"])
-        return acc
-
-@dataclass
+@dataclass(slots=True)
 class CurrentAccount(Account):
     overdraft_limit: float = 1000.0
     account_type: str = "CURRENT"
@@ -78,18 +54,7 @@ class CurrentAccount(Account):
     def can_withdraw(self, amount: float) -> bool:
         return (self.balance + self.overdraft_limit) >= amount
 
-    @classmethod
-    def from_dict_specific(cls, data):
-        acc = cls(
-            account_id=data["account_id"],
-            user_id=data["user_id"],
-            balance=data["balance"],
-            is_active=data["is_active"]
-        )
-        acc.created_at = datetime.fromisoformat(data["created_at"])
-        return acc
-
-@dataclass
+@dataclass(slots=True)
 class FixedDepositAccount(Account):
     term_months: int = 12
     interest_rate: float = 0.06
@@ -108,21 +73,26 @@ class FixedDepositAccount(Account):
             return False
         return self.balance >= amount
 
-    def to_dict(self):
-        data = super().to_dict()
-        data["term_months"] = self.term_months
-        data["maturity_date"] = self.maturity_date.isoformat()
-        return data
-
-    @classmethod
-    def from_dict_specific(cls, data):
-        acc = cls(
-            account_id=data["account_id"],
-            user_id=data["user_id"],
-            balance=data["balance"],
-            is_active=data["is_active"],
-            term_months=data.get("term_months", 12)
-        )
-        acc.created_at = datetime.fromisoformat(data["created_at"])
-        acc.maturity_date = datetime.fromisoformat(data["maturity_date"])
-        return acc
+
+ACCOUNT_TYPES = {
+    "SAVINGS": SavingsAccount,
+    "CURRENT": CurrentAccount,
+    "FIXED_DEPOSIT": FixedDepositAccount,
+}
+
+_ACCOUNT_LOAD = ["account_id", "user_id", "balance", "created_at", "is_active"]
+_ACCOUNT_DUMP = ["account_id", "user_id", "balance", "created_at", "is_active", "account_type"]
+
+for _account_class in (SavingsAccount, CurrentAccount):
+    _to_dict, _from_dict = compile_serializers(
+        _account_class, load=_ACCOUNT_LOAD, dump=_ACCOUNT_DUMP, timestamps=["created_at"])
+    _account_class.to_dict = _to_dict
+    _account_class.from_dict_specific = staticmethod(_from_dict)
+
+_to_dict, _from_dict = compile_serializers(
+    FixedDepositAccount,
+    load=_ACCOUNT_LOAD + [("term_months", 12), "maturity_date"],
+    dump=_ACCOUNT_DUMP + ["term_months", "maturity_date"],
+    timestamps=["created_at", "maturity_date"])
+FixedDepositAccount.to_dict = _to_dict
+FixedDepositAccount.from_dict_specific = staticmethod(_from_dict)
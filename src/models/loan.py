@@ -1,6 +1,7 @@
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from src.models.serialization import compile_serializers
 
 class LoanStatus(Enum):
     PENDING = "PENDING"
@@ -8,7 +9,7 @@ class LoanStatus(Enum):
     REJECTED = "REJECTED"
     PAID = "PAID"
 
-@dataclass
+@dataclass(slots=True)
 class Loan:
     loan_id: str
     user_id: str
@@ -22,28 +23,10 @@ class Loan:
     def __post_init__(self):
         self.remaining_amount = self.amount + (self.amount * self.interest_rate)
 
-    def to_dict(self):
-        return {
-            "loan_id": self.loan_id,
-            "user_id": self.user_id,
-            "amount": self.amount,
-            "interest_rate": self.interest_rate,
-            "term_months": self.term_months,
-            "status": self.status.value,
-            "created_at": self.created_at.isoformat(),
-            "remaining_amount": self.remaining_amount
-        }
 
-    @classmethod
-    def from_dict(cls, data):
-        loan = cls(
-            loan_id=data["loan_id"],
-            user_id=data["user_id"],
-            amount=data["amount"],
-            interest_rate=data["interest_rate"],
-            term_months=data["term_months"],
-            status=LoanStatus(data["status"])
-        )
-        loan.created_at = datetime.fromisoformat(data["created_at"])
-        loan.remaining_amount = data["remaining_amount"]
-        return loan
+_LOAN_FIELDS = ["loan_id", "user_id", "amount", "interest_rate", "term_months", "status", "created_at",
+                "remaining_amount"]
+_to_dict, _from_dict = compile_serializers(
+    Loan, load=_LOAN_FIELDS, dump=_LOAN_FIELDS, enums={"status": LoanStatus}, timestamps=["created_at"])
+Loan.to_dict = _to_dict
+Loan.from_dict = staticmethod(_from_dict)
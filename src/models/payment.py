@@ -0,0 +1,45 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+@dataclass(slots=True)
+class PaymentResult:
+    row: int
+    from_account_id: Optional[str]
+    to_account_id: Optional[str]
+    amount: Optional[float]
+    success: bool
+    error: str = ""
+    transaction_id: Optional[str] = None  # the credit leg, as returned for a single transfer
+    flagged: bool = False
+
+    def to_dict(self):
+        return {
+            "row": self.row,
+            "from_account_id": self.from_account_id,
+            "to_account_id": self.to_account_id,
+            "amount": self.amount,
+            "status": "OK" if self.success else "FAILED",
+            "error": self.error,
+            "transaction_id": self.transaction_id,
+            "flagged": self.flagged
+        }
+
+
+@dataclass(slots=True)
+class BatchReport:
+    results: List[PaymentResult] = field(default_factory=list)
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for r in self.results if r.success)
+
+    @property
+    def failed(self) -> int:
+        return len(self.results) - self.succeeded
+
+    @property
+    def total_amount(self) -> float:
+        return sum(r.amount for r in self.results if r.success)
+
+    def failures(self) -> List[PaymentResult]:
+        return [r for r in self.results if not r.success]
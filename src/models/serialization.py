@@ -0,0 +1,138 @@
+from dataclasses import fields, MISSING
+from datetime import datetime
+from enum import Enum
+from typing import Callable, Dict, Iterable, Tuple, Type, Union
+
+# A field read from the record: its name, or (name, default) when it may be absent.
+LoadSpec = Union[str, Tuple[str, object]]
+
+class LazyTimestamp:
+    """
+    Data descriptor for a datetime field of a slotted dataclass that may hold
+    its ISO text until first read. Reading parses the text once and stores the
+    datetime back in the slot; to_dict() writes unread text out unchanged.
+    """
+    def __init__(self, slot):
+        self.slot = slot
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        value = self.slot.__get__(obj, owner)
+        if value.__class__ is str:
+            value = datetime.fromisoformat(value)
+            self.slot.__set__(obj, value)
+        return value
+
+    def __set__(self, obj, value):
+        self.slot.__set__(obj, value)
+
+    def __delete__(self, obj):
+        self.slot.__delete__(obj)
+
+
+def _lazy_slot(cls: Type, name: str) -> LazyTimestamp:
+    for klass in cls.__mro__:
+        attr = klass.__dict__.get(name)
+        if isinstance(attr, LazyTimestamp):
+            return attr
+        if attr is not None:
+            descriptor = LazyTimestamp(attr)
+            setattr(klass, name, descriptor)
+            return descriptor
+    raise AttributeError(f"{cls.__name__} has no slot {name!r}")
+
+
+def _load_spec(spec: LoadSpec) -> Tuple[str, object, bool]:
+    if isinstance(spec, tuple):
+        return spec[0], spec[1], True
+    return spec, None, False
+
+
+def compile_serializers(cls: Type, load: Iterable[LoadSpec], dump: Iterable[str],
+                        enums: Dict[str, Type[Enum]] = None, timestamps: Iterable[str] = (),
+                        lists: Iterable[str] = (), post_init: bool = False) -> Tuple[Callable, Callable]:
+    """
+    Generates a (to_dict, from_dict) pair specialized for the slotted
+    dataclass `cls`, with every field access written out in straight-line
+    code.
+
+    from_dict(data, lazy_timestamps=False) reads the `load` fields from the
+    record and gives every other field its dataclass default, without calling
+    __init__ (and so __post_init__ only runs when `post_init` is set, e.g. for
+    validation). Enum fields are resolved through a value lookup table, `lists`
+    are copied, and `timestamps` are parsed with datetime.fromisoformat, or
+    with lazy_timestamps=True kept as text until first read. to_dict() writes
+    the `dump` fields in order.
+    """
+    enums = enums or {}
+    timestamps = set(timestamps)
+    lists = set(lists)
+    namespace = {"_new": object.__new__, "_cls": cls, "_parse": datetime.fromisoformat, "_str": str}
+    for name in timestamps:
+        namespace[f"_raw_{name}"] = _lazy_slot(cls, name).slot.__get__
+    for name, enum in enums.items():
+        namespace[f"_{name}_values"] = {member.value: member for member in enum}
+        namespace[f"_{name}_enum"] = enum
+
+    loaded = set()
+    eager, lazy = [], []
+    for spec in load:
+        name, default, optional = _load_spec(spec)
+        loaded.add(name)
+        if optional:
+            namespace[f"_{name}_default"] = default
+            source = f"data.get({name!r}, _{name}_default)"
+        else:
+            source = f"data[{name!r}]"
+        if name in enums:
+            # Unknown values fall back to the Enum constructor for its usual ValueError.
+            value = f"_{name}_values.get({source}) or _{name}_enum({source})"
+            eager.append(f"    obj.{name} = {value}")
+            lazy.append(f"    obj.{name} = {value}")
+        elif name in timestamps:
+            eager.append(f"    obj.{name} = _parse({source})")
+            lazy.append(f"    obj.{name} = {source}")
+        elif name in lists:
+            eager.append(f"    obj.{name} = list({source})")
+            lazy.append(f"    obj.{name} = list({source})")
+        else:
+            eager.append(f"    obj.{name} = {source}")
+            lazy.append(f"    obj.{name} = {source}")
+
+    for field in fields(cls):
+        if field.name in loaded:
+            continue
+        if field.default is not MISSING:
+            namespace[f"_{field.name}_default"] = field.default
+            line = f"    obj.{field.name} = _{field.name}_default"
+        elif field.default_factory is not MISSING:
+            namespace[f"_{field.name}_factory"] = field.default_factory
+            line = f"    obj.{field.name} = _{field.name}_factory()"
+        else:
+            continue  # derived in __post_init__ or left unset
+        eager.append(line)
+        lazy.append(line)
+
+    finish = ["    obj.__post_init__()"] if post_init else []
+    from_source = "\n".join(
+        ["def from_dict(data, lazy_timestamps=False):",
+         "    obj = _new(_cls)",
+         "    if lazy_timestamps:"] + ["    " + line for line in lazy] +
+        ["    else:"] + ["    " + line for line in eager] +
+        finish + ["    return obj"])
+
+    items = []
+    for name in dump:
+        if name in enums:
+            items.append(f"        {name!r}: self.{name}.value,")
+        elif name in timestamps:
+            # Unread lazy text is already in isoformat() form.
+            items.append(f"        {name!r}: _{name} if (_{name} := _raw_{name}(self)).__class__ is _str "
+                         f"else _{name}.isoformat(),")
+        else:
+            items.append(f"        {name!r}: self.{name},")
+    to_source = "\n".join(["def to_dict(self):", "    return {"] + items + ["    }"])
+
+    exec(compile(f"{from_source}\n\n{to_source}\n", f"<serializers for {cls.__name__}>", "exec"), namespace)
+    return namespace["to_dict"], namespace["from_dict"]
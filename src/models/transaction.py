@@ -1,7 +1,9 @@
+import uuid
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
+from src.models.serialization import compile_serializers
 
 class TransactionType(Enum):
     DEPOSIT = "DEPOSIT"
@@ -10,7 +12,78 @@ class TransactionType(Enum):
     INTEREST = "INTEREST"
     FEE = "FEE"
 
-@dataclass
+# Types that take money out of the account they are logged against.
+DEBIT_TYPES = {TransactionType.WITHDRAWAL.value, TransactionType.FEE.value}
+
+def signed_amount(data: dict) -> float:
+    """
+    A transaction dict's effect on its account's balance. Amounts are stored
+    positive; withdrawals, fees and the sending leg of a transfer reduce it.
+    """
+    if data["transaction_type"] in DEBIT_TYPES:
+        return -data["amount"]
+    if data["transaction_type"] == TransactionType.TRANSFER.value and data.get("description", "").startswith("Transfer to"):
+        return -data["amount"]
+    return data["amount"]
+
+# Double-entry transfers: one ledger record (a journal entry) carries both legs
+# as postings, signed from each account's point of view, and is indexed under
+# both accounts. Readers see it as the two TRANSFER rows it replaces.
+_CREDIT_LEG_NAMESPACE = uuid.UUID("6f1c7a52-3e0b-4c1e-9f27-5d2b8e4a7c10")
+
+def journal_entry(entry_id: str, from_account_id: str, to_account_id: str, amount: float,
+                  timestamp: str, memo: str = "") -> dict:
+    """A transfer as one record; the top-level fields describe the sending leg."""
+    return {
+        "transaction_id": entry_id,
+        "account_id": from_account_id,
+        "amount": amount,
+        "transaction_type": TransactionType.TRANSFER.value,
+        "timestamp": timestamp,
+        "description": memo,
+        "related_account_id": to_account_id,
+        "postings": [
+            {"account_id": from_account_id, "amount": -amount},
+            {"account_id": to_account_id, "amount": amount}
+        ]
+    }
+
+def is_journal_entry(record: dict) -> bool:
+    return "postings" in record
+
+def credit_leg_id(entry_id: str) -> str:
+    """Id of the receiving leg of a journal entry (the sending leg uses the entry id)."""
+    return str(uuid.uuid5(_CREDIT_LEG_NAMESPACE, entry_id))
+
+def posting_accounts(record: dict) -> List[str]:
+    """Every account a ledger record belongs to."""
+    if "postings" in record:
+        return [posting["account_id"] for posting in record["postings"]]
+    return [record["account_id"]]
+
+def transaction_legs(record: dict) -> List[dict]:
+    """
+    The per-account transaction rows a ledger record stands for: the record
+    itself, or for a journal entry a "Transfer to"/"Transfer from" row per leg.
+    """
+    if "postings" not in record:
+        return [record]
+    sender, receiver = record["postings"]
+    suffix = f" - {record['description']}" if record.get("description") else ""
+    common = {"transaction_type": record["transaction_type"], "timestamp": record["timestamp"]}
+    return [
+        dict(common, transaction_id=record["transaction_id"], account_id=sender["account_id"],
+             amount=-sender["amount"], description=f"Transfer to {receiver['account_id']}{suffix}",
+             related_account_id=receiver["account_id"]),
+        dict(common, transaction_id=credit_leg_id(record["transaction_id"]), account_id=receiver["account_id"],
+             amount=receiver["amount"], description=f"Transfer from {sender['account_id']}{suffix}",
+             related_account_id=sender["account_id"]),
+    ]
+
+def legs_for_account(record: dict, account_id: str) -> List[dict]:
+    return [leg for leg in transaction_legs(record) if leg["account_id"] == account_id]
+
+@dataclass(slots=True)
 class Transaction:
     transaction_id: str
     account_id: str
@@ -20,26 +93,14 @@ class Transaction:
     description: str = ""
     related_account_id: Optional[str] = None # For transfers
 
-    def to_dict(self):
-        return {
-            "transaction_id": self.transaction_id,
-            "account_id": self.account_id,
-            "amount": self.amount,
-            "transaction_type": self.transaction_type.value,
-            "timestamp": self.timestamp.isoformat(),
-            "description": self.description,
-            "related_account_id": self.related_account_id
-        }
-
-    @classmethod
-    def from_dict(cls, data):
-        tx = cls(
-            transaction_id=data["transaction_id"],
-            account_id=data["account_id"],
-            amount=data["amount"],
-            transaction_type=TransactionType(data["transaction_type"]),
-            description=data.get("description", ""),
-            related_account_id=data.get("related_account_id")
-        )
-        tx.timestamp = datetime.fromisoformat(data["timestamp"])
-        return tx
+
+_to_dict, _from_dict = compile_serializers(
+    Transaction,
+    load=["transaction_id", "account_id", "amount", "transaction_type", "timestamp",
+          ("description", ""), ("related_account_id", None)],
+    dump=["transaction_id", "account_id", "amount", "transaction_type", "timestamp",
+          "description", "related_account_id"],
+    enums={"transaction_type": TransactionType},
+    timestamps=["timestamp"])
+Transaction.to_dict = _to_dict
+Transaction.from_dict = staticmethod(_from_dict)
@@ -0,0 +1,173 @@
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional
+from src.models.transaction import Transaction, TransactionType, DEBIT_TYPES
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_TYPES = tuple(TransactionType)
+_TYPE_CODES = {t.value: code for code, t in enumerate(_TYPES)}
+_NO_RELATED = -1
+
+def _uuid_str(raw: bytes) -> str:
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+def _uuid_bytes(value) -> Optional[bytes]:
+    """The 16 bytes of a canonical UUID string, or None for any other id."""
+    if not isinstance(value, str) or len(value) != 36 or value[8] != "-":
+        return None
+    try:
+        packed = bytes.fromhex(value.replace("-", ""))
+    except ValueError:
+        return None
+    # Reject ids that only look like UUIDs, so the text round-trips exactly.
+    return packed if _uuid_str(packed) == value else None
+
+class TransactionBatch:
+    """
+    Columnar, read-mostly container for many transactions.
+
+    Instead of one dict or Transaction object per row, each field is stored in
+    a typed column: amounts as float64, timestamps as int64 microseconds since
+    the epoch, types as one-byte codes, and account ids, related account ids
+    and descriptions as indexes into tables of interned strings. Transaction
+    ids are packed as 16-byte UUIDs (any other id is kept as text).
+
+    Iterating or indexing yields TransactionRow views that decode a field only
+    when it is read; row.to_transaction() builds a full Transaction when one is
+    needed. Timestamps must be naive ISO datetimes, as the services write them.
+    """
+    def __init__(self, records: Iterable[Dict] = ()):
+        self.amounts = array('d')
+        self.timestamps = array('q')
+        self.type_codes = array('B')
+        self._account_refs = array('i')
+        self._related_refs = array('i')
+        self._description_refs = array('i')
+        self._ids = bytearray()
+        self._text_ids: Dict[int, str] = {}
+        self._strings: List[str] = []
+        self._string_index: Dict[str, int] = {}
+        self.extend(records)
+
+    def _intern(self, value: str) -> int:
+        ref = self._string_index.get(value)
+        if ref is None:
+            ref = self._string_index[value] = len(self._strings)
+            self._strings.append(value)
+        return ref
+
+    def append(self, record: Dict):
+        """Adds one transaction dict, as stored by the persistence layer."""
+        row = len(self.amounts)
+        packed = _uuid_bytes(record["transaction_id"])
+        if packed is None:
+            packed = bytes(16)
+            self._text_ids[row] = record["transaction_id"]
+        self._ids += packed
+        self.amounts.append(float(record["amount"]))
+        self.timestamps.append((datetime.fromisoformat(record["timestamp"]) - _EPOCH) // _MICROSECOND)
+        self.type_codes.append(_TYPE_CODES[record["transaction_type"]])
+        self._account_refs.append(self._intern(record["account_id"]))
+        related = record.get("related_account_id")
+        self._related_refs.append(_NO_RELATED if related is None else self._intern(related))
+        self._description_refs.append(self._intern(record.get("description") or ""))
+
+    def extend(self, records: Iterable[Dict]):
+        for record in records:
+            self.append(record)
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def __getitem__(self, row: int) -> "TransactionRow":
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("TransactionBatch index out of range")
+        return TransactionRow(self, row)
+
+    def __iter__(self) -> Iterator["TransactionRow"]:
+        return (TransactionRow(self, row) for row in range(len(self)))
+
+    def signed_amounts(self) -> array:
+        """Each row's effect on its account's balance (see signed_amount())."""
+        debit_codes = {_TYPE_CODES[t] for t in DEBIT_TYPES}
+        transfer = _TYPE_CODES[TransactionType.TRANSFER.value]
+        signed = array('d', self.amounts)
+        for row, code in enumerate(self.type_codes):
+            if code in debit_codes or (code == transfer and
+                                       self._strings[self._description_refs[row]].startswith("Transfer to")):
+                signed[row] = -signed[row]
+        return signed
+
+    def net_change(self) -> float:
+        return sum(self.signed_amounts())
+
+    def to_dicts(self) -> List[Dict]:
+        return [row.to_dict() for row in self]
+
+
+class TransactionRow:
+    """A read-only view of one row of a TransactionBatch."""
+    __slots__ = ("_batch", "_row")
+
+    def __init__(self, batch: TransactionBatch, row: int):
+        self._batch = batch
+        self._row = row
+
+    @property
+    def transaction_id(self) -> str:
+        text = self._batch._text_ids.get(self._row)
+        if text is not None:
+            return text
+        start = self._row * 16
+        return _uuid_str(bytes(self._batch._ids[start:start + 16]))
+
+    @property
+    def account_id(self) -> str:
+        return self._batch._strings[self._batch._account_refs[self._row]]
+
+    @property
+    def amount(self) -> float:
+        return self._batch.amounts[self._row]
+
+    @property
+    def transaction_type(self) -> TransactionType:
+        return _TYPES[self._batch.type_codes[self._row]]
+
+    @property
+    def timestamp(self) -> datetime:
+        return _EPOCH + timedelta(microseconds=self._batch.timestamps[self._row])
+
+    @property
+    def description(self) -> str:
+        return self._batch._strings[self._batch._description_refs[self._row]]
+
+    @property
+    def related_account_id(self) -> Optional[str]:
+        ref = self._batch._related_refs[self._row]
+        return None if ref == _NO_RELATED else self._batch._strings[ref]
+
+    def to_dict(self) -> Dict:
+        return {
+            "transaction_id": self.transaction_id,
+            "account_id": self.account_id,
+            "amount": self.amount,
+            "transaction_type": self.transaction_type.value,
+            "timestamp": self.timestamp.isoformat(),
+            "description": self.description,
+            "related_account_id": self.related_account_id
+        }
+
+    def to_transaction(self) -> Transaction:
+        return Transaction(
+            transaction_id=self.transaction_id,
+            account_id=self.account_id,
+            amount=self.amount,
+            transaction_type=self.transaction_type,
+            timestamp=self.timestamp,
+            description=self.description,
+            related_account_id=self.related_account_id
+        )
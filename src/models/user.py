@@ -2,9 +2,10 @@ from dataclasses import dataclass, field
 from typing import List, Optional
 from datetime import datetime
 import hashlib
+from src.models.serialization import compile_serializers
 from src.utils.validators import validate_email, validate_phone
 
-@dataclass
+@dataclass(slots=True)
 class User:
     user_id: str
     username: str
@@ -33,28 +34,13 @@ class User:
         if account_id not in self.accounts:
             self.accounts.append(account_id)
 
-    def to_dict(self):
-        return {
-            "user_id": self.user_id,
-            "username": self.username,
-            "password_hash": self.password_hash,
-            "email": self.email,
-            "phone": self.phone,
-            "is_admin": self.is_admin,
-            "created_at": self.created_at.isoformat(),
-            "accounts": self.accounts
-        }
 
-    @classmethod
-    def from_dict(cls, data):
-        user = cls(
-            user_id=data["user_id"],
-            username=data["username"],
-            password_hash=data["password_hash"],
-            email=data["email"],
-            phone=data["phone"],
-            is_admin=data["is_admin"],
-            accounts=data.get("accounts", [])
-        )
-        user.created_at = datetime.fromisoformat(data["created_at"])
-        return user
+# Records are validated on load as well, like User(...) does.
+_to_dict, _from_dict = compile_serializers(
+    User,
+    load=["user_id", "username", "password_hash", "email", "phone", "is_admin", "created_at",
+          ("accounts", [])],
+    dump=["user_id", "username", "password_hash", "email", "phone", "is_admin", "created_at", "accounts"],
+    timestamps=["created_at"], lists=["accounts"], post_init=True)
+User.to_dict = _to_dict
+User.from_dict = staticmethod(_from_dict)
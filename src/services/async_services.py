@@ -0,0 +1,101 @@
+import asyncio
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Optional
+from src.models.account import Account
+from src.models.loan import Loan
+from src.models.transaction import Transaction
+from src.models.user import User
+from src.services.bank_service import BankService
+from src.services.loan_service import LoanService
+from src.services.report_service import ReportService
+from src.utils.persistence import PersistenceLayer, require_thread_safe
+
+class _AsyncFacade:
+    """
+    Runs the blocking methods of a synchronous service on a bounded thread
+    pool, so an event loop can await them while other coroutines proceed.
+
+    Pass one `executor` to several facades to bound their I/O together;
+    otherwise each facade owns a pool of `max_workers` threads, shut down by
+    close(). The wrapped services run in thread-safe mode, so concurrent calls
+    on unrelated accounts or loans overlap. A persistence layer that is not
+    `thread_safe` is refused with ValueError.
+    """
+    def __init__(self, persistence: PersistenceLayer, executor: Optional[Executor], max_workers: int):
+        require_thread_safe(persistence, type(self).__name__)
+        self._owns_executor = executor is None
+        self._executor = executor if executor is not None else ThreadPoolExecutor(max_workers=max_workers)
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def close(self):
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+
+class AsyncBankService(_AsyncFacade):
+    def __init__(self, persistence: PersistenceLayer, executor: Executor = None, max_workers: int = 16):
+        super().__init__(persistence, executor, max_workers)
+        self.service = BankService(persistence, thread_safe=True)
+
+    async def create_account(self, user: User, account_type: str, initial_deposit: float = 0.0, **kwargs) -> Account:
+        return await self._run(self.service.create_account, user, account_type, initial_deposit, **kwargs)
+
+    async def deposit(self, account_id: str, amount: float):
+        await self._run(self.service.deposit, account_id, amount)
+
+    async def withdraw(self, account_id: str, amount: float):
+        await self._run(self.service.withdraw, account_id, amount)
+
+    async def transfer(self, from_account_id: str, to_account_id: str, amount: float):
+        await self._run(self.service.transfer, from_account_id, to_account_id, amount)
+
+    async def get_user_accounts(self, user_id: str) -> List[Account]:
+        return await self._run(self.service.get_user_accounts, user_id)
+
+    async def get_account_transactions(self, account_id: str) -> List[Transaction]:
+        return await self._run(self.service.get_account_transactions, account_id)
+
+    async def calculate_interest(self) -> int:
+        return await self._run(self.service.calculate_interest)
+
+
+class AsyncLoanService(_AsyncFacade):
+    def __init__(self, persistence: PersistenceLayer, executor: Executor = None, max_workers: int = 16):
+        super().__init__(persistence, executor, max_workers)
+        self.service = LoanService(persistence, thread_safe=True)
+
+    async def apply_for_loan(self, user: User, amount: float, term_months: int) -> Loan:
+        return await self._run(self.service.apply_for_loan, user, amount, term_months)
+
+    async def approve_loan(self, loan_id: str):
+        await self._run(self.service.approve_loan, loan_id)
+
+    async def reject_loan(self, loan_id: str):
+        await self._run(self.service.reject_loan, loan_id)
+
+    async def repay_loan(self, loan_id: str, amount: float):
+        await self._run(self.service.repay_loan, loan_id, amount)
+
+    async def get_user_loans(self, user_id: str) -> List[Loan]:
+        return await self._run(self.service.get_user_loans, user_id)
+
+    async def get_pending_loans(self) -> List[Loan]:
+        return await self._run(self.service.get_pending_loans)
+
+
+class AsyncReportService(_AsyncFacade):
+    def __init__(self, persistence: PersistenceLayer, executor: Executor = None, max_workers: int = 16):
+        super().__init__(persistence, executor, max_workers)
+        self.service = ReportService(persistence)
+
+    async def generate_account_statement(self, account_id: str, start: datetime = None, end: datetime = None,
+                                         running_balance: bool = False) -> str:
+        return await self._run(self.service.generate_account_statement, account_id, start, end, running_balance)
+
+    async def generate_admin_report(self) -> str:
+        return await self._run(self.service.generate_admin_report)
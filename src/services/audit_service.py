@@ -1,6 +1,6 @@
 import datetime
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 
 class AuditService:
     """
@@ -26,6 +26,19 @@ class AuditService:
         with open(self.log_file, "a") as f:
             f.write(log_entry)
 
+    def log_actions(self, entries: List[Tuple[str, str, str]], status: str = "SUCCESS"):
+        """
+        Logs many (user_id, action, details) entries with a single write.
+        """
+        timestamp = datetime.datetime.now().isoformat()
+        lines = [f"[{timestamp}] USER:{user_id} ACTION:{action} STATUS:{status} DETAILS:{details}\n"
+                 for user_id, action, details in entries]
+        if not lines:
+            return
+
+        with open(self.log_file, "a") as f:
+            f.write("".join(lines))
+
     def log_system_event(self, event: str, severity: str = "INFO"):
         """
         Logs a system-level event (e.g., startup, shutdown, errors).
@@ -0,0 +1,102 @@
+import bisect
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.models.transaction import signed_amount
+from src.utils.persistence import PersistenceLayer
+
+def _next_month_start(timestamp: str) -> datetime:
+    year, month = int(timestamp[:4]), int(timestamp[5:7])
+    return datetime(year + month // 12, month % 12 + 1, 1)
+
+class BalanceService:
+    """
+    Historical balances from the transaction ledger, using balance checkpoints.
+
+    A checkpoint records an account's balance at the start of a month, counting
+    every transaction timestamped before it. balance_at() starts from the last
+    checkpoint at or before the requested time and replays only the
+    transactions after it. Month starts crossed during that replay are saved as
+    new checkpoints, and rebuild_checkpoints() recomputes every account's
+    checkpoints from the full ledger (e.g. after importing backdated data).
+
+    Checkpoints are only saved up to the present, so new transactions land
+    after them. Writers that post backdated transactions (interest and fee
+    runs with `as_of`) call invalidate_checkpoints() to drop the checkpoints
+    those transactions fall before.
+    """
+    def __init__(self, persistence: PersistenceLayer):
+        self.persistence = persistence
+
+    def balance_at(self, account_id: str, when: datetime) -> float:
+        """Balance of the account just before `when` (transactions at or after it are excluded)."""
+        checkpoints = self.persistence.get_balance_checkpoints(account_id)
+        position = bisect.bisect_right([c["as_of"] for c in checkpoints], when.isoformat())
+        base = checkpoints[position - 1] if position else None
+        start = base["as_of"] if base else None
+
+        transactions = self.persistence.get_transactions_for_account(account_id, start, when)
+        balance, new_checkpoints = self._replay(transactions, base["balance"] if base else 0.0, min(when, datetime.now()))
+        if new_checkpoints:
+            merged = checkpoints[:position] + new_checkpoints + checkpoints[position:]
+            self.persistence.save_balance_checkpoints({"account_id": account_id, "checkpoints": merged})
+        return balance
+
+    def opening_balance(self, account_id: str, start: datetime) -> float:
+        return self.balance_at(account_id, start)
+
+    def rebuild_checkpoints(self) -> int:
+        """Recomputes all checkpoints from the ledger; returns how many were written."""
+        by_account: Dict[str, List[Dict]] = defaultdict(list)
+        for tx in self.persistence.get_all_transactions():
+            by_account[tx["account_id"]].append(tx)
+
+        now = datetime.now()
+        total = 0
+        with self.persistence.unit_of_work():
+            for account_id, transactions in by_account.items():
+                _, checkpoints = self._replay(transactions, 0.0, now)
+                self.persistence.save_balance_checkpoints({"account_id": account_id, "checkpoints": checkpoints})
+                total += len(checkpoints)
+        return total
+
+    def invalidate_checkpoints(self, transactions: Iterable[Dict]) -> int:
+        """
+        Drops each account's checkpoints later than its earliest transaction
+        among `transactions`, so balance_at() replays across them again;
+        returns how many were dropped.
+        """
+        earliest: Dict[str, str] = {}
+        for tx in transactions:
+            account_id = tx["account_id"]
+            if account_id not in earliest or tx["timestamp"] < earliest[account_id]:
+                earliest[account_id] = tx["timestamp"]
+
+        dropped = 0
+        for account_id, timestamp in earliest.items():
+            checkpoints = self.persistence.get_balance_checkpoints(account_id)
+            kept = [c for c in checkpoints if c["as_of"] <= timestamp]
+            if len(kept) < len(checkpoints):
+                self.persistence.save_balance_checkpoints({"account_id": account_id, "checkpoints": kept})
+                dropped += len(checkpoints) - len(kept)
+        return dropped
+
+    def _replay(self, transactions: List[Dict], balance: float, until: datetime) -> Tuple[float, List[Dict]]:
+        """
+        Applies transactions in timestamp order. Returns the final balance and a
+        checkpoint for the first month start after each run of transactions,
+        limited to month starts no later than `until` (so later writes cannot
+        land before them).
+        """
+        checkpoints = []
+        boundary: Optional[datetime] = None
+        for tx in sorted(transactions, key=lambda t: t["timestamp"]):
+            if boundary is not None and tx["timestamp"] >= boundary.isoformat():
+                checkpoints.append({"as_of": boundary.isoformat(), "balance": balance})
+                boundary = None
+            balance += signed_amount(tx)
+            if boundary is None:
+                boundary = _next_month_start(tx["timestamp"])
+        if boundary is not None and boundary <= until:
+            checkpoints.append({"as_of": boundary.isoformat(), "balance": balance})
+        return balance, [c for c in checkpoints if c["as_of"] <= until.isoformat()]
@@ -1,19 +1,66 @@
+import math
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from src.models.account import Account, SavingsAccount, CurrentAccount, FixedDepositAccount
-from src.models.transaction import Transaction, TransactionType
+from src.models.payment import BatchReport, PaymentResult
+from src.models.transaction import Transaction, TransactionType, journal_entry, transaction_legs
+from src.models.transaction_batch import TransactionBatch
 from src.models.user import User
 from src.services.fraud_service import FraudDetectionService
 from src.services.audit_service import AuditService
+from src.services.fee_engine import FeeEngine, FeeSummary
+from src.services.fraud_pipeline import FraudPipeline
+from src.services.interest_engine import DAYS_PER_YEAR, InterestEngine, InterestSummary
 from src.utils.persistence import PersistenceLayer
+from src.utils.striped_locks import StripedLocks
 from src.utils.validators import ValidationError
 
 class BankService:
-    def __init__(self, persistence: PersistenceLayer):
+    """
+    Account operations. With thread_safe=True one service can be shared by
+    many threads: each operation holds the striped locks of the accounts it
+    touches for its whole unit of work, so the balance check and update are
+    atomic while operations on unrelated accounts run in parallel.
+
+    After start_fraud_pipeline(), deposits, withdrawals and transfers hand
+    their fraud checks to a background FraudPipeline once committed, instead
+    of running them inside the unit of work; close() drains it.
+    """
+    def __init__(self, persistence: PersistenceLayer, thread_safe: bool = False, lock_stripes: int = 64):
         self.persistence = persistence
         self.fraud_service = FraudDetectionService(persistence)
         self.audit_service = AuditService()
+        self.interest_engine = InterestEngine(persistence)
+        self.fee_engine = FeeEngine(persistence)
+        self._account_locks = StripedLocks(lock_stripes) if thread_safe else None
+        self.fraud_pipeline: Optional[FraudPipeline] = None
+
+    def start_fraud_pipeline(self, **options) -> FraudPipeline:
+        """Moves fraud checks to a background pipeline; `options` are passed to FraudPipeline."""
+        if self.fraud_pipeline is None:
+            self.fraud_pipeline = FraudPipeline(self.fraud_service, on_flag=self._report_flag, **options)
+        return self.fraud_pipeline
+
+    def close(self):
+        """Finishes the queued fraud checks and stops the pipeline, if one is running."""
+        if self.fraud_pipeline is not None:
+            self.fraud_pipeline.close()
+            self.fraud_pipeline = None
+
+    def _report_flag(self, tx: Transaction, user_id: Optional[str], reasons: List[str]):
+        print(f"WARNING: Transaction {tx.transaction_id} flagged for review.")
+        if user_id is not None:
+            self.audit_service.log_action(user_id, "FRAUD_ALERT", f"Tx: {tx.transaction_id}")
+
+    @contextmanager
+    def _locked(self, *account_ids: str):
+        if self._account_locks is None:
+            yield
+            return
+        with self._account_locks.hold(*account_ids):
+            yield
 
     def create_account(self, user: User, account_type: str, initial_deposit: float = 0.0, **kwargs) -> Account:
         account_id = str(uuid.uuid4())
@@ -29,42 +76,54 @@ class BankService:
         else:
             raise ValidationError("Invalid account type.")
 
-        # Initial Deposit
-        if initial_deposit > 0:
-            account.deposit(initial_deposit)
-            self._log_transaction(account_id, initial_deposit, TransactionType.DEPOSIT, "Initial Deposit")
+        # Account, initial deposit and user update are committed together
+        with self.persistence.unit_of_work():
+            # Initial Deposit
+            if initial_deposit > 0:
+                account.deposit(initial_deposit)
+                self._log_transaction(account_id, initial_deposit, TransactionType.DEPOSIT, "Initial Deposit")
 
-        # Save Account
-        self.persistence.save_account(account.to_dict())
-        
-        # Update User
-        user.add_account(account_id)
-        self.persistence.save_user(user.to_dict())
+            # Save Account
+            self.persistence.save_account(account.to_dict())
+            
+            # Update User
+            user.add_account(account_id)
+            self.persistence.save_user(user.to_dict())
         
         self.audit_service.log_action(user.user_id, "CREATE_ACCOUNT", f"Type: {account_type}, ID: {account_id}")
         return account
 
     def deposit(self, account_id: str, amount: float):
-        account = self._get_account(account_id)
-        account.deposit(amount)
-        self.persistence.save_account(account.to_dict())
-        tx = self._log_transaction(account_id, amount, TransactionType.DEPOSIT, "Deposit")
-        
-        # Check for fraud
-        if self.fraud_service.analyze_transaction(tx):
+        with self._locked(account_id), self.persistence.unit_of_work():
+            account = self._get_account(account_id)
+            account.deposit(amount)
+            self.persistence.save_account(account.to_dict())
+            tx = self._log_transaction(account_id, amount, TransactionType.DEPOSIT, "Deposit")
+            
+            # Check for fraud (after the commit, in the background, if a pipeline runs)
+            flagged = self.fraud_pipeline is None and self.fraud_service.analyze_transaction(tx)
+        if self.fraud_pipeline is not None:
+            flagged = self.fraud_pipeline.submit(tx, account.user_id)
+
+        if flagged:
             print(f"WARNING: Transaction {tx.transaction_id} flagged for review.")
             self.audit_service.log_action(account.user_id, "FRAUD_ALERT", f"Tx: {tx.transaction_id}")
         
         self.audit_service.log_action(account.user_id, "DEPOSIT", f"Amount: {amount}, Acc: {account_id}")
 
     def withdraw(self, account_id: str, amount: float):
-        account = self._get_account(account_id)
-        account.withdraw(amount)
-        self.persistence.save_account(account.to_dict())
-        tx = self._log_transaction(account_id, amount, TransactionType.WITHDRAWAL, "Withdrawal")
+        with self._locked(account_id), self.persistence.unit_of_work():
+            account = self._get_account(account_id)
+            account.withdraw(amount)
+            self.persistence.save_account(account.to_dict())
+            tx = self._log_transaction(account_id, amount, TransactionType.WITHDRAWAL, "Withdrawal")
 
-        # Check for fraud
-        if self.fraud_service.analyze_transaction(tx):
+            # Check for fraud (after the commit, in the background, if a pipeline runs)
+            flagged = self.fraud_pipeline is None and self.fraud_service.analyze_transaction(tx)
+        if self.fraud_pipeline is not None:
+            flagged = self.fraud_pipeline.submit(tx, account.user_id)
+
+        if flagged:
             print(f"WARNING: Transaction {tx.transaction_id} flagged for review.")
             self.audit_service.log_action(account.user_id, "FRAUD_ALERT", f"Tx: {tx.transaction_id}")
 
@@ -74,51 +133,178 @@ class BankService:
         if from_account_id == to_account_id:
             raise ValidationError("Cannot transfer to the same account.")
         
-        from_acc = self._get_account(from_account_id)
-        to_acc = self._get_account(to_account_id)
+        # Both legs are committed as one batch, so a failure never leaves half a transfer.
+        # Both accounts are locked in stripe order, so opposite transfers cannot deadlock.
+        with self._locked(from_account_id, to_account_id), self.persistence.unit_of_work():
+            from_acc = self._get_account(from_account_id)
+            to_acc = self._get_account(to_account_id)
+
+            # Check withdrawal first
+            if not from_acc.can_withdraw(amount):
+                raise ValidationError("Insufficient funds for transfer.")
 
-        # Check withdrawal first
-        if not from_acc.can_withdraw(amount):
-            raise ValidationError("Insufficient funds for transfer.")
+            from_acc.withdraw(amount)
+            to_acc.deposit(amount)
 
-        # Perform Transfer (Atomic-ish)
-        from_acc.withdraw(amount)
-        to_acc.deposit(amount)
+            self.persistence.save_account(from_acc.to_dict())
+            self.persistence.save_account(to_acc.to_dict())
 
-        self.persistence.save_account(from_acc.to_dict())
-        self.persistence.save_account(to_acc.to_dict())
+            # One double-entry journal record; statements of both accounts show their leg.
+            entry, debit, credit = self._journal_transfer(from_account_id, to_account_id, amount)
+            self.persistence.log_transaction(entry)
 
-        self._log_transaction(from_account_id, amount, TransactionType.TRANSFER, f"Transfer to {to_account_id}", related_account_id=to_account_id)
-        tx = self._log_transaction(to_account_id, amount, TransactionType.TRANSFER, f"Transfer from {from_account_id}", related_account_id=from_account_id)
+            # Check both legs for fraud: the outflow from the sender and the money reaching the receiver
+            legs = ((debit, from_acc.user_id), (credit, to_acc.user_id))
+            flagged = [] if self.fraud_pipeline is not None else [
+                tx for tx, _ in legs if self.fraud_service.analyze_transaction(tx)]
+        if self.fraud_pipeline is not None:
+            flagged = [tx for tx, user_id in legs if self.fraud_pipeline.submit(tx, user_id)]
 
-        # Check for fraud (on the receiver side mainly for money laundering logic, but check both in real life)
-        if self.fraud_service.analyze_transaction(tx):
+        for tx in flagged:
             print(f"WARNING: Transaction {tx.transaction_id} flagged for review.")
 
+    def execute_batch(self, payments: Iterable[Dict], requested_by: User = None) -> BatchReport:
+        """
+        Executes a batch of transfers (e.g. a payroll file) in one pass.
+
+        Each payment is a dict with from_account_id, to_account_id, amount and
+        an optional reference. Every row is validated first; the valid ones are
+        then applied in order to accounts loaded once into memory, so a credit
+        early in the batch can fund a debit later on. A row that fails (unknown
+        account, insufficient funds, ...) is skipped without affecting the
+        others. Balances, ledger rows and fraud flags for the whole batch are
+        written in one unit of work, and audit entries in one append. While a
+        fraud pipeline runs, both legs of every payment are submitted to it
+        once committed, as transfer() does; a row is then marked flagged only
+        if a leg was flagged synchronously.
+
+        If `requested_by` is given and is not an admin, rows may only debit
+        that user's accounts. Returns a per-row BatchReport.
+        """
+        report = BatchReport()
+        pending = []
+        for row, payment in enumerate(payments, 1):
+            result, reference = self._validate_payment(row, payment)
+            report.results.append(result)
+            if not result.error:
+                pending.append((result, reference))
+
+        restrict_to = requested_by.user_id if requested_by is not None and not requested_by.is_admin else None
+        account_ids = {account_id for result, _ in pending
+                       for account_id in (result.from_account_id, result.to_account_id)}
+        audit_entries = []
+        with self._locked(*account_ids), self.persistence.unit_of_work():
+            accounts = {}
+            for account_id in account_ids:
+                data = self.persistence.get_account(account_id)
+                if data:
+                    accounts[account_id] = Account.from_dict(data)
+
+            changed, transactions, flags, submissions = {}, [], [], []
+            for result, reference in pending:
+                source = accounts.get(result.from_account_id)
+                target = accounts.get(result.to_account_id)
+                if source is None or target is None:
+                    result.error = "Account not found."
+                    continue
+                if restrict_to is not None and source.user_id != restrict_to:
+                    result.error = "Access denied to source account."
+                    continue
+                if not source.can_withdraw(result.amount):
+                    result.error = "Insufficient funds for transfer."
+                    continue
+
+                source.withdraw(result.amount)
+                target.deposit(result.amount)
+                changed[source.account_id] = source
+                changed[target.account_id] = target
+
+                entry, debit, credit = self._journal_transfer(source.account_id, target.account_id,
+                                                              result.amount, reference)
+                transactions.append(entry)
+                result.success = True
+                result.transaction_id = credit.transaction_id
+
+                for leg, owner in ((debit, source), (credit, target)):
+                    if self.fraud_pipeline is not None:
+                        submissions.append((result, leg, owner.user_id))
+                        continue
+                    reasons = self.fraud_service.evaluate(leg)
+                    if reasons:
+                        result.flagged = True
+                        flags.append(self.fraud_service.flag_record(leg, reasons))
+                        audit_entries.append((owner.user_id, "FRAUD_ALERT", f"Tx: {leg.transaction_id}"))
+                audit_entries.append((source.user_id, "TRANSFER",
+                                      f"Amount: {result.amount}, From: {source.account_id}, "
+                                      f"To: {target.account_id}, Batch row: {result.row}"))
+
+            if changed:
+                self.persistence.save_accounts([account.to_dict() for account in changed.values()])
+                self.persistence.log_transactions(transactions)
+            if flags:
+                self.persistence.save_fraud_flags(flags)
+        for result, leg, user_id in submissions:
+            if self.fraud_pipeline.submit(leg, user_id):
+                result.flagged = True
+                audit_entries.append((user_id, "FRAUD_ALERT", f"Tx: {leg.transaction_id}"))
+
+        audit_entries.append((requested_by.user_id if requested_by is not None else "SYSTEM", "BATCH_TRANSFER",
+                              f"Rows: {len(report.results)}, Succeeded: {report.succeeded}, Failed: {report.failed}"))
+        self.audit_service.log_actions(audit_entries)
+        return report
+
+    def _validate_payment(self, row: int, payment: Dict) -> Tuple[PaymentResult, str]:
+        from_id = payment.get("from_account_id") or None
+        to_id = payment.get("to_account_id") or None
+        result = PaymentResult(row=row, from_account_id=from_id, to_account_id=to_id, amount=None, success=False)
+        reference = str(payment.get("reference") or "").strip()
+        try:
+            amount = float(payment.get("amount"))
+        except (TypeError, ValueError):
+            result.error = "Invalid amount."
+            return result, reference
+        result.amount = amount
+        if not from_id or not to_id:
+            result.error = "Missing account id."
+        elif from_id == to_id:
+            result.error = "Cannot transfer to the same account."
+        elif not math.isfinite(amount) or amount <= 0:
+            result.error = "Amount must be positive."
+        return result, reference
+
     def get_user_accounts(self, user_id: str) -> List[Account]:
         accounts_data = self.persistence.get_accounts_for_user(user_id)
         return [Account.from_dict(data) for data in accounts_data]
 
     def get_account_transactions(self, account_id: str) -> List[Transaction]:
         tx_data = self.persistence.get_transactions_for_account(account_id)
-        return [Transaction.from_dict(data) for data in tx_data]
-
-    def calculate_interest(self):
-        """Admin function to apply interest to all Savings Accounts."""
-        all_users = self.persistence.get_all_users()
-        count = 0
-        for user_data in all_users:
-            accounts_data = self.persistence.get_accounts_for_user(user_data["user_id"])
-            for acc_data in accounts_data:
-                if acc_data["account_type"] == "SAVINGS":
-                    acc = Account.from_dict(acc_data)
-                    interest = acc.balance * acc.interest_rate
-                    if interest > 0:
-                        acc.deposit(interest)
-                        self.persistence.save_account(acc.to_dict())
-                        self._log_transaction(acc.account_id, interest, TransactionType.INTEREST, "Annual Interest Applied")
-                        count += 1
-        return count
+        return [Transaction.from_dict(data, lazy_timestamps=True) for data in tx_data]
+
+    def get_account_transaction_batch(self, account_id: str, start: datetime = None, end: datetime = None) -> TransactionBatch:
+        """The account's history as a compact columnar batch, for long histories."""
+        return TransactionBatch(self.persistence.get_transactions_for_account(account_id, start, end))
+
+    def calculate_interest(self, period_days: int = DAYS_PER_YEAR, compounding: str = "simple") -> int:
+        """Admin function to apply interest to all Savings Accounts; returns how many were credited."""
+        return self.apply_interest(period_days, compounding).accounts
+
+    def apply_interest(self, period_days: int = DAYS_PER_YEAR, compounding: str = "simple",
+                       as_of: datetime = None) -> InterestSummary:
+        with self._locked_all():
+            return self.interest_engine.apply(period_days, compounding, as_of)
+
+    def apply_fees(self, period_days: int = 30, as_of: datetime = None) -> FeeSummary:
+        """Admin function to charge overdraft interest and maintenance fees on all Current Accounts."""
+        with self._locked_all():
+            return self.fee_engine.apply(period_days, as_of)
+
+    @contextmanager
+    def _locked_all(self):
+        if self._account_locks is None:
+            yield
+            return
+        with self._account_locks.hold_all():
+            yield
 
     def _get_account(self, account_id: str) -> Account:
         data = self.persistence.get_account(account_id)
@@ -127,7 +313,20 @@ class BankService:
         return Account.from_dict(data)
 
     def _log_transaction(self, account_id: str, amount: float, type: TransactionType, desc: str, related_account_id: str = None) -> Transaction:
-        tx = Transaction(
+        tx = self._new_transaction(account_id, amount, type, desc, related_account_id)
+        self.persistence.log_transaction(tx.to_dict())
+        return tx
+
+    def _journal_transfer(self, from_account_id: str, to_account_id: str, amount: float,
+                          memo: str = "") -> Tuple[Dict, Transaction, Transaction]:
+        """A transfer's journal entry, and its debit and credit legs as Transactions (for fraud checks)."""
+        entry = journal_entry(str(uuid.uuid4()), from_account_id, to_account_id, amount,
+                              datetime.now().isoformat(), memo)
+        debit, credit = transaction_legs(entry)
+        return entry, Transaction.from_dict(debit), Transaction.from_dict(credit)
+
+    def _new_transaction(self, account_id: str, amount: float, type: TransactionType, desc: str, related_account_id: str = None) -> Transaction:
+        return Transaction(
             transaction_id=str(uuid.uuid4()),
             account_id=account_id,
             amount=amount,
@@ -135,5 +334,3 @@ class BankService:
             description=desc,
             related_account_id=related_account_id
         )
-        self.persistence.log_transaction(tx.to_dict())
-        return tx
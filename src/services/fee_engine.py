@@ -0,0 +1,117 @@
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Tuple
+from src.models.transaction import Transaction, TransactionType
+from src.services.balance_service import BalanceService
+from src.services.interest_engine import DAYS_PER_YEAR
+from src.utils.persistence import PersistenceLayer
+from src.utils.validators import ValidationError
+
+try:
+    import numpy as np
+except ImportError:  # optional, as in interest_engine
+    np = None
+
+OVERDRAFT_RATE = 0.18
+MAINTENANCE_FEE = 5.0
+FEE_WAIVER_BALANCE = 1000.0
+
+@dataclass
+class FeeSummary:
+    accounts: int
+    overdraft_interest: float
+    maintenance_fees: float
+    period_days: int
+
+    @property
+    def total_fees(self) -> float:
+        return self.overdraft_interest + self.maintenance_fees
+
+    def to_dict(self):
+        return {
+            "accounts": self.accounts,
+            "overdraft_interest": self.overdraft_interest,
+            "maintenance_fees": self.maintenance_fees,
+            "total_fees": self.total_fees,
+            "period_days": self.period_days
+        }
+
+
+class FeeEngine:
+    """
+    Assesses fees on every current account in one pass.
+
+    For an accrual period of `period_days`, an overdrawn account is charged
+    interest on the overdrawn amount at `overdraft_rate` a year (simple
+    interest), and an account whose balance is below `waiver_balance` is
+    charged the flat `maintenance_fee` (0 disables it). Both are computed from
+    the balance before the run and logged as separate FEE transactions.
+    Fees are charged even if they take an account past its overdraft limit.
+
+    As in InterestEngine, the balances are loaded once and assessed in one
+    pass (one NumPy operation when NumPy is installed), and the updated
+    accounts and FEE transactions are written with
+    save_accounts()/log_transactions() in one unit of work.
+    Fees backdated with `as_of` invalidate the balance checkpoints they fall
+    before.
+    """
+    def __init__(self, persistence: PersistenceLayer, overdraft_rate: float = OVERDRAFT_RATE,
+                 maintenance_fee: float = MAINTENANCE_FEE, waiver_balance: float = FEE_WAIVER_BALANCE):
+        self.persistence = persistence
+        self.overdraft_rate = overdraft_rate
+        self.maintenance_fee = maintenance_fee
+        self.waiver_balance = waiver_balance
+
+    def compute(self, balances, period_days: int) -> Tuple[List[float], List[float]]:
+        """(overdraft interest, maintenance fee) for each balance, 0.0 where nothing is owed."""
+        if period_days <= 0:
+            raise ValidationError("Accrual period must be at least one day.")
+        factor = self.overdraft_rate * period_days / DAYS_PER_YEAR
+        if np is not None:
+            column = np.asarray(balances, dtype=np.float64)
+            return (np.where(column < 0, -column * factor, 0.0).tolist(),
+                    np.where(column < self.waiver_balance, self.maintenance_fee, 0.0).tolist())
+        return ([-balance * factor if balance < 0 else 0.0 for balance in balances],
+                [self.maintenance_fee if balance < self.waiver_balance else 0.0 for balance in balances])
+
+    def apply(self, period_days: int = 30, as_of: datetime = None) -> FeeSummary:
+        timestamp = as_of or datetime.now()
+
+        with self.persistence.unit_of_work():
+            current = [a for a in self.persistence.get_all_accounts() if a["account_type"] == "CURRENT"]
+            interest, fees = self.compute([a["balance"] for a in current], period_days)
+
+            updated: List[Dict] = []
+            transactions: List[Dict] = []
+            for account, owed_interest, fee in zip(current, interest, fees):
+                if owed_interest <= 0 and fee <= 0:
+                    continue
+                updated.append(dict(account, balance=account["balance"] - owed_interest - fee))
+                if owed_interest > 0:
+                    transactions.append(self._fee(account["account_id"], owed_interest, timestamp,
+                                                  f"Overdraft Interest ({period_days} days)"))
+                if fee > 0:
+                    transactions.append(self._fee(account["account_id"], fee, timestamp, "Maintenance Fee"))
+            if updated:
+                self.persistence.save_accounts(updated)
+                self.persistence.log_transactions(transactions)
+                if as_of is not None:
+                    BalanceService(self.persistence).invalidate_checkpoints(transactions)
+
+        return FeeSummary(
+            accounts=len(updated),
+            overdraft_interest=sum(interest),
+            maintenance_fees=sum(fees),
+            period_days=period_days
+        )
+
+    def _fee(self, account_id: str, amount: float, timestamp: datetime, description: str) -> Dict:
+        return Transaction(
+            transaction_id=str(uuid.uuid4()),
+            account_id=account_id,
+            amount=amount,
+            transaction_type=TransactionType.FEE,
+            timestamp=timestamp,
+            description=description
+        ).to_dict()
@@ -0,0 +1,164 @@
+import queue
+import sys
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+from src.models.transaction import Transaction
+from src.services.fraud_rules import Verdict
+from src.services.fraud_service import FraudDetectionService
+from src.utils.persistence import require_thread_safe
+from src.utils.shutdown import close_at_exit, discard_at_exit
+
+_STOP = object()
+
+FlagCallback = Callable[[Transaction, Optional[str], List[str]], None]
+
+# A queued check: the transaction, its owner, and its screen() verdict if it was screened on submit.
+_Item = Tuple[Transaction, Optional[str], Optional[Verdict]]
+
+
+class FraudPipeline:
+    """
+    Runs fraud checks on a background thread, off the request path.
+
+    submit() puts a committed transaction on a bounded queue and returns at
+    once. A worker thread takes up to `batch_size` queued transactions at a
+    time (waiting at most `flush_interval` seconds to fill a batch), runs the
+    fraud rules on each, and saves the batch's flags with one
+    save_fraud_flags() call; `on_flag(transaction, user_id, reasons)` is then
+    called for every flagged transaction.
+
+    - Backpressure: when `max_queue` checks are waiting, submit() blocks until
+      the worker catches up, so a burst cannot grow memory without bound.
+    - High-risk escape hatch: a transaction of at least `sync_threshold` is
+      screened by the history-free rules, and its flag saved, before submit()
+      returns. It is still queued, so the worker runs the stateful rules
+      (velocity) on every transaction in submission order; they flag it
+      there only if the screen did not.
+    - Drain on shutdown: close() (also run at interpreter exit) processes
+      everything already queued before stopping the worker; drain() waits for
+      the queue to empty without stopping it. Submissions after close() are
+      checked synchronously.
+
+    The fraud service's persistence layer must be `thread_safe` (ValueError
+    otherwise), since the worker thread writes the flags.
+    """
+    def __init__(self, fraud_service: FraudDetectionService, max_queue: int = 10000, batch_size: int = 100,
+                 flush_interval: float = 0.05, sync_threshold: float = 10000.0, on_flag: FlagCallback = None):
+        require_thread_safe(fraud_service.persistence, "FraudPipeline")
+        self.fraud_service = fraud_service
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sync_threshold = sync_threshold
+        self.on_flag = on_flag
+        self.processed = 0
+        self.flagged = 0
+        self.errors = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="fraud-pipeline", daemon=True)
+        self._worker.start()
+        close_at_exit(self)
+
+    def submit(self, transaction: Transaction, user_id: str = None) -> bool:
+        """
+        Queues a transaction for checking. Returns True only if it was flagged
+        synchronously (high-risk, or the pipeline is closed).
+        """
+        screened = None
+        if transaction.amount >= self.sync_threshold:
+            screened = self.fraud_service.screen(transaction)
+            if screened.flagged:
+                self.fraud_service.persistence.save_fraud_flag(
+                    self.fraud_service.flag_record(transaction, screened.reasons))
+        # Held while enqueueing, so nothing can be queued behind close()'s stop marker.
+        with self._close_lock:
+            if not self._closed:
+                self._queue.put((transaction, user_id, screened))
+                return screened is not None and screened.flagged
+        if screened is None:
+            return self.fraud_service.analyze_transaction(transaction)
+        reasons = self.fraud_service.evaluate_history(transaction, screened)
+        if reasons and not screened.flagged:
+            self.fraud_service.persistence.save_fraud_flag(self.fraud_service.flag_record(transaction, reasons))
+        return bool(reasons)
+
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    def drain(self):
+        """Blocks until every queued transaction has been checked and its flag saved."""
+        self._queue.join()
+
+    def close(self):
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._worker.join()
+        discard_at_exit(self)
+
+    # Worker
+    def _run(self):
+        while True:
+            batch, stop = self._next_batch()
+            if batch:
+                try:
+                    self._process(batch)
+                except Exception as e:  # e.g. a failing on_flag; keep the worker alive
+                    self.errors += 1
+                    print(f"Fraud pipeline error: {e}", file=sys.stderr)
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _next_batch(self) -> Tuple[List[_Item], bool]:
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _process(self, batch: List[_Item]):
+        flagged = []
+        for transaction, user_id, screened in batch:
+            try:
+                if screened is None:
+                    reasons = self.fraud_service.evaluate(transaction)
+                else:
+                    reasons = self.fraud_service.evaluate_history(transaction, screened)
+                    if screened.flagged:
+                        reasons = []  # flagged, and reported, by submit()
+            except Exception as e:
+                self.errors += 1
+                print(f"Fraud check failed for {transaction.transaction_id}: {e}", file=sys.stderr)
+                continue
+            if reasons:
+                flagged.append((transaction, user_id, reasons))
+        self.processed += len(batch)
+        if not flagged:
+            return
+        try:
+            self.fraud_service.persistence.save_fraud_flags(
+                [self.fraud_service.flag_record(transaction, reasons) for transaction, _, reasons in flagged])
+        except Exception as e:
+            self.errors += len(flagged)
+            print(f"Saving {len(flagged)} fraud flags failed: {e}", file=sys.stderr)
+            return
+        self.flagged += len(flagged)
+        if self.on_flag is not None:
+            for transaction, user_id, reasons in flagged:
+                self.on_flag(transaction, user_id, reasons)
@@ -0,0 +1,244 @@
+import heapq
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+from src.models.transaction import Transaction
+from src.services.velocity_tracker import VelocityTracker, is_tracked
+from src.utils.keyword_matcher import KeywordMatcher
+
+class FraudRule:
+    """
+    One fraud check. `name` identifies the rule (and is the reason it
+    reports); `cost` is a relative estimate of one check, so the engine can
+    run cheap rules first; `weight` is the risk a hit adds; `depends_on`
+    names rules that must run before this one, whose hits check() receives.
+
+    A `stateful` rule keeps history (e.g. a velocity window) and must see
+    every transaction, so it still runs after the engine has stopped early.
+    """
+    name = ""
+    cost = 1.0
+    weight = 1.0
+    depends_on: Tuple[str, ...] = ()
+    stateful = False
+
+    def check(self, transaction: Transaction, hits: Dict[str, List[str]]) -> List[str]:
+        """The reasons the transaction is suspicious under this rule (empty if it is not)."""
+        raise NotImplementedError
+
+
+class LargeAmountRule(FraudRule):
+    name = "Large transaction amount"
+
+    def __init__(self, limit: float = 10000.0):
+        self.limit = limit
+
+    def check(self, transaction: Transaction, hits: Dict[str, List[str]]) -> List[str]:
+        return [self.name] if transaction.amount > self.limit else []
+
+
+class RoundAmountRule(FraudRule):
+    """
+    Round thousands are a weak signal: on its own a hit stays below the
+    default threshold, but it tips a transaction another weak rule finds
+    suspicious. Amounts the large-amount rule already flags are not counted
+    twice.
+    """
+    name = "Round amount"
+    weight = 0.5
+    depends_on = (LargeAmountRule.name,)
+
+    def check(self, transaction: Transaction, hits: Dict[str, List[str]]) -> List[str]:
+        if LargeAmountRule.name in hits:
+            return []
+        return [self.name] if transaction.amount % 1000 == 0 and transaction.amount > 1000 else []
+
+
+class HighRiskMerchantRule(FraudRule):
+    name = "High risk merchant"
+    cost = 5.0
+
+    def __init__(self, merchants: KeywordMatcher):
+        self.merchants = merchants
+
+    def check(self, transaction: Transaction, hits: Dict[str, List[str]]) -> List[str]:
+        return [self.name] if self.merchants.search(transaction.description) else []
+
+
+class VelocityRule(FraudRule):
+    """
+    Too many transactions, or too much money, on one account within the
+    tracker's window. The window is warmed from the ledger before the first
+    check.
+    """
+    name = "High velocity"
+    cost = 20.0
+    stateful = True
+
+    def __init__(self, tracker: VelocityTracker, persistence):
+        self.tracker = tracker
+        self.persistence = persistence
+
+    def check(self, transaction: Transaction, hits: Dict[str, List[str]]) -> List[str]:
+        if not is_tracked(transaction.to_dict()):
+            return []
+        self.tracker.ensure_warm(self.persistence.get_all_transactions, now=transaction.timestamp,
+                                 exclude=[transaction.transaction_id])
+        return self.tracker.observe(transaction.account_id, transaction.timestamp, transaction.amount)
+
+
+@dataclass
+class RuleStats:
+    evaluations: int = 0
+    hits: int = 0
+    skipped: int = 0
+    total_time: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.evaluations if self.evaluations else 0.0
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.evaluations if self.evaluations else 0.0
+
+    def to_dict(self) -> dict:
+        return {"evaluations": self.evaluations, "hits": self.hits, "skipped": self.skipped,
+                "hit_rate": self.hit_rate, "total_time": self.total_time, "mean_time": self.mean_time}
+
+
+@dataclass
+class Verdict:
+    score: float = 0.0
+    reasons: List[str] = field(default_factory=list)
+    flagged: bool = False
+
+
+class RuleEngine:
+    """
+    Runs registered FraudRules in order of cost, each after the rules it
+    depends on. Once the hits' weights reach `risk_threshold` the
+    transaction is flagged and the remaining rules are skipped, except
+    stateful ones.
+
+    Per-rule evaluation counts, hits, skips and cumulative time are kept in
+    `stats` (see stats_report()); updates are locked, since the fraud
+    pipeline and callers can evaluate at the same time.
+    """
+    def __init__(self, rules: Iterable[FraudRule] = (), risk_threshold: float = 1.0):
+        self.risk_threshold = risk_threshold
+        self.rules: Dict[str, FraudRule] = {}
+        self.stats: Dict[str, RuleStats] = {}
+        self._order: List[FraudRule] = []
+        self._lock = threading.Lock()
+        self.register(*rules)
+
+    def register(self, *rules: FraudRule, replace: bool = False):
+        """
+        Adds rules; their dependencies may be among the same call's rules.
+        With replace=True a rule takes the place of the registered rule of the
+        same name (e.g. one with a different limit), so the rules depending on
+        it stay valid; its statistics start again from zero.
+        """
+        registered = dict(self.rules)
+        for rule in rules:
+            if rule.name in registered and not replace:
+                raise ValueError(f"Fraud rule already registered: {rule.name}")
+            registered[rule.name] = rule
+        order = self._plan(registered)
+        with self._lock:
+            self.rules, self._order = registered, order
+            for rule in rules:
+                if replace or rule.name not in self.stats:
+                    self.stats[rule.name] = RuleStats()
+
+    def unregister(self, name: str):
+        dependents = sorted(key for key, rule in self.rules.items() if name in rule.depends_on)
+        if dependents:
+            raise ValueError(f"Cannot unregister fraud rule {name}: {', '.join(dependents)} depend(s) on it; "
+                             f"use register(rule, replace=True) to swap it")
+        rules = {key: rule for key, rule in self.rules.items() if key != name}
+        order = self._plan(rules)
+        with self._lock:
+            self.rules, self._order = rules, order
+            self.stats.pop(name, None)
+
+    def stateless_rules(self) -> List[FraudRule]:
+        """The rules that need no history, in evaluation order; these can run in a worker process."""
+        return [rule for rule in self._order if not rule.stateful]
+
+    @property
+    def order(self) -> List[str]:
+        return [rule.name for rule in self._order]
+
+    @staticmethod
+    def _plan(rules: Dict[str, FraudRule]) -> List[FraudRule]:
+        # Topological order, taking the cheapest ready rule first (registration order breaks ties).
+        position = {name: n for n, name in enumerate(rules)}
+        waiting = {}
+        dependents = {name: [] for name in rules}
+        for name, rule in rules.items():
+            for dependency in rule.depends_on:
+                if dependency not in rules:
+                    raise ValueError(f"Fraud rule {name} depends on unknown rule {dependency}")
+                dependents[dependency].append(name)
+            waiting[name] = len(rule.depends_on)
+        ready = [(rule.cost, position[name], name) for name, rule in rules.items() if not waiting[name]]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            _, _, name = heapq.heappop(ready)
+            order.append(rules[name])
+            for dependent in dependents[name]:
+                waiting[dependent] -= 1
+                if not waiting[dependent]:
+                    heapq.heappush(ready, (rules[dependent].cost, position[dependent], dependent))
+        if len(order) < len(rules):
+            cycle = sorted(name for name in rules if waiting[name])
+            raise ValueError(f"Fraud rule dependencies form a cycle: {', '.join(cycle)}")
+        return order
+
+    def evaluate(self, transaction: Transaction, stateful: bool = True, stateless: bool = True) -> Verdict:
+        """
+        Scores the transaction. With stateful=False the stateful rules are
+        left out, e.g. to score history-free rules in a worker process; with
+        stateless=False only the stateful rules run.
+        """
+        verdict = Verdict()
+        hits: Dict[str, List[str]] = {}
+        timings = []
+        skipped = []
+        for rule in self._order:
+            if not (stateful if rule.stateful else stateless):
+                continue
+            if verdict.score >= self.risk_threshold and not rule.stateful:
+                skipped.append(rule.name)
+                continue
+            start = time.perf_counter()
+            reasons = rule.check(transaction, hits)
+            timings.append((rule.name, time.perf_counter() - start, bool(reasons)))
+            if reasons:
+                hits[rule.name] = reasons
+                verdict.score += rule.weight
+                verdict.reasons.extend(reasons)
+        verdict.flagged = verdict.score >= self.risk_threshold
+
+        with self._lock:
+            for name, elapsed, hit in timings:
+                stats = self.stats[name]
+                stats.evaluations += 1
+                stats.hits += hit
+                stats.total_time += elapsed
+            for name in skipped:
+                self.stats[name].skipped += 1
+        return verdict
+
+    def stats_report(self) -> Dict[str, dict]:
+        """Per-rule statistics, in evaluation order."""
+        with self._lock:
+            return {rule.name: self.stats[rule.name].to_dict() for rule in self._order}
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {name: RuleStats() for name in self.rules}
@@ -1,50 +1,93 @@
+import os
 from typing import List
-from src.models.transaction import Transaction, TransactionType
+from src.models.transaction import Transaction
+from src.services.fraud_rules import (HighRiskMerchantRule, LargeAmountRule, RoundAmountRule, RuleEngine,
+                                      VelocityRule, Verdict)
+from src.services.velocity_tracker import VelocityTracker
+from src.utils.keyword_matcher import KeywordMatcher, ReloadingKeywordMatcher
 from src.utils.persistence import PersistenceLayer
 
+MERCHANTS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                              "config", "high_risk_merchants.txt")
+# Used while the merchants file is missing.
+DEFAULT_MERCHANTS = ("crypto", "gambling")
+
 class FraudDetectionService:
-    def __init__(self, persistence: PersistenceLayer):
+    """
+    Rule-based fraud checks, run by a RuleEngine (`engine`); more rules can
+    be added with engine.register(). A transaction is flagged once its hits
+    reach `risk_threshold`. The velocity rule's thresholds come from
+    `velocity` (a VelocityTracker); its windows are warmed from the ledger
+    before the first check. High-risk merchants are screened with
+    `merchants` (a KeywordMatcher), by default one reloaded from
+    config/high_risk_merchants.txt whenever the file changes.
+    """
+    def __init__(self, persistence: PersistenceLayer, velocity: VelocityTracker = None,
+                 merchants: KeywordMatcher = None, risk_threshold: float = 1.0):
         self.persistence = persistence
         self.flagged_transactions = []
+        self.velocity = velocity if velocity is not None else VelocityTracker()
+        self.merchants = merchants if merchants is not None else ReloadingKeywordMatcher(MERCHANTS_FILE, DEFAULT_MERCHANTS)
+        self.engine = RuleEngine([
+            LargeAmountRule(),
+            HighRiskMerchantRule(self.merchants),
+            RoundAmountRule(),
+            VelocityRule(self.velocity, persistence),
+        ], risk_threshold)
 
     def analyze_transaction(self, transaction: Transaction) -> bool:
         """
         Analyzes a transaction for fraud. Returns True if suspicious.
         """
-        is_suspicious = False
-        reasons = []
-
-        # Rule 1: Large Amount
-        if transaction.amount > 10000:
-            is_suspicious = True
-            reasons.append("Large transaction amount")
-
-        # Rule 2: Frequent transactions (mocked logic)
-        # In real life, we'd check DB for recent txs.
-        # Here we will check if the description contains "crypto" or "gambling"
-        if "crypto" in transaction.description.lower() or "gambling" in transaction.description.lower():
-            is_suspicious = True
-            reasons.append("High risk merchant")
-
-        # Rule 3: Round numbers often indicate fraud (weak rule but adds logic)
-        if transaction.amount % 1000 == 0 and transaction.amount > 1000:
-             # Just a heuristic for complexity
-             pass
-
-        if is_suspicious:
+        reasons = self.evaluate(transaction)
+        if reasons:
             self._flag_transaction(transaction, reasons)
-        
-        return is_suspicious
+        return bool(reasons)
+
+    def evaluate(self, transaction: Transaction) -> List[str]:
+        """
+        Runs the fraud rules without saving anything; returns the reasons the
+        transaction is suspicious (empty if it is not). The transaction is
+        added to the velocity rule's in-memory window.
+        """
+        verdict = self.engine.evaluate(transaction)
+        return verdict.reasons if verdict.flagged else []
+
+    def transaction_reasons(self, transaction: Transaction) -> List[str]:
+        """The rules that look at the transaction alone, without any history."""
+        verdict = self.screen(transaction)
+        return verdict.reasons if verdict.flagged else []
+
+    def screen(self, transaction: Transaction) -> Verdict:
+        """The verdict of the rules that look at the transaction alone."""
+        return self.engine.evaluate(transaction, stateful=False)
+
+    def evaluate_history(self, transaction: Transaction, screened: Verdict) -> List[str]:
+        """
+        Finishes a screen()ed transaction: runs the stateful rules, adding the
+        transaction to their history, and returns the reasons if the combined
+        score reaches the threshold (empty if it does not).
+        """
+        verdict = self.engine.evaluate(transaction, stateless=False)
+        if screened.score + verdict.score >= self.engine.risk_threshold:
+            return screened.reasons + verdict.reasons
+        return []
 
     def _flag_transaction(self, transaction: Transaction, reasons: List[str]):
-        flag_record = {
-            "transaction_id": transaction.transaction_id,
+        # We should save this to persistence
+        self.persistence.save_fraud_flag(self.flag_record(transaction, reasons))
+
+    def flag_record(self, transaction: Transaction, reasons: List[str]) -> dict:
+        return self.flag_dict(transaction.transaction_id, transaction.timestamp.isoformat(), reasons)
+
+    @staticmethod
+    def flag_dict(transaction_id: str, timestamp: str, reasons: List[str]) -> dict:
+        return {
+            "transaction_id": transaction_id,
             "reasons": reasons,
-            "timestamp": transaction.timestamp.isoformat(),
+            "timestamp": timestamp,
             "status": "REVIEW_NEEDED"
         }
-        # We should save this to persistence
-        self.persistence.save_fraud_flag(flag_record)
 
     def get_flagged_transactions(self):
         return self.persistence.get_fraud_flags()
@@ -0,0 +1,115 @@
+import uuid
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Dict, List
+from src.models.account import SavingsAccount
+from src.models.transaction import Transaction, TransactionType
+from src.services.balance_service import BalanceService
+from src.utils.persistence import PersistenceLayer
+from src.utils.validators import ValidationError
+
+try:
+    import numpy as np
+except ImportError:  # optional; without it interest is computed with a plain loop
+    np = None
+
+COMPOUNDING = ("simple", "daily")
+DAYS_PER_YEAR = 365
+
+def _default(model, name: str):
+    return next(f.default for f in fields(model) if f.name == name)
+
+@dataclass
+class InterestSummary:
+    accounts: int
+    total_interest: float
+    period_days: int
+    compounding: str
+    rate: float
+
+    def to_dict(self):
+        return {
+            "accounts": self.accounts,
+            "total_interest": self.total_interest,
+            "period_days": self.period_days,
+            "compounding": self.compounding,
+            "rate": self.rate
+        }
+
+
+class InterestEngine:
+    """
+    Applies interest to every savings account in one pass.
+
+    The savings balances are loaded once and multiplied by a single period
+    factor (as one NumPy operation when NumPy is installed), and the updated
+    accounts and their INTEREST transactions are written with
+    save_accounts()/log_transactions() inside one unit of work. Interest
+    backdated with `as_of` invalidates the balance checkpoints it falls
+    before.
+
+    The factor for an accrual period of `period_days` at annual rate r is
+    r * period_days / 365 with "simple" interest, and (1 + r/365) ** period_days - 1
+    with "daily" compounding. The defaults (simple, 365 days) credit one year
+    of interest, which is what calculate_interest() has always done. Accounts
+    with a zero or negative balance earn nothing.
+    """
+    def __init__(self, persistence: PersistenceLayer):
+        self.persistence = persistence
+        self.rate = _default(SavingsAccount, "interest_rate")
+
+    def period_factor(self, period_days: int, compounding: str) -> float:
+        if compounding not in COMPOUNDING:
+            raise ValidationError(f"Unknown compounding: {compounding}")
+        if period_days <= 0:
+            raise ValidationError("Accrual period must be at least one day.")
+        if compounding == "daily":
+            return (1 + self.rate / DAYS_PER_YEAR) ** period_days - 1
+        return self.rate * period_days / DAYS_PER_YEAR
+
+    def compute(self, balances, factor: float) -> List[float]:
+        """Interest for each balance (0.0 where nothing is earned)."""
+        if np is not None:
+            column = np.asarray(balances, dtype=np.float64)
+            return np.where(column > 0, column * factor, 0.0).tolist()
+        return [balance * factor if balance > 0 else 0.0 for balance in balances]
+
+    def apply(self, period_days: int = DAYS_PER_YEAR, compounding: str = "simple",
+              as_of: datetime = None) -> InterestSummary:
+        factor = self.period_factor(period_days, compounding)
+        if compounding == "simple" and period_days == DAYS_PER_YEAR:
+            description = "Annual Interest Applied"
+        else:
+            description = f"Interest Applied ({period_days} days, {compounding})"
+        timestamp = as_of or datetime.now()
+
+        with self.persistence.unit_of_work():
+            savings = [a for a in self.persistence.get_all_accounts() if a["account_type"] == "SAVINGS"]
+            interest = self.compute([a["balance"] for a in savings], factor)
+
+            updated: List[Dict] = []
+            transactions: List[Dict] = []
+            for account, earned in zip(savings, interest):
+                if earned > 0:
+                    updated.append(dict(account, balance=account["balance"] + earned))
+                    transactions.append(Transaction(
+                        transaction_id=str(uuid.uuid4()),
+                        account_id=account["account_id"],
+                        amount=earned,
+                        transaction_type=TransactionType.INTEREST,
+                        timestamp=timestamp,
+                        description=description
+                    ).to_dict())
+            if updated:
+                self.persistence.save_accounts(updated)
+                self.persistence.log_transactions(transactions)
+                if as_of is not None:
+                    BalanceService(self.persistence).invalidate_checkpoints(transactions)
+
+        return InterestSummary(
+            accounts=len(updated),
+            total_interest=sum(t["amount"] for t in transactions),
+            period_days=period_days,
+            compounding=compounding,
+            rate=self.rate
+        )
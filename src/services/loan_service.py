@@ -1,13 +1,17 @@
 import uuid
+from contextlib import contextmanager
 from typing import List
 from src.models.loan import Loan, LoanStatus
 from src.models.user import User
 from src.utils.persistence import PersistenceLayer
+from src.utils.striped_locks import StripedLocks
 from src.utils.validators import ValidationError
 
 class LoanService:
-    def __init__(self, persistence: PersistenceLayer):
+    def __init__(self, persistence: PersistenceLayer, thread_safe: bool = False, lock_stripes: int = 64):
         self.persistence = persistence
+        # Like BankService(thread_safe=True): each loan update holds its loan's stripe.
+        self._loan_locks = StripedLocks(lock_stripes) if thread_safe else None
         self.loans_file = "loans.json" # We might need to update persistence layer to handle generic files or add this specific one
         # For now, let's hack it into persistence layer or just use a new file here?
         # Better to update PersistenceLayer.
@@ -37,38 +41,41 @@ class LoanService:
         return loan
 
     def approve_loan(self, loan_id: str):
-        loan = self._get_loan(loan_id)
-        if loan.status != LoanStatus.PENDING:
-            raise ValidationError("Loan is not pending approval.")
-        
-        loan.status = LoanStatus.APPROVED
-        self.persistence.save_loan(loan.to_dict())
+        with self._locked(loan_id):
+            loan = self._get_loan(loan_id)
+            if loan.status != LoanStatus.PENDING:
+                raise ValidationError("Loan is not pending approval.")
+
+            loan.status = LoanStatus.APPROVED
+            self.persistence.save_loan(loan.to_dict())
         
         # Disburse funds (would need integration with BankService, but for now just mark approved)
         # In a real app, we'd deposit to their account.
 
     def reject_loan(self, loan_id: str):
-        loan = self._get_loan(loan_id)
-        if loan.status != LoanStatus.PENDING:
-            raise ValidationError("Loan is not pending approval.")
-        
-        loan.status = LoanStatus.REJECTED
-        self.persistence.save_loan(loan.to_dict())
+        with self._locked(loan_id):
+            loan = self._get_loan(loan_id)
+            if loan.status != LoanStatus.PENDING:
+                raise ValidationError("Loan is not pending approval.")
+
+            loan.status = LoanStatus.REJECTED
+            self.persistence.save_loan(loan.to_dict())
 
     def repay_loan(self, loan_id: str, amount: float):
-        loan = self._get_loan(loan_id)
-        if loan.status != LoanStatus.APPROVED:
-            raise ValidationError("Loan is not active.")
-        
-        if amount <= 0:
-            raise ValidationError("Repayment amount must be positive.")
-        
-        loan.remaining_amount -= amount
-        if loan.remaining_amount <= 0:
-            loan.remaining_amount = 0
-            loan.status = LoanStatus.PAID
-            
-        self.persistence.save_loan(loan.to_dict())
+        with self._locked(loan_id):
+            loan = self._get_loan(loan_id)
+            if loan.status != LoanStatus.APPROVED:
+                raise ValidationError("Loan is not active.")
+
+            if amount <= 0:
+                raise ValidationError("Repayment amount must be positive.")
+
+            loan.remaining_amount -= amount
+            if loan.remaining_amount <= 0:
+                loan.remaining_amount = 0
+                loan.status = LoanStatus.PAID
+
+            self.persistence.save_loan(loan.to_dict())
 
     def get_user_loans(self, user_id: str) -> List[Loan]:
         loans_data = self.persistence.get_loans_for_user(user_id)
@@ -78,6 +85,14 @@ class LoanService:
         all_loans = self.persistence.get_all_loans()
         return [Loan.from_dict(data) for data in all_loans if data["status"] == "PENDING"]
 
+    @contextmanager
+    def _locked(self, loan_id: str):
+        if self._loan_locks is None:
+            yield
+            return
+        with self._loan_locks.hold(loan_id):
+            yield
+
     def _get_loan(self, loan_id: str) -> Loan:
         data = self.persistence.get_loan(loan_id)
         if not data:
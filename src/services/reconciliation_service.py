@@ -0,0 +1,272 @@
+import json
+import math
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.models.transaction import TransactionType, signed_amount, transaction_legs
+from src.utils.cached_persistence import CachedPersistenceLayer
+from src.utils.ledger import read_segment
+from src.utils.persistence import PersistenceLayer
+
+# Stored balances may differ from the recomputed sum by float rounding only.
+BALANCE_TOLERANCE = 0.005
+
+LegKey = Tuple[str, Optional[str], float]
+
+@dataclass
+class ReconciliationIssue:
+    kind: str
+    subject: str
+    detail: str
+
+    def to_dict(self):
+        return {"kind": self.kind, "subject": self.subject, "detail": self.detail}
+
+
+@dataclass
+class ReconciliationReport:
+    accounts_checked: int = 0
+    transactions_scanned: int = 0
+    incremental: bool = False
+    issues: List[ReconciliationIssue] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+
+class LedgerTotals:
+    """
+    What one pass over some ledger records contributes to reconciliation:
+    each account's net balance change and record count, and for transfers a
+    count per (from, to, amount) that debit legs raise and credit legs lower.
+    Journal entries count as their two legs; the ids of entries whose postings
+    do not sum to zero are collected in `unbalanced`.
+    Totals of disjoint record sets are merged by adding them up.
+    """
+    def __init__(self):
+        self.nets: Dict[str, float] = defaultdict(float)
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.legs: Dict[LegKey, int] = defaultdict(int)
+        self.unbalanced: List[str] = []
+
+    def add(self, record: Dict):
+        if "postings" in record:
+            if not math.isclose(sum(p["amount"] for p in record["postings"]), 0.0, abs_tol=BALANCE_TOLERANCE):
+                self.unbalanced.append(record["transaction_id"])
+            for leg in transaction_legs(record):
+                self._add_leg(leg)
+        else:
+            self._add_leg(record)
+
+    def _add_leg(self, record: Dict):
+        account_id = record["account_id"]
+        self.nets[account_id] += signed_amount(record)
+        self.counts[account_id] += 1
+        if record["transaction_type"] == TransactionType.TRANSFER.value:
+            related = record.get("related_account_id")
+            if signed_amount(record) < 0:
+                self.legs[(account_id, related, record["amount"])] += 1
+            else:
+                self.legs[(related, account_id, record["amount"])] -= 1
+
+    def merge(self, other: "LedgerTotals"):
+        for account_id, net in other.nets.items():
+            self.nets[account_id] += net
+        for account_id, count in other.counts.items():
+            self.counts[account_id] += count
+        for key, count in other.legs.items():
+            self.legs[key] += count
+        self.unbalanced.extend(other.unbalanced)
+
+
+def scan_segment(segment) -> LedgerTotals:
+    """Totals for one ledger segment; runs in a worker process."""
+    totals = LedgerTotals()
+    for record in read_segment(segment):
+        totals.add(record)
+    return totals
+
+
+class ReconciliationService:
+    """
+    Checks that stored data agrees with the transaction ledger:
+
+    - every account's balance equals the sum of its ledger entries;
+    - every transfer's debit leg ("Transfer to") has a matching credit leg
+      ("Transfer from") with the same accounts and amount, and vice versa;
+    - every double-entry journal entry's postings sum to zero;
+    - every id in a user's `accounts` list, and every account id in the
+      ledger, names an existing account, and every account's user exists.
+
+    The ledger is split into segments (for the JSON-Lines, partitioned and
+    binary formats) that a process pool scans in parallel. The default JSON
+    format (one array) and SQLite are read whole and scanned in this process,
+    whatever `workers` is; see parallel_scan. Per-account totals are then
+    merged and compared with the stored balances.
+
+    With incremental=True, the totals and ledger position of the last run are
+    loaded from `state_path`, only records appended since are scanned, and only
+    the accounts they touch (plus those that failed last time) are rechecked.
+    A full run is made whenever no usable state exists.
+    """
+    def __init__(self, persistence: PersistenceLayer, state_path: str = None, workers: int = None):
+        self.persistence = persistence
+        if state_path is None:
+            directory = getattr(persistence, "data_dir", None) or os.path.dirname(persistence.db_path)
+            state_path = os.path.join(directory, "reconcile_state.json")
+        self.state_path = state_path
+        self.workers = workers or os.cpu_count() or 1
+
+    def reconcile(self, incremental: bool = False) -> ReconciliationReport:
+        if isinstance(self.persistence, CachedPersistenceLayer):
+            # Ledger rows still in the write-behind cache are not in the files yet.
+            self.persistence.flush()
+
+        state = self._load_state() if incremental else None
+        report = ReconciliationReport(incremental=state is not None)
+        totals = LedgerTotals()
+        if state is not None:
+            totals.nets.update(state["nets"])
+            totals.counts.update(state["counts"])
+            for from_id, to_id, amount, count in state["open_legs"]:
+                totals.legs[(from_id, to_id, amount)] = count
+
+        accounts = {a["account_id"]: a for a in self.persistence.get_all_accounts()}
+        new_totals, position = self._scan(state["position"] if state else None)
+        totals.merge(new_totals)
+        report.transactions_scanned = sum(new_totals.counts.values())
+
+        if state is None:
+            to_check = set(accounts) | set(totals.counts)
+        else:
+            to_check = set(new_totals.counts) | set(state["failed"])
+        report.issues.extend(self._check_balances(to_check, accounts, totals))
+        report.issues.extend(self._check_transfers(totals))
+        report.issues.extend(ReconciliationIssue("UNBALANCED_ENTRY", entry_id, "journal postings do not sum to zero")
+                             for entry_id in new_totals.unbalanced)
+        report.issues.extend(self._check_references(accounts))
+        report.accounts_checked = len(to_check)
+
+        failed = sorted({i.subject for i in report.issues if i.kind in ("BALANCE_MISMATCH", "UNKNOWN_ACCOUNT")})
+        self._save_state(position, totals, failed)
+        return report
+
+    @property
+    def parallel_scan(self) -> bool:
+        """Whether the ledger can be split into segments for `workers` processes."""
+        ledger = getattr(self.persistence, "ledger", None)
+        return ledger is not None and ledger.segments(None, 1) is not None
+
+    # Ledger scan
+    def _scan(self, after) -> Tuple[LedgerTotals, object]:
+        ledger = getattr(self.persistence, "ledger", None)
+        plan = ledger.segments(after, self.workers * 4) if ledger is not None else None
+        totals = LedgerTotals()
+        if plan is None:
+            # Formats that cannot be split: read every stored record (journal
+            # entries with their postings), skipping what was seen.
+            records = self.persistence.get_ledger_records()
+            for record in records[after or 0:]:
+                totals.add(record)
+            return totals, len(records)
+
+        segments, position = plan
+        if self.workers > 1 and len(segments) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                for partial in pool.map(scan_segment, segments):
+                    totals.merge(partial)
+        else:
+            for segment in segments:
+                totals.merge(scan_segment(segment))
+        return totals, position
+
+    # Checks
+    def _check_balances(self, account_ids: Iterable[str], accounts: Dict[str, Dict],
+                        totals: LedgerTotals) -> List[ReconciliationIssue]:
+        issues = []
+        for account_id in sorted(account_ids):
+            account = accounts.get(account_id)
+            if account is None:
+                issues.append(ReconciliationIssue(
+                    "UNKNOWN_ACCOUNT", account_id,
+                    f"{totals.counts.get(account_id, 0)} ledger entries for an account that does not exist"))
+                continue
+            expected = totals.nets.get(account_id, 0.0)
+            if not math.isclose(account["balance"], expected, abs_tol=BALANCE_TOLERANCE):
+                issues.append(ReconciliationIssue(
+                    "BALANCE_MISMATCH", account_id,
+                    f"stored balance {account['balance']:.2f}, ledger total {expected:.2f}"))
+        return issues
+
+    def _check_transfers(self, totals: LedgerTotals) -> List[ReconciliationIssue]:
+        issues = []
+        for (from_id, to_id, amount), count in sorted(totals.legs.items(), key=lambda item: str(item[0])):
+            if count > 0:
+                detail = f"{count} debit leg(s) of {amount:.2f} to {to_id} without a matching credit"
+                issues.append(ReconciliationIssue("UNPAIRED_TRANSFER", from_id, detail))
+            elif count < 0:
+                detail = f"{-count} credit leg(s) of {amount:.2f} from {from_id} without a matching debit"
+                issues.append(ReconciliationIssue("UNPAIRED_TRANSFER", to_id, detail))
+        return issues
+
+    def _check_references(self, accounts: Dict[str, Dict]) -> List[ReconciliationIssue]:
+        issues = []
+        users = {u["user_id"]: u for u in self.persistence.get_all_users()}
+        for user_id, user in users.items():
+            for account_id in user.get("accounts", []):
+                if account_id not in accounts:
+                    issues.append(ReconciliationIssue(
+                        "DANGLING_ACCOUNT_REF", user_id, f"lists account {account_id}, which does not exist"))
+        for account_id, account in accounts.items():
+            if account["user_id"] not in users:
+                issues.append(ReconciliationIssue(
+                    "ORPHAN_ACCOUNT", account_id, f"belongs to unknown user {account['user_id']}"))
+        return issues
+
+    # Incremental state
+    def _ledger_format(self) -> str:
+        ledger = getattr(self.persistence, "ledger", None)
+        return type(ledger).__name__ if ledger is not None else type(self.persistence).__name__
+
+    def _load_state(self) -> Optional[Dict]:
+        if not os.path.exists(self.state_path):
+            return None
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+        except ValueError:
+            return None
+        if state.get("ledger_format") != self._ledger_format():
+            return None
+        if not self._position_valid(state["position"]):
+            return None
+        return state
+
+    def _position_valid(self, position) -> bool:
+        """False if the ledger has shrunk below the saved position (e.g. it was replaced)."""
+        ledger = getattr(self.persistence, "ledger", None)
+        plan = ledger.segments(None, 1) if ledger is not None else None
+        if plan is None:
+            return position <= len(self.persistence.get_ledger_records())
+        _, end = plan
+        if isinstance(position, dict):
+            return all(end.get(key, 0) >= size for key, size in position.items())
+        return end >= position
+
+    def _save_state(self, position, totals: LedgerTotals, failed: List[str]):
+        state = {
+            "ledger_format": self._ledger_format(),
+            "position": position,
+            "nets": totals.nets,
+            "counts": totals.counts,
+            "open_legs": [[from_id, to_id, amount, count]
+                          for (from_id, to_id, amount), count in totals.legs.items() if count],
+            "failed": failed,
+        }
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
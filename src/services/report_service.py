@@ -1,32 +1,57 @@
+from datetime import datetime
 from typing import List
-from src.models.transaction import Transaction
+from src.models.transaction import Transaction, signed_amount
 from src.models.user import User
 from src.models.account import Account
+from src.services.balance_service import BalanceService
 from src.utils.persistence import PersistenceLayer
 
 class ReportService:
     def __init__(self, persistence: PersistenceLayer):
         self.persistence = persistence
+        self.balance_service = BalanceService(persistence)
 
-    def generate_account_statement(self, account_id: str) -> str:
+    def generate_account_statement(self, account_id: str, start: datetime = None, end: datetime = None,
+                                   running_balance: bool = False) -> str:
+        """
+        Statement of an account, optionally limited to transactions in [start, end).
+        A period statement starts with the opening balance; `running_balance`
+        adds the balance after each transaction.
+        """
         account_data = self.persistence.get_account(account_id)
         if not account_data:
             return "Account not found."
         
-        transactions = self.persistence.get_transactions_for_account(account_id)
-        # Sort by timestamp
-        transactions.sort(key=lambda x: x["timestamp"], reverse=True)
+        transactions = self.persistence.get_transactions_for_account(account_id, start, end)
+        # Running balance from the opening balance, oldest first
+        transactions.sort(key=lambda x: x["timestamp"])
+        opening = self.balance_service.opening_balance(account_id, start) if start is not None else 0.0
+        running = []
+        balance = opening
+        for tx in transactions:
+            balance += signed_amount(tx)
+            running.append(balance)
 
         report = []
         report.append(f"Statement for Account: {account_id}")
         report.append(f"Type: {account_data['account_type']}")
         report.append(f"Current Balance: ${account_data['balance']:.2f}")
+        if start is not None or end is not None:
+            report.append(f"Period: {start.date() if start else 'start'} to {end.date() if end else 'now'}")
+            report.append(f"Opening Balance: ${opening:.2f}")
         report.append("-" * 50)
-        report.append(f"{'Date':<20} | {'Type':<12} | {'Amount':<10} | {'Description'}")
+        if running_balance:
+            report.append(f"{'Date':<20} | {'Type':<12} | {'Amount':<10} | {'Balance':<10} | {'Description'}")
+        else:
+            report.append(f"{'Date':<20} | {'Type':<12} | {'Amount':<10} | {'Description'}")
         report.append("-" * 50)
 
-        for tx in transactions:
-            report.append(f"{tx['timestamp'][:19]:<20} | {tx['transaction_type']:<12} | ${tx['amount']:<9.2f} | {tx['description']}")
+        # Newest first
+        for tx, balance in reversed(list(zip(transactions, running))):
+            if running_balance:
+                report.append(f"{tx['timestamp'][:19]:<20} | {tx['transaction_type']:<12} | ${tx['amount']:<9.2f} | ${balance:<9.2f} | {tx['description']}")
+            else:
+                report.append(f"{tx['timestamp'][:19]:<20} | {tx['transaction_type']:<12} | ${tx['amount']:<9.2f} | {tx['description']}")
         
         report.append("-" * 50)
         return "\n".join(report)
@@ -0,0 +1,90 @@
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Callable, Deque, Dict, Iterable, List, Tuple
+from src.models.transaction import TransactionType
+
+# Movements the fraud rules look at: deposits, withdrawals and both legs of a transfer.
+_TRACKED_TYPES = {TransactionType.DEPOSIT.value, TransactionType.WITHDRAWAL.value, TransactionType.TRANSFER.value}
+
+def is_tracked(record: Dict) -> bool:
+    return record["transaction_type"] in _TRACKED_TYPES
+
+
+class VelocityTracker:
+    """
+    Sliding-window velocity rule: an account is suspicious once more than
+    `max_count` transactions, or more than `max_amount` in total, fall within
+    `window` of the latest one.
+
+    Each account keeps a deque of its recent (timestamp, amount) pairs and a
+    running total. observe() appends the new pair and pops the pairs that have
+    left the window from the front, so a check costs O(1) amortized and never
+    scans the ledger. Timestamps are expected to arrive in (roughly) increasing
+    order per account, as the services write them.
+
+    The windows only see transactions observed by this process; warm() fills
+    them from ledger records once, at startup. Safe to share between threads.
+    """
+    def __init__(self, max_count: int = 20, max_amount: float = 50000.0, window: timedelta = timedelta(hours=1)):
+        self.max_count = max_count
+        self.max_amount = max_amount
+        self.window = window
+        self._windows: Dict[str, Deque[Tuple[datetime, float]]] = {}
+        self._totals: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._warm_lock = threading.Lock()
+        self.warmed = False
+
+    def ensure_warm(self, load_records: Callable[[], Iterable[Dict]], now: datetime = None, exclude: Iterable[str] = ()):
+        """Calls warm(load_records(), ...) unless some thread has already warmed the windows."""
+        if self.warmed:
+            return
+        with self._warm_lock:
+            if not self.warmed:
+                self.warm(load_records(), now, exclude)
+
+    def warm(self, records: Iterable[Dict], now: datetime = None, exclude: Iterable[str] = ()):
+        """
+        Loads the tracked ledger records that are inside the window ending at
+        `now` (default: the current time), skipping the ids in `exclude`.
+        Records after `now` are left out too: they will be observed when their
+        own turn comes (e.g. checks queued behind the current one).
+        """
+        now = now or datetime.now()
+        cutoff, until = (now - self.window).isoformat(), now.isoformat()
+        exclude = set(exclude)
+        recent = [r for r in records
+                  if cutoff < r["timestamp"] < until and r["transaction_id"] not in exclude and is_tracked(r)]
+        recent.sort(key=lambda r: r["timestamp"])
+        with self._lock:
+            for record in recent:
+                self._push(record["account_id"], datetime.fromisoformat(record["timestamp"]), record["amount"])
+            self.warmed = True
+
+    def observe(self, account_id: str, timestamp: datetime, amount: float) -> List[str]:
+        """Records one transaction; returns the velocity limits it breaks (empty if none)."""
+        with self._lock:
+            count, total = self._push(account_id, timestamp, amount)
+        reasons = []
+        minutes = int(self.window.total_seconds() // 60)
+        if count > self.max_count:
+            reasons.append(f"High velocity: {count} transactions within {minutes} minutes")
+        if total > self.max_amount:
+            reasons.append(f"High velocity: {total:.2f} moved within {minutes} minutes")
+        return reasons
+
+    def _push(self, account_id: str, timestamp: datetime, amount: float) -> Tuple[int, float]:
+        window = self._windows.get(account_id)
+        if window is None:
+            window = self._windows[account_id] = deque()
+            self._totals[account_id] = 0.0
+        window.append((timestamp, amount))
+        total = self._totals[account_id] + amount
+        cutoff = timestamp - self.window
+        while window[0][0] <= cutoff:
+            total -= window.popleft()[1]
+        if len(window) == 1:
+            total = amount  # drop rounding drift whenever the window restarts
+        self._totals[account_id] = total
+        return len(window), total
@@ -0,0 +1,407 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.models.transaction import legs_for_account, posting_accounts, transaction_legs
+from src.utils.indexes import MultiIndex
+from src.utils.ledger import Bound, JsonArrayLedger, in_period
+from src.utils.persistence import PersistenceLayer
+from src.utils.shutdown import close_at_exit
+from src.utils.wal import WriteAheadLog
+
+# Mutating methods that may appear in a WAL record, replayed by name.
+_WAL_OPERATIONS = ("save_user", "save_account", "save_loan", "log_transaction", "save_fraud_flag",
+                   "save_balance_checkpoints")
+
+_MISSING = object()
+
+
+class CachedPersistenceLayer(PersistenceLayer):
+    """
+    Write-behind variant of PersistenceLayer.
+
+    The parsed users/accounts/loans/transactions/fraud collections are kept in
+    memory. Writes only update the in-memory copy and mark the collection dirty;
+    dirty collections are written back when `flush_interval` seconds have passed
+    since the last flush, on `commit()`, and on `close()` (also run at exit).
+    A clean collection is re-read only when its file's mtime or size changes.
+
+    Lookups by username, user -> accounts, user -> loans and (for the "json"
+    ledger) account -> transactions go through secondary indexes that are built
+    on first use, kept up to date by every save, and dropped whenever the
+    underlying file is re-read.
+
+    With `durability` set ("none", "batch" or "always", see WriteAheadLog) every
+    mutation, or every unit of work as a whole, is first recorded in a
+    write-ahead log under `<data_dir>/wal`. Flushes then become checkpoints that
+    write the snapshot files and discard the log, and startup replays whatever
+    the log holds beyond the last checkpoint. In this mode the layer must be the
+    only writer of its data directory.
+
+    A unit of work is durable when its block exits: through its log record
+    when there is a write-ahead log (the snapshot waits for the next flush),
+    otherwise by writing the dirty collections through as one journalled
+    batch. When units of work on several threads overlap, that write happens
+    as the last of them exits, since the cache then holds the others'
+    unfinished changes.
+
+    The layer is thread-safe. Each record-level operation runs under one
+    in-memory lock, and a unit of work is private to its thread, so units of
+    work on different threads may be open at once; callers keep two of them
+    off the same records (see BankService(thread_safe=True)). Flushes only
+    happen while no unit of work is open, so they never capture half of one.
+
+    Records returned by the getters are shared with the cache and must be
+    treated as read-only; persist changes through the save_* methods.
+    Append-only ledger formats ("jsonl") bypass the cache and write immediately,
+    except for records logged inside a unit of work or while a write-ahead log
+    is in use, which are appended with the next flush.
+    """
+    def __init__(self, data_dir: str = "data", flush_interval: Optional[float] = 5.0, ledger_format: str = "json",
+                 persist_indexes: bool = False, durability: Optional[str] = None, group_window: float = 0.0,
+                 codec: str = "pretty"):
+        self.flush_interval = flush_interval
+        self._cache: Dict[str, Any] = {}
+        self._signatures: Dict[str, Tuple[int, int]] = {}
+        self._dirty: Set[str] = set()
+        self._last_flush = time.monotonic()
+        self._indexes: Dict[str, MultiIndex] = {}
+        self._lock = threading.RLock()
+        self._idle = threading.Condition(self._lock)
+        self._open_batches = 0
+        self._pending_ledger: List[Dict] = []
+        self._replaying = False
+        self.wal: Optional[WriteAheadLog] = None
+        super().__init__(data_dir, ledger_format=ledger_format, persist_indexes=persist_indexes, codec=codec)
+        self._indexed_fields = {
+            self.users_file: "username",
+            self.accounts_file: "user_id",
+            self.loans_file: "user_id",
+        }
+        # Journal entries are filed under every account they post to.
+        self._index_keys = {self.transactions_file: posting_accounts}
+        if isinstance(self.ledger, JsonArrayLedger):
+            self._indexed_fields[self.transactions_file] = "account_id"
+        self.checkpoint_file = os.path.join(data_dir, "wal.checkpoint")
+        if durability is not None:
+            self.wal = WriteAheadLog(os.path.join(data_dir, "wal"), durability=durability, group_window=group_window)
+            self.fsync_writes = durability != "none"
+            self._replay_wal()
+        close_at_exit(self)
+
+    def _file_signature(self, filepath: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(filepath)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load_json(self, filepath: str) -> Any:
+        if filepath in self._dirty:
+            return self._cache[filepath]
+        with self._lock:
+            signature = self._file_signature(filepath)
+            if filepath in self._cache and signature == self._signatures.get(filepath):
+                return self._cache[filepath]
+            data = self._read_file(filepath)
+            self._cache[filepath] = data
+            self._signatures[filepath] = signature
+            self._indexes.pop(filepath, None)
+            return data
+
+    def _save_json(self, filepath: str, data: Any):
+        if not os.path.exists(filepath):
+            # Files created while bootstrapping the data dir are written straight away.
+            self._write_file(filepath, data)
+            self._mark_clean(filepath, data)
+            return
+        self._cache[filepath] = data
+        self._dirty.add(filepath)
+        if self._batch is None:
+            self._maybe_flush()
+
+    def _mark_clean(self, filepath: str, data: Any):
+        self._cache[filepath] = data
+        self._signatures[filepath] = self._file_signature(filepath)
+        self._dirty.discard(filepath)
+
+    def _maybe_flush(self):
+        if self.flush_interval is None or self._replaying or self._open_batches:
+            return
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def _write_dirty(self, ledger_records: List[Dict]):
+        files = {filepath: self._cache[filepath] for filepath in sorted(self._dirty)}
+        ledger_records = self._pending_ledger + ledger_records
+        closed_generation = None
+        if self.wal is not None:
+            # Checkpoint: new writes go to a fresh segment, and the marker naming
+            # the last segment covered is committed together with the snapshot.
+            closed_generation = self.wal.rotate()
+            files[self.checkpoint_file] = {"wal_generation": closed_generation}
+        self._commit_files(files, ledger_records)
+        self._pending_ledger = []
+        for filepath, data in files.items():
+            self._mark_clean(filepath, data)
+        if closed_generation is not None:
+            self.wal.discard_through(closed_generation)
+        self._last_flush = time.monotonic()
+
+    # Threads
+    @contextmanager
+    def _writing(self):
+        # Writes are record-level and serialized by self._lock, so units of
+        # work on different threads do not exclude each other here.
+        yield
+
+    @property
+    def _undo(self) -> List[Tuple[str, Any, Any]]:
+        return self._local.__dict__.setdefault("undo", [])
+
+    @_undo.setter
+    def _undo(self, undo: List[Tuple[str, Any, Any]]):
+        self._local.undo = undo
+
+    @property
+    def _batch_ops(self) -> List[List]:
+        return self._local.__dict__.setdefault("batch_ops", [])
+
+    @_batch_ops.setter
+    def _batch_ops(self, ops: List[List]):
+        self._local.batch_ops = ops
+
+    def _end_batch(self):
+        self._open_batches -= 1
+        if not self._open_batches:
+            self._idle.notify_all()
+
+    # Write-ahead log
+    def _log_operation(self, name: str, record: Dict):
+        if self.wal is None or self._replaying:
+            return
+        if self._batch is not None:
+            self._batch_ops.append([name, record])
+        else:
+            self.wal.append({"ops": [[name, record]]})
+
+    def _replay_wal(self):
+        checkpoint = self._read_file(self.checkpoint_file) if os.path.exists(self.checkpoint_file) else {}
+        replayed = 0
+        self._replaying = True
+        try:
+            for entry in self.wal.replay(after_generation=checkpoint.get("wal_generation", 0)):
+                for name, record in entry["ops"]:
+                    if name in _WAL_OPERATIONS:
+                        getattr(self, name)(record)
+                replayed += 1
+        finally:
+            self._replaying = False
+        if replayed:
+            self._write_dirty([])
+
+    # Undo log: a unit of work mutates cached objects in place, so record how
+    # to restore each touched slot in case the block fails.
+    def _remember_put(self, filepath: str, key: str):
+        if self._batch is not None:
+            self._undo.append((filepath, key, self._load_json(filepath).get(key, _MISSING)))
+
+    def _remember_append(self, filepath: str, record: Dict):
+        # Undone by identity rather than by truncating, since other threads'
+        # units of work may have appended after it.
+        if self._batch is not None:
+            self._undo.append((filepath, None, record))
+
+    # Unit of Work: with a WAL a committed batch stays in the cache like any
+    # other write, plus one log record, and reaches the snapshot with the next
+    # flush, which only ever contains whole batches. Without one the batch is
+    # written through as soon as no unit of work is open.
+    def _begin_batch(self):
+        with self._lock:
+            self._open_batches += 1
+
+    def _commit_batch(self, batch):
+        self._undo = []
+        ops, self._batch_ops = self._batch_ops, []
+        if ops:
+            # Outside the lock, so commits from several threads share fsyncs.
+            self.wal.append({"ops": ops})
+        with self._lock:
+            self._pending_ledger.extend(batch.ledger_records)
+            self._end_batch()
+            if self.wal is None:
+                self._write_through_when_idle()
+            else:
+                self._maybe_flush()
+
+    def _abort_batch(self, batch):
+        self._batch_ops = []
+        with self._lock:
+            for filepath, key, previous in reversed(self._undo):
+                records = self._cache[filepath]
+                if key is None:
+                    for position in range(len(records) - 1, -1, -1):
+                        if records[position] is previous:
+                            del records[position]
+                            break
+                elif previous is _MISSING:
+                    records.pop(key, None)
+                else:
+                    records[key] = previous
+                self._indexes.pop(filepath, None)
+            self._end_batch()
+            if self.wal is None:
+                # Units of work that exited while this one was open were left for it to write.
+                self._write_through_when_idle()
+        self._undo = []
+
+    def _write_through_when_idle(self):
+        if not self._open_batches and self.is_dirty():
+            self._write_dirty([])
+
+    # Secondary indexes
+    def _get_index(self, filepath: str, records) -> MultiIndex:
+        index = self._indexes.get(filepath)
+        if index is None:
+            index = MultiIndex.build(self._indexed_fields[filepath], records, self._index_keys.get(filepath))
+            self._indexes[filepath] = index
+        return index
+
+    def _reindex(self, filepath: str, primary, record: Dict):
+        records = self._load_json(filepath)
+        index = self._indexes.get(filepath)
+        if index is None:
+            return
+        if isinstance(records, dict) and primary in records:
+            index.remove_record(records[primary], primary)
+        index.add_record(record, primary)
+
+    # Mutations
+    def save_user(self, user_dict: Dict):
+        with self._lock:
+            self._log_operation("save_user", user_dict)
+            self._remember_put(self.users_file, user_dict["user_id"])
+            self._reindex(self.users_file, user_dict["user_id"], user_dict)
+            super().save_user(user_dict)
+
+    def get_user_by_username(self, username: str) -> Dict:
+        with self._lock:
+            users = self._load_json(self.users_file)
+            for user_id in self._get_index(self.users_file, users).get(username):
+                return users[user_id]
+            return None
+
+    def save_account(self, account_dict: Dict):
+        with self._lock:
+            self._log_operation("save_account", account_dict)
+            self._remember_put(self.accounts_file, account_dict["account_id"])
+            self._reindex(self.accounts_file, account_dict["account_id"], account_dict)
+            super().save_account(account_dict)
+
+    def save_accounts(self, account_dicts: List[Dict]):
+        # Cached writes are already in memory; keep per-record indexing, undo and logging.
+        with self._lock:
+            for account_dict in account_dicts:
+                self.save_account(account_dict)
+
+    def get_accounts_for_user(self, user_id: str) -> List[Dict]:
+        with self._lock:
+            accounts = self._load_json(self.accounts_file)
+            return [accounts[account_id] for account_id in self._get_index(self.accounts_file, accounts).get(user_id)]
+
+    def log_transaction(self, transaction_dict: Dict):
+        with self._lock:
+            self._log_operation("log_transaction", transaction_dict)
+            if self.transactions_file in self._indexed_fields:
+                self._remember_append(self.transactions_file, transaction_dict)
+                position = len(self._load_json(self.transactions_file))
+                self._reindex(self.transactions_file, position, transaction_dict)
+            elif self.wal is not None and self._batch is None:
+                # Appended to the ledger file at the next checkpoint.
+                self._pending_ledger.append(transaction_dict)
+                self._maybe_flush()
+                return
+            super().log_transaction(transaction_dict)
+
+    def log_transactions(self, transaction_dicts: List[Dict]):
+        with self._lock:
+            for transaction_dict in transaction_dicts:
+                self.log_transaction(transaction_dict)
+
+    def get_transactions_for_account(self, account_id: str, start: Bound = None, end: Bound = None) -> List[Dict]:
+        with self._lock:
+            if self.transactions_file not in self._indexed_fields:
+                pending = [leg for t in self._pending_ledger if in_period(t, start, end)
+                           for leg in legs_for_account(t, account_id)]
+                return super().get_transactions_for_account(account_id, start, end) + pending
+            transactions = self._load_json(self.transactions_file)
+            positions = self._get_index(self.transactions_file, transactions).get(account_id)
+            return [leg for position in positions if in_period(transactions[position], start, end)
+                    for leg in legs_for_account(transactions[position], account_id)]
+
+    def get_all_transactions(self) -> List[Dict]:
+        if self._pending_ledger:
+            return super().get_all_transactions() + [
+                leg for record in self._pending_ledger for leg in transaction_legs(record)]
+        return super().get_all_transactions()
+
+    def get_ledger_records(self) -> List[Dict]:
+        return super().get_ledger_records() + list(self._pending_ledger)
+
+    def save_balance_checkpoints(self, checkpoint_dict: Dict):
+        with self._lock:
+            self._log_operation("save_balance_checkpoints", checkpoint_dict)
+            self._remember_put(self.checkpoints_file, checkpoint_dict["account_id"])
+            super().save_balance_checkpoints(checkpoint_dict)
+
+    def save_loan(self, loan_dict: Dict):
+        with self._lock:
+            self._log_operation("save_loan", loan_dict)
+            self._remember_put(self.loans_file, loan_dict["loan_id"])
+            self._reindex(self.loans_file, loan_dict["loan_id"], loan_dict)
+            super().save_loan(loan_dict)
+
+    def get_loans_for_user(self, user_id: str) -> List[Dict]:
+        with self._lock:
+            loans = self._load_json(self.loans_file)
+            return [loans[loan_id] for loan_id in self._get_index(self.loans_file, loans).get(user_id)]
+
+    def save_fraud_flag(self, flag_dict: Dict):
+        with self._lock:
+            self._log_operation("save_fraud_flag", flag_dict)
+            self._remember_append(self.fraud_file, flag_dict)
+            super().save_fraud_flag(flag_dict)
+
+    def save_fraud_flags(self, flag_dicts: List[Dict]):
+        with self._lock:
+            for flag_dict in flag_dicts:
+                self.save_fraud_flag(flag_dict)
+
+    def is_dirty(self) -> bool:
+        return bool(self._dirty) or bool(self._pending_ledger)
+
+    def flush(self):
+        """Writes every dirty collection back to disk as one atomic batch."""
+        with self._lock:
+            if self._batch is not None or not self.is_dirty():
+                return
+            # Never write out part of another thread's open unit of work.
+            while self._open_batches:
+                self._idle.wait()
+            if self.is_dirty():
+                self._write_dirty([])
+
+    def commit(self):
+        """Makes all changes made so far durable on disk."""
+        self.flush()
+
+    def close(self):
+        """Flushes pending writes; call at shutdown."""
+        if self.is_dirty():
+            self.flush()
+        if self.wal is not None:
+            self.wal.close()
+            self.wal = None
+        super().close()
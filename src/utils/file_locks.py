@@ -0,0 +1,86 @@
+import os
+import threading
+from contextlib import contextmanager, ExitStack
+from typing import Dict, Iterable
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, locking becomes a no-op
+    fcntl = None
+
+class FileLock:
+    """
+    Reader/writer lock shared between processes through flock() on a lock file.
+
+    Each thread locks through its own file descriptor, so threads exclude
+    each other exactly like processes do. Re-entrant within one thread: nested
+    shared() or exclusive() calls while the lock is held just count depth. A
+    shared hold cannot be upgraded to exclusive, since two upgrading readers
+    would deadlock each other.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    @contextmanager
+    def shared(self):
+        with self._hold(fcntl.LOCK_SH if fcntl else None):
+            yield
+
+    @contextmanager
+    def exclusive(self):
+        with self._hold(fcntl.LOCK_EX if fcntl else None):
+            yield
+
+    @contextmanager
+    def _hold(self, mode):
+        if fcntl is None:
+            yield
+            return
+        held = self._local
+        if getattr(held, "depth", 0):
+            if mode == fcntl.LOCK_EX and held.mode == fcntl.LOCK_SH:
+                raise RuntimeError(f"Cannot upgrade a shared lock on {self.path}")
+            held.depth += 1
+            try:
+                yield
+            finally:
+                held.depth -= 1
+            return
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, mode)
+        except BaseException:
+            os.close(fd)
+            raise
+        held.mode, held.depth = mode, 1
+        try:
+            yield
+        finally:
+            held.mode, held.depth = None, 0
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+
+class LockTable:
+    """One FileLock per name, backed by `<directory>/<name>.lock`."""
+    def __init__(self, directory: str):
+        self.directory = directory
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        self._locks: Dict[str, FileLock] = {}
+
+    def get(self, name: str) -> FileLock:
+        lock = self._locks.get(name)
+        if lock is None:
+            lock = FileLock(os.path.join(self.directory, f"{name}.lock"))
+            self._locks[name] = lock
+        return lock
+
+    @contextmanager
+    def exclusive_all(self, names: Iterable[str]):
+        """Holds several exclusive locks, always taken in sorted order so holders cannot deadlock."""
+        with ExitStack() as stack:
+            for name in sorted(set(names)):
+                stack.enter_context(self.get(name).exclusive())
+            yield
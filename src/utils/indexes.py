@@ -0,0 +1,48 @@
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Union
+
+class MultiIndex:
+    """
+    In-memory secondary index mapping a field value to the primary keys of the
+    records holding it. For dict collections the primary key is the record id;
+    for list collections (the transaction array) it is the list position.
+    Primary keys are kept in insertion order, matching a linear scan.
+
+    A record is filed under its `field` value, or, when `keys` is given, under
+    every value keys(record) returns (e.g. both accounts of a journal entry).
+    """
+    def __init__(self, field: str, keys: Callable[[Dict], Iterable] = None):
+        self.field = field
+        self._keys = keys
+        self._entries: Dict[Any, Dict[Hashable, None]] = {}
+
+    @classmethod
+    def build(cls, field: str, records: Union[Dict, List], keys: Callable[[Dict], Iterable] = None) -> "MultiIndex":
+        index = cls(field, keys)
+        items = records.items() if isinstance(records, dict) else enumerate(records)
+        for primary, record in items:
+            index.add_record(record, primary)
+        return index
+
+    def keys_of(self, record: Dict) -> Iterable:
+        return self._keys(record) if self._keys is not None else (record.get(self.field),)
+
+    def add_record(self, record: Dict, primary: Hashable):
+        for key in self.keys_of(record):
+            self.add(key, primary)
+
+    def remove_record(self, record: Dict, primary: Hashable):
+        for key in self.keys_of(record):
+            self.remove(key, primary)
+
+    def add(self, key, primary: Hashable):
+        self._entries.setdefault(key, {})[primary] = None
+
+    def remove(self, key, primary: Hashable):
+        primaries = self._entries.get(key)
+        if primaries is not None:
+            primaries.pop(primary, None)
+            if not primaries:
+                del self._entries[key]
+
+    def get(self, key) -> List[Hashable]:
+        return list(self._entries.get(key, ()))
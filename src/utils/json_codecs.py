@@ -0,0 +1,69 @@
+import json
+from typing import Any, Dict
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; the stdlib encoder is used instead
+    orjson = None
+
+class JsonCodec:
+    """
+    How a persistence layer encodes its JSON files. Every codec writes plain
+    JSON, so files written with one codec can be read by any other; loading
+    always goes through loads(), which uses the fastest parser available.
+    """
+    name = "pretty"
+
+    def dumps(self, data: Any) -> bytes:
+        return json.dumps(data, indent=4).encode()
+
+
+class CompactJsonCodec(JsonCodec):
+    """No indentation or spaces after separators: smaller files, faster writes."""
+    name = "compact"
+
+    def dumps(self, data: Any) -> bytes:
+        return json.dumps(data, separators=(',', ':')).encode()
+
+
+class OrjsonCodec(JsonCodec):
+    """Compact JSON written by orjson; requires the optional orjson package."""
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ValueError("The orjson codec requires the orjson package")
+
+    def dumps(self, data: Any) -> bytes:
+        return orjson.dumps(data)
+
+
+def get_codec(name: str) -> JsonCodec:
+    """
+    Returns the codec called `name`: "pretty" (indent=4, the original format),
+    "compact", "orjson", or "fast" (orjson when installed, else "compact").
+    """
+    if name == "pretty":
+        return JsonCodec()
+    elif name == "compact":
+        return CompactJsonCodec()
+    elif name == "orjson":
+        return OrjsonCodec()
+    elif name == "fast":
+        return OrjsonCodec() if orjson is not None else CompactJsonCodec()
+    else:
+        raise ValueError(f"Unknown codec: {name}")
+
+
+def loads(data) -> Any:
+    """Parses JSON text or bytes written by any codec."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_line(record: Dict) -> bytes:
+    """One compact JSON record plus newline, as stored in JSON-Lines files."""
+    if orjson is not None:
+        return orjson.dumps(record) + b"\n"
+    return json.dumps(record, separators=(',', ':')).encode() + b"\n"
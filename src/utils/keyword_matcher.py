@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a fixed set of keywords, matched
+    case-insensitively as substrings.
+
+    The automaton is built once: a trie of the (lowercased) keywords, a
+    failure link per state pointing at the longest proper suffix that is also
+    in the trie, and per state the keywords ending there (including those
+    reached through failure links). find_all() then walks each text once,
+    whatever the number of keywords.
+    """
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        seen = set()
+        for keyword in keywords:
+            keyword = keyword.strip().lower()
+            if keyword and keyword not in seen:
+                seen.add(keyword)
+                self._insert(keyword, len(self.keywords))
+                self.keywords.append(keyword)
+        self._link()
+
+    def _insert(self, keyword: str, index: int):
+        state = 0
+        for ch in keyword:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = next_state
+        self._out[state] += (index,)
+
+    def _link(self):
+        # Breadth-first, so every state's failure target is final before its children need it.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                if self._out[self._fail[child]]:
+                    self._out[child] += self._out[self._fail[child]]
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def find_all(self, text: str) -> List[str]:
+        """The keywords occurring in `text`, each once, in order of first occurrence."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        found: Dict[int, None] = {}
+        for ch in text.lower():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for index in out[state]:
+                    found[index] = None
+        return [self.keywords[index] for index in found]
+
+    def search(self, text: str) -> bool:
+        return bool(self.find_all(text))
+
+    @classmethod
+    def from_file(cls, path: str) -> "KeywordMatcher":
+        """One keyword per line; blank lines and lines starting with '#' are ignored."""
+        with open(path, 'r', encoding="utf-8") as f:
+            return cls(line for line in f if not line.lstrip().startswith("#"))
+
+
+class ReloadingKeywordMatcher:
+    """
+    A KeywordMatcher built from a keyword file and rebuilt when the file
+    changes (checked at most every `check_interval` seconds, by size and
+    modification time). If the file does not exist, `fallback` keywords are
+    used until it appears.
+    """
+    def __init__(self, path: str, fallback: Iterable[str] = (), check_interval: float = 1.0):
+        self.path = path
+        self.fallback = list(fallback)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+        self._matcher = KeywordMatcher(self.fallback)
+        self._reload(force=True)
+
+    def __getstate__(self):
+        # The lock cannot be pickled, e.g. when rules are sent to a worker process.
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _reload(self, force: bool = False):
+        with self._lock:
+            self._checked_at = time.monotonic()
+            signature = self._stat()
+            if signature == self._signature and not force:
+                return
+            self._matcher = KeywordMatcher.from_file(self.path) if signature else KeywordMatcher(self.fallback)
+            self._signature = signature
+
+    @property
+    def matcher(self) -> KeywordMatcher:
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self._reload()
+        return self._matcher
+
+    def __len__(self) -> int:
+        return len(self.matcher)
+
+    def find_all(self, text: str) -> List[str]:
+        return self.matcher.find_all(text)
+
+    def search(self, text: str) -> bool:
+        return bool(self.find_all(text))
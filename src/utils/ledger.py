@@ -0,0 +1,755 @@
+import json
+import mmap
+import os
+import re
+import struct
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from src.models.transaction import journal_entry, legs_for_account, posting_accounts, transaction_legs
+from src.utils import json_codecs
+
+Bound = Union[datetime, str, None]
+
+
+def iso_bound(bound: Bound) -> Optional[str]:
+    return bound.isoformat() if isinstance(bound, datetime) else bound
+
+
+def in_period(record: Dict, start: Bound = None, end: Bound = None) -> bool:
+    """True if a transaction's timestamp falls in [start, end); either bound may be None."""
+    if start is None and end is None:
+        return True
+    timestamp = record["timestamp"]
+    start, end = iso_bound(start), iso_bound(end)
+    return (start is None or timestamp >= start) and (end is None or timestamp < end)
+
+# A slice of a ledger file that read_segment() can load on its own, in any
+# process: (format, path, start byte, end byte). Binary paths are (path, heap_path).
+Segment = Tuple[str, object, int, int]
+
+
+def _split_lines(path: str, start: int, end: int, count: int) -> List[Segment]:
+    """Splits bytes [start, end) of a JSON-Lines file into up to `count` line-aligned segments."""
+    if end <= start:
+        return []
+    step = max(1, (end - start) // max(1, count))
+    segments = []
+    with open(path, 'rb') as f:
+        while start < end:
+            cut = min(end, start + step)
+            if cut < end:
+                f.seek(cut)
+                f.readline()
+                cut = min(end, f.tell())
+            segments.append(("jsonl", path, start, cut))
+            start = cut
+    return segments
+
+
+def read_segment(segment: Segment) -> List[Dict]:
+    kind, path, start, end = segment
+    if kind == "jsonl":
+        with open(path, 'rb') as f:
+            f.seek(start)
+            data = f.read(end - start)
+        return [json_codecs.loads(line) for line in data.splitlines() if line]
+    if kind == "binary":
+        ledger = BinaryLedger(*path)
+        try:
+            return ledger.read_range(start, end)
+        finally:
+            ledger.close()
+    raise ValueError(f"Unknown ledger segment: {kind}")
+
+
+class Ledger(ABC):
+    """
+    Storage for the transaction ledger. Records are plain transaction dicts,
+    returned in the order they were appended.
+
+    Append-only ledgers write outside the persistence layer's JSON files, so a
+    unit of work buffers their records and commits them with append_many.
+    They also provide position() and truncate(position), which make a
+    journalled append repeatable.
+    """
+    append_only = True
+
+    @abstractmethod
+    def ensure(self):
+        """Creates the backing storage if it does not exist yet."""
+        pass
+
+    @abstractmethod
+    def append(self, record: Dict):
+        pass
+
+    @abstractmethod
+    def iter_records(self) -> Iterator[Dict]:
+        pass
+
+    def append_many(self, records: List[Dict]):
+        for record in records:
+            self.append(record)
+
+    def sync(self):
+        """Forces appended records to stable storage."""
+        pass
+
+    def for_account(self, account_id: str, start: Bound = None, end: Bound = None) -> List[Dict]:
+        """Transactions of one account, optionally limited to timestamps in [start, end)."""
+        return [leg for t in self.iter_records() if in_period(t, start, end)
+                for leg in legs_for_account(t, account_id)]
+
+    def all(self) -> List[Dict]:
+        """Every transaction row, with journal entries expanded into their legs."""
+        return [leg for record in self.iter_records() for leg in transaction_legs(record)]
+
+    def segments(self, after=None, count: int = 1) -> Optional[Tuple[List[Segment], object]]:
+        """
+        Splits the records appended since position `after` (None: from the
+        start) into about `count` Segments that read_segment() can load
+        independently, e.g. in other processes. Returns the segments and the
+        position they end at, or None if this format cannot be split.
+        """
+        return None
+
+    def close(self):
+        pass
+
+
+class JsonArrayLedger(Ledger):
+    """
+    The original format: a single JSON array rewritten on every append.
+    File access goes through the owning persistence layer so caching and
+    units of work apply to it like any other collection file.
+    """
+    append_only = False
+
+    def __init__(self, persistence, path: str):
+        self.persistence = persistence
+        self.path = path
+
+    def ensure(self):
+        if not os.path.exists(self.path):
+            self.persistence._save_json(self.path, [])
+
+    def append(self, record: Dict):
+        transactions = self.persistence._load_json(self.path)
+        transactions.append(record)
+        self.persistence._save_json(self.path, transactions)
+
+    def append_many(self, records: List[Dict]):
+        transactions = self.persistence._load_json(self.path)
+        transactions.extend(records)
+        self.persistence._save_json(self.path, transactions)
+
+    def iter_records(self) -> Iterator[Dict]:
+        return iter(self.persistence._load_json(self.path))
+
+    def all(self) -> List[Dict]:
+        return [leg for record in self.persistence._load_json(self.path) for leg in transaction_legs(record)]
+
+
+class JsonLinesLedger(Ledger):
+    """
+    Append-only JSON-Lines ledger: one transaction per line, each appended with
+    a single O_APPEND write so the cost of logging does not grow with history.
+
+    If `legacy_path` points at an existing JSON array ledger and no JSON-Lines
+    file exists yet, it is migrated once and renamed to `<legacy_path>.migrated`.
+
+    Per-account lookups use an index of line offsets, built lazily on the first
+    lookup and extended by reading only the bytes appended since (by this
+    process or any other). With `persist_index` the index is saved next to the
+    ledger as `<path>.idx` on close, so a cold start only indexes the tail.
+    """
+    def __init__(self, path: str, legacy_path: str = None, persist_index: bool = False):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.persist_index = persist_index
+        self.index_path = path + ".idx"
+        self._offsets: Dict[str, List[int]] = None
+        self._indexed_size = 0
+        self._indexed_inode = None
+
+    def ensure(self):
+        if os.path.exists(self.path):
+            self._truncate_torn_tail()
+        elif self.legacy_path and os.path.exists(self.legacy_path):
+            self._migrate()
+        else:
+            open(self.path, 'a').close()
+
+    def _migrate(self):
+        with open(self.legacy_path, 'rb') as f:
+            transactions = json_codecs.loads(f.read())
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            for record in transactions:
+                f.write(json_codecs.dumps_line(record))
+        os.replace(tmp_path, self.path)
+        os.replace(self.legacy_path, self.legacy_path + ".migrated")
+
+    def _truncate_torn_tail(self):
+        # A crash mid-append can leave a final line without its newline; drop it.
+        with open(self.path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            f.seek(0)
+            data = f.read()
+            f.truncate(data.rfind(b"\n") + 1)
+
+    def append(self, record: Dict):
+        self.append_many([record])
+
+    def append_many(self, records: List[Dict]):
+        self._write(b"".join(json_codecs.dumps_line(record) for record in records))
+        if self._offsets is not None:
+            self._catch_up()
+
+    def position(self) -> int:
+        return os.path.getsize(self.path)
+
+    def truncate(self, position: int):
+        with open(self.path, 'rb+') as f:
+            f.truncate(position)
+
+    def sync(self):
+        with open(self.path, 'rb') as f:
+            os.fsync(f.fileno())
+
+    def _write(self, payload: bytes):
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
+
+    def iter_records(self) -> Iterator[Dict]:
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if line.endswith(b"\n"):
+                    yield json_codecs.loads(line)
+
+    def segments(self, after: int = None, count: int = 1) -> Tuple[List[Segment], int]:
+        end = self._complete_size()
+        return _split_lines(self.path, after or 0, end, count), end
+
+    def _complete_size(self) -> int:
+        """Size of the file up to its last newline, ignoring a torn tail being written."""
+        size = os.path.getsize(self.path)
+        if size == 0:
+            return 0
+        with open(self.path, 'rb') as f:
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return size
+            f.seek(max(0, size - 65536))
+            tail = f.read()
+        return size - len(tail) + tail.rfind(b"\n") + 1
+
+    def for_account(self, account_id: str, start: Bound = None, end: Bound = None) -> List[Dict]:
+        self._catch_up()
+        result = []
+        with open(self.path, 'rb') as f:
+            for offset in self._offsets.get(account_id, ()):
+                f.seek(offset)
+                record = json_codecs.loads(f.readline())
+                if in_period(record, start, end):
+                    result.extend(legs_for_account(record, account_id))
+        return result
+
+    # Offset index
+    def _catch_up(self):
+        """Brings the offset index up to date with the end of the ledger file."""
+        st = os.stat(self.path)
+        if self._offsets is None:
+            self._load_index()
+        if st.st_ino != self._indexed_inode or st.st_size < self._indexed_size:
+            # The ledger was replaced or truncated; start over.
+            self._offsets, self._indexed_size = {}, 0
+        self._indexed_inode = st.st_ino
+        if st.st_size == self._indexed_size:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self._indexed_size)
+            offset = self._indexed_size
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                for account_id in posting_accounts(json_codecs.loads(line)):
+                    self._offsets.setdefault(account_id, []).append(offset)
+                offset += len(line)
+        self._indexed_size = offset
+
+    def _load_index(self):
+        self._offsets, self._indexed_size, self._indexed_inode = {}, 0, None
+        if not self.persist_index or not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r') as f:
+                saved = json.load(f)
+        except ValueError:
+            return
+        self._offsets = saved["offsets"]
+        self._indexed_size = saved["size"]
+        self._indexed_inode = saved["inode"]
+
+    def save_index(self):
+        if self._offsets is None:
+            return
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"inode": self._indexed_inode, "size": self._indexed_size, "offsets": self._offsets}, f)
+        os.replace(tmp_path, self.index_path)
+
+    def close(self):
+        if self.persist_index:
+            self.save_index()
+
+
+class BinaryLedger(Ledger):
+    """
+    Append-only ledger of fixed-width binary records, read through mmap.
+
+    Each record holds the transaction, account and related account ids as
+    16-byte UUIDs, the timestamp as int64 microseconds since the epoch, the
+    amount as a float64, a one-byte type code, and the offset and length of
+    the description in a separate UTF-8 string heap (`heap_path`).
+
+    Per-account lookups search the mapped file for the account's 16 id bytes
+    and only decode matching rows, so nothing is parsed for other accounts.
+    Ids must be UUID strings and timestamps naive ISO datetimes; fields other
+    than those of Transaction.to_dict() are not stored. A journal entry is one
+    row flagged JOURNAL, its postings implied by the two account ids and the
+    amount; an entry with any other postings is refused.
+
+    An existing JSON array ledger at `legacy_path` is migrated on first use
+    and renamed to `<legacy_path>.migrated`.
+    """
+    RECORD = struct.Struct("<16s16s16sqdQIBB2x")
+    ACCOUNT_OFFSET = 16
+    TYPES = ("DEPOSIT", "WITHDRAWAL", "TRANSFER", "INTEREST", "FEE")
+    HAS_RELATED = 1
+    JOURNAL = 2
+    RELATED_OFFSET = 32
+    ITER_BATCH = 4096
+    EPOCH = datetime(1970, 1, 1)
+
+    def __init__(self, path: str, heap_path: str, legacy_path: str = None):
+        self.path = path
+        self.heap_path = heap_path
+        self.legacy_path = legacy_path
+        self._map: Optional[mmap.mmap] = None
+        self._heap_map: Optional[mmap.mmap] = None
+
+    def ensure(self):
+        if os.path.exists(self.path):
+            self._truncate_torn_tail()
+        elif self.legacy_path and os.path.exists(self.legacy_path):
+            self._migrate()
+        else:
+            open(self.path, 'ab').close()
+        open(self.heap_path, 'ab').close()
+
+    def _migrate(self):
+        with open(self.legacy_path, 'rb') as f:
+            transactions = json_codecs.loads(f.read())
+        tmp_path = self.path + ".tmp"
+        heap = bytearray()
+        with open(tmp_path, 'wb') as f:
+            for record in transactions:
+                f.write(self._encode(record, heap, len(heap)))
+        with open(self.heap_path, 'wb') as f:
+            f.write(heap)
+        os.replace(tmp_path, self.path)
+        os.replace(self.legacy_path, self.legacy_path + ".migrated")
+
+    def _truncate_torn_tail(self):
+        size = os.path.getsize(self.path)
+        if size % self.RECORD.size:
+            self.truncate(size - size % self.RECORD.size)
+
+    # Encoding
+    def _uuid_bytes(self, value: Optional[str], field: str) -> bytes:
+        if value is None:
+            return bytes(16)
+        try:
+            return uuid.UUID(value).bytes
+        except (ValueError, AttributeError, TypeError):
+            raise ValueError(f"Binary ledger requires UUID {field}, got {value!r}")
+
+    def _encode(self, record: Dict, heap: bytearray, heap_offset: int) -> bytes:
+        """Packs one record, appending its description to `heap` (which starts at `heap_offset`)."""
+        related = record.get("related_account_id")
+        if "postings" in record and record["postings"] != [{"account_id": record["account_id"], "amount": -record["amount"]},
+                                                           {"account_id": related, "amount": record["amount"]}]:
+            raise ValueError(f"Binary ledger stores only the postings implied by a journal entry's accounts and "
+                             f"amount; {record['transaction_id']} has others")
+        description = (record.get("description") or "").encode()
+        timestamp = datetime.fromisoformat(record["timestamp"])
+        packed = self.RECORD.pack(
+            self._uuid_bytes(record["transaction_id"], "transaction_id"),
+            self._uuid_bytes(record["account_id"], "account_id"),
+            self._uuid_bytes(related, "related_account_id"),
+            (timestamp - self.EPOCH) // timedelta(microseconds=1),
+            float(record["amount"]),
+            heap_offset + len(heap),
+            len(description),
+            self.TYPES.index(record["transaction_type"]),
+            (self.HAS_RELATED if related is not None else 0) | (self.JOURNAL if "postings" in record else 0),
+        )
+        heap += description
+        return packed
+
+    @staticmethod
+    def _uuid_str(raw: bytes) -> str:
+        # Same text as str(uuid.UUID(bytes=raw)), without building a UUID object.
+        h = raw.hex()
+        return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+    def _decode(self, fields) -> Dict:
+        (tx_id, account_id, related, micros, amount, text_offset, text_length,
+         type_code, flags) = fields
+        if flags & self.JOURNAL:
+            return journal_entry(
+                self._uuid_str(tx_id), self._uuid_str(account_id), self._uuid_str(related), amount,
+                (self.EPOCH + timedelta(microseconds=micros)).isoformat(),
+                self._heap_map[text_offset:text_offset + text_length].decode() if text_length else "")
+        return {
+            "transaction_id": self._uuid_str(tx_id),
+            "account_id": self._uuid_str(account_id),
+            "amount": amount,
+            "transaction_type": self.TYPES[type_code],
+            "timestamp": (self.EPOCH + timedelta(microseconds=micros)).isoformat(),
+            "description": self._heap_map[text_offset:text_offset + text_length].decode() if text_length else "",
+            "related_account_id": self._uuid_str(related) if flags & self.HAS_RELATED else None,
+        }
+
+    # Writing
+    def append(self, record: Dict):
+        self.append_many([record])
+
+    def append_many(self, records: List[Dict]):
+        if not records:
+            return
+        heap = bytearray()
+        heap_offset = os.path.getsize(self.heap_path)
+        payload = b"".join(self._encode(record, heap, heap_offset) for record in records)
+        # Descriptions go first: a record only becomes visible once its
+        # fixed-width row is complete, and by then its text is already there.
+        self._write(self.heap_path, bytes(heap))
+        self._write(self.path, payload)
+
+    def _write(self, path: str, payload: bytes):
+        if not payload:
+            return
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
+
+    def position(self) -> int:
+        return os.path.getsize(self.path)
+
+    def truncate(self, position: int):
+        # Orphaned descriptions left in the heap are harmless.
+        self._unmap()
+        with open(self.path, 'rb+') as f:
+            f.truncate(position)
+
+    def sync(self):
+        for path in (self.heap_path, self.path):
+            with open(path, 'rb') as f:
+                os.fsync(f.fileno())
+
+    # Reading
+    def _remap(self) -> int:
+        """Maps the current contents of both files; returns the number of whole records."""
+        size = os.path.getsize(self.path)
+        size -= size % self.RECORD.size
+        if self._map is None or len(self._map) != size:
+            self._unmap()
+            if size == 0:
+                return 0
+            self._map = self._map_file(self.path)
+            self._heap_map = self._map_file(self.heap_path)
+        elif self._heap_map is not None and len(self._heap_map) != os.path.getsize(self.heap_path):
+            self._heap_map.close()
+            self._heap_map = self._map_file(self.heap_path)
+        return size // self.RECORD.size
+
+    def _map_file(self, path: str) -> Optional[mmap.mmap]:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _unmap(self):
+        for mapped in (self._map, self._heap_map):
+            if mapped is not None:
+                mapped.close()
+        self._map = self._heap_map = None
+
+    def iter_records(self) -> Iterator[Dict]:
+        # Decoded ITER_BATCH rows at a time, so memory stays flat and no view
+        # of the map is held while the caller works (a read may remap it).
+        end = self._remap() * self.RECORD.size
+        step = self.ITER_BATCH * self.RECORD.size
+        for start in range(0, end, step):
+            yield from self.read_range(start, min(end, start + step))
+
+    def segments(self, after: int = None, count: int = 1) -> Tuple[List[Segment], int]:
+        size = os.path.getsize(self.path)
+        end = size - size % self.RECORD.size
+        start = after or 0
+        rows = (end - start) // self.RECORD.size
+        step = max(1, -(-rows // max(1, count))) * self.RECORD.size
+        return [("binary", (self.path, self.heap_path), offset, min(end, offset + step))
+                for offset in range(start, end, step)], end
+
+    def read_range(self, start: int, end: int) -> List[Dict]:
+        """Decodes the records stored in bytes [start, end) of the record file."""
+        self._remap()
+        if self._map is None:
+            return []
+        with memoryview(self._map) as view:
+            return [self._decode(fields) for fields in self.RECORD.iter_unpack(view[start:end])]
+
+    def _micros(self, bound: Bound) -> Optional[int]:
+        if bound is None:
+            return None
+        if not isinstance(bound, datetime):
+            bound = datetime.fromisoformat(bound)
+        return (bound - self.EPOCH) // timedelta(microseconds=1)
+
+    def for_account(self, account_id: str, start: Bound = None, end: Bound = None) -> List[Dict]:
+        count = self._remap()
+        if count == 0:
+            return []
+        needle = self._uuid_bytes(account_id, "account_id")
+        low, high = self._micros(start), self._micros(end)
+        limit = count * self.RECORD.size
+        result = []
+        position = self._map.find(needle, 0, limit)
+        while position != -1:
+            offset = position - position % self.RECORD.size
+            field_offset = position - offset
+            if field_offset == self.ACCOUNT_OFFSET or field_offset == self.RELATED_OFFSET:
+                fields = self.RECORD.unpack_from(self._map, offset)
+                micros = fields[3]
+                # A related_account_id match only counts for the receiving leg of a journal entry.
+                if ((field_offset == self.ACCOUNT_OFFSET or fields[8] & self.JOURNAL) and
+                        (low is None or micros >= low) and (high is None or micros < high)):
+                    result.extend(legs_for_account(self._decode(fields), account_id))
+                position = self._map.find(needle, offset + self.RECORD.size, limit)
+            else:
+                # Matched some other field (e.g. the transaction id); keep looking.
+                position = self._map.find(needle, position + 1, limit)
+        return result
+
+    def close(self):
+        self._unmap()
+
+
+class PartitionedLedger(Ledger):
+    """
+    Append-only ledger split into one JSON-Lines partition per calendar month
+    (`<directory>/YYYY-MM.jsonl`), chosen by each transaction's timestamp.
+
+    `manifest.json` records, for every partition, its size and the min/max
+    timestamp and account ids it contains. Date-range and per-account queries
+    only open partitions whose manifest entry can match. The manifest is
+    brought up to date lazily by reading whatever was appended to a partition
+    since it was last recorded, so appends never rewrite it; it is saved on
+    close.
+
+    Records come back grouped by month (oldest first) and, within a month, in
+    the order they were appended. An existing JSON array ledger at
+    `legacy_path` is migrated on first use and renamed to `<legacy_path>.migrated`.
+    """
+    PARTITION_PATTERN = re.compile(r"^(\d{4}-\d{2})\.jsonl$")
+
+    def __init__(self, directory: str, legacy_path: str = None):
+        self.directory = directory
+        self.legacy_path = legacy_path
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        self._partitions: Dict[str, JsonLinesLedger] = {}
+        self._manifest: Dict[str, Dict] = None
+        self._touched = set()
+
+    def ensure(self):
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+            if self.legacy_path and os.path.exists(self.legacy_path):
+                self._migrate()
+        for key in self._partition_keys():
+            self._partition(key).ensure()
+
+    def _migrate(self):
+        with open(self.legacy_path, 'rb') as f:
+            transactions = json_codecs.loads(f.read())
+        self.append_many(transactions)
+        self.save_manifest()
+        os.replace(self.legacy_path, self.legacy_path + ".migrated")
+
+    # Partitions
+    def _partition_keys(self) -> List[str]:
+        keys = []
+        for name in os.listdir(self.directory):
+            match = self.PARTITION_PATTERN.match(name)
+            if match:
+                keys.append(match.group(1))
+        return sorted(keys)
+
+    def _partition(self, key: str) -> JsonLinesLedger:
+        partition = self._partitions.get(key)
+        if partition is None:
+            partition = JsonLinesLedger(os.path.join(self.directory, f"{key}.jsonl"))
+            self._partitions[key] = partition
+        return partition
+
+    @staticmethod
+    def partition_key(record: Dict) -> str:
+        return record["timestamp"][:7]
+
+    # Writing
+    def append(self, record: Dict):
+        self.append_many([record])
+
+    def append_many(self, records: List[Dict]):
+        by_partition: Dict[str, List[Dict]] = {}
+        for record in records:
+            by_partition.setdefault(self.partition_key(record), []).append(record)
+        for key, partition_records in by_partition.items():
+            self._partition(key).append_many(partition_records)
+            self._touched.add(key)
+
+    def position(self) -> Dict[str, int]:
+        return {key: self._partition(key).position() for key in self._partition_keys()}
+
+    def truncate(self, position: Dict[str, int]):
+        for key in self._partition_keys():
+            partition = self._partition(key)
+            if key in position:
+                partition.truncate(position[key])
+            else:
+                os.remove(partition.path)
+                del self._partitions[key]
+
+    def sync(self):
+        for key in self._touched:
+            self._partition(key).sync()
+        self._touched = set()
+
+    # Manifest
+    def _load_manifest(self):
+        self._manifest = {}
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, 'r') as f:
+                    saved = json.load(f)
+            except ValueError:
+                saved = {}
+            for key, entry in saved.get("partitions", {}).items():
+                self._manifest[key] = dict(entry, accounts=set(entry["accounts"]))
+
+    def _catch_up(self) -> List[str]:
+        """Refreshes the manifest from the partition files; returns all partition keys."""
+        if self._manifest is None:
+            self._load_manifest()
+        keys = self._partition_keys()
+        for key in list(self._manifest):
+            if key not in keys:
+                del self._manifest[key]
+        for key in keys:
+            path = self._partition(key).path
+            size = os.path.getsize(path)
+            entry = self._manifest.get(key)
+            if entry is None or size < entry["size"]:
+                entry = {"size": 0, "min": None, "max": None, "accounts": set()}
+                self._manifest[key] = entry
+            if size == entry["size"]:
+                continue
+            with open(path, 'rb') as f:
+                f.seek(entry["size"])
+                offset = entry["size"]
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    record = json_codecs.loads(line)
+                    timestamp = record["timestamp"]
+                    entry["accounts"].update(posting_accounts(record))
+                    if entry["min"] is None or timestamp < entry["min"]:
+                        entry["min"] = timestamp
+                    if entry["max"] is None or timestamp > entry["max"]:
+                        entry["max"] = timestamp
+                    offset += len(line)
+            entry["size"] = offset
+        return keys
+
+    def _overlapping(self, keys: List[str], start: Bound, end: Bound) -> List[str]:
+        start, end = iso_bound(start), iso_bound(end)
+        selected = []
+        for key in keys:
+            entry = self._manifest[key]
+            if entry["min"] is None:
+                continue
+            if start is not None and entry["max"] < start:
+                continue
+            if end is not None and entry["min"] >= end:
+                continue
+            selected.append(key)
+        return selected
+
+    def save_manifest(self):
+        if self._manifest is None:
+            self._catch_up()
+        saved = {key: dict(entry, accounts=sorted(entry["accounts"])) for key, entry in self._manifest.items()}
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"partitions": saved}, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    # Reading
+    def iter_records(self) -> Iterator[Dict]:
+        for key in self._partition_keys():
+            yield from self._partition(key).iter_records()
+
+    def segments(self, after: Dict[str, int] = None, count: int = 1) -> Tuple[List[Segment], Dict[str, int]]:
+        after = after or {}
+        keys = self._partition_keys()
+        ends = {key: self._partition(key)._complete_size() for key in keys}
+        total = sum(max(0, ends[key] - after.get(key, 0)) for key in keys)
+        step = max(1, total // max(1, count))
+        segments = []
+        for key in keys:
+            start = after.get(key, 0)
+            pieces = max(1, (ends[key] - start) // step)
+            segments.extend(_split_lines(self._partition(key).path, start, ends[key], pieces))
+        return segments, ends
+
+    def for_account(self, account_id: str, start: Bound = None, end: Bound = None) -> List[Dict]:
+        result = []
+        for key in self._overlapping(self._catch_up(), start, end):
+            if account_id in self._manifest[key]["accounts"]:
+                result.extend(self._partition(key).for_account(account_id, start, end))
+        return result
+
+    def partitions_for(self, account_id: str = None, start: Bound = None, end: Bound = None) -> List[str]:
+        """Keys of the partitions a query would open; useful for checking pruning."""
+        keys = self._overlapping(self._catch_up(), start, end)
+        return [key for key in keys if account_id is None or account_id in self._manifest[key]["accounts"]]
+
+    def close(self):
+        if os.path.isdir(self.directory):
+            self.save_manifest()
@@ -0,0 +1,50 @@
+import csv
+import json
+from typing import Dict, List
+from src.models.payment import BatchReport
+
+PAYMENT_FIELDS = ("from_account_id", "to_account_id", "amount", "reference")
+
+def read_payments(path: str) -> List[Dict]:
+    """
+    Reads a payment batch file: CSV with a header row naming at least
+    from_account_id, to_account_id and amount (reference is optional), or
+    JSON Lines (`.jsonl`) with one object per payment. Rows are returned as
+    dicts in file order; their values are validated by BankService.execute_batch.
+    Raises ValueError if the file itself is malformed.
+    """
+    if path.endswith(".jsonl"):
+        return _read_jsonl(path)
+    return _read_csv(path)
+
+def _read_csv(path: str) -> List[Dict]:
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        missing = [name for name in PAYMENT_FIELDS[:3] if name not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Missing CSV column(s): {', '.join(missing)}")
+        return [dict(row) for row in reader]
+
+def _read_jsonl(path: str) -> List[Dict]:
+    payments = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Line {line_number}: malformed JSON ({e.msg})")
+            if not isinstance(record, dict):
+                raise ValueError(f"Line {line_number}: expected a JSON object")
+            payments.append(record)
+    return payments
+
+def write_report(path: str, report: BatchReport):
+    """Writes one CSV line per payment with its status, error and transaction id."""
+    columns = ["row", "from_account_id", "to_account_id", "amount", "status", "error", "transaction_id", "flagged"]
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for result in report.results:
+            writer.writerow(result.to_dict())
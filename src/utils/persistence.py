@@ -1,16 +1,75 @@
-import json
 import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from typing import Dict, List, Any
+from src.utils import json_codecs
+from src.utils.file_locks import LockTable
+from src.utils.ledger import Ledger, JsonArrayLedger, JsonLinesLedger, BinaryLedger, PartitionedLedger, Bound
+
+@dataclass
+class PendingBatch:
+    """Mutations buffered by an open unit of work."""
+    files: Dict[str, Any] = field(default_factory=dict)
+    ledger_records: List[Dict] = field(default_factory=list)
+
+def require_thread_safe(persistence, user: str):
+    """Raises ValueError unless `persistence` can be called from threads other than the one that opened it."""
+    if not persistence.thread_safe:
+        raise ValueError(f"{user} calls the persistence layer from other threads, "
+                         f"and {type(persistence).__name__} is not thread_safe")
 
 class PersistenceLayer:
-    def __init__(self, data_dir: str = "data"):
+    # Usable from several threads at once (each thread has its own unit of work).
+    thread_safe = True
+
+    def __init__(self, data_dir: str = "data", ledger_format: str = "json", persist_indexes: bool = False,
+                 codec: str = "pretty", process_safe: bool = False):
         self.data_dir = data_dir
         self.users_file = os.path.join(data_dir, "users.json")
         self.accounts_file = os.path.join(data_dir, "accounts.json")
         self.transactions_file = os.path.join(data_dir, "transactions.json")
         self.loans_file = os.path.join(data_dir, "loans.json")
         self.fraud_file = os.path.join(data_dir, "fraud.json")
-        self._ensure_data_dir()
+        self.checkpoints_file = os.path.join(data_dir, "balance_checkpoints.json")
+        self.persist_indexes = persist_indexes
+        self.journal_file = os.path.join(data_dir, "commit.journal")
+        self.fsync_writes = False
+        self.codec = json_codecs.get_codec(codec)
+        # Each thread has its own open unit of work, if any.
+        self._local = threading.local()
+        self._thread_lock = threading.RLock()
+        # With process_safe, several processes may share data_dir: reads take a
+        # shared lock on their collection, writers hold an exclusive "writer"
+        # lock across each read-modify-write and lock the collections they replace.
+        self._locks = LockTable(os.path.join(data_dir, ".locks")) if process_safe else None
+        self.ledger = self._create_ledger(ledger_format)
+        with self._writing():
+            self._ensure_data_dir()
+            self._recover_journal()
+
+    def _create_ledger(self, ledger_format: str) -> Ledger:
+        # "json" keeps the original single-array transactions.json;
+        # "jsonl" is the append-only ledger, migrated from transactions.json if present,
+        # with its account index saved as a sidecar file when persist_indexes is set;
+        # "binary" is the fixed-width mmap ledger, with descriptions in transactions.heap;
+        # "partitioned" keeps one JSON-Lines file per month under transactions/.
+        if ledger_format == "json":
+            return JsonArrayLedger(self, self.transactions_file)
+        elif ledger_format == "jsonl":
+            legacy_file = self.transactions_file
+            self.transactions_file = os.path.join(self.data_dir, "transactions.jsonl")
+            return JsonLinesLedger(self.transactions_file, legacy_path=legacy_file, persist_index=self.persist_indexes)
+        elif ledger_format == "binary":
+            legacy_file = self.transactions_file
+            self.transactions_file = os.path.join(self.data_dir, "transactions.bin")
+            return BinaryLedger(self.transactions_file, os.path.join(self.data_dir, "transactions.heap"), legacy_path=legacy_file)
+        elif ledger_format == "partitioned":
+            legacy_file = self.transactions_file
+            self.transactions_file = os.path.join(self.data_dir, "transactions")
+            return PartitionedLedger(self.transactions_file, legacy_path=legacy_file)
+        else:
+            raise ValueError(f"Unknown ledger format: {ledger_format}")
 
     def _ensure_data_dir(self):
         if not os.path.exists(self.data_dir):
@@ -19,26 +78,183 @@ class PersistenceLayer:
             self._save_json(self.users_file, {})
         if not os.path.exists(self.accounts_file):
             self._save_json(self.accounts_file, {})
-        if not os.path.exists(self.transactions_file):
-            self._save_json(self.transactions_file, [])
+        self.ledger.ensure()
         if not os.path.exists(self.loans_file):
             self._save_json(self.loans_file, {})
         if not os.path.exists(self.fraud_file):
             self._save_json(self.fraud_file, [])
+        if not os.path.exists(self.checkpoints_file):
+            self._save_json(self.checkpoints_file, {})
+
+    @property
+    def _batch(self) -> PendingBatch:
+        return getattr(self._local, "batch", None)
+
+    @_batch.setter
+    def _batch(self, batch: PendingBatch):
+        self._local.batch = batch
 
     def _save_json(self, filepath: str, data: Any):
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=4)
+        if self._batch is not None:
+            self._batch.files[filepath] = data
+            return
+        self._write_file(filepath, data)
 
     def _load_json(self, filepath: str) -> Any:
-        with open(filepath, 'r') as f:
-            return json.load(f)
+        if self._batch is not None and filepath in self._batch.files:
+            return self._batch.files[filepath]
+        return self._read_file(filepath)
+
+    def _write_file(self, filepath: str, data: Any):
+        # Write to a temp file and rename over the target so readers never see a partial file.
+        with self._locked_exclusive([filepath]):
+            tmp_path = filepath + ".tmp"
+            self._write_temp(tmp_path, data)
+            os.replace(tmp_path, filepath)
+            self._sync_directory()
+
+    def _write_temp(self, tmp_path: str, data: Any):
+        with open(tmp_path, 'wb') as f:
+            f.write(self.codec.dumps(data))
+            if self.fsync_writes:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _sync_directory(self):
+        # Makes completed renames durable; only needed when fsync_writes is on.
+        if not self.fsync_writes or not hasattr(os, "O_DIRECTORY"):
+            return
+        fd = os.open(self.data_dir, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _read_file(self, filepath: str) -> Any:
+        # Any codec's output parses here, so the codec can change between runs.
+        with self._locked_shared(filepath):
+            with open(filepath, 'rb') as f:
+                return json_codecs.loads(f.read())
+
+    # Locking
+    @contextmanager
+    def _writing(self):
+        """Serializes a whole read-modify-write against other threads and (if process_safe) processes."""
+        with self._thread_lock:
+            if self._locks is None:
+                yield
+                return
+            with self._locks.get("writer").exclusive():
+                yield
+
+    @contextmanager
+    def _locked_shared(self, filepath: str):
+        if self._locks is None:
+            yield
+            return
+        with self._locks.get(os.path.basename(filepath)).shared():
+            yield
+
+    @contextmanager
+    def _locked_exclusive(self, filepaths: List[str]):
+        if self._locks is None:
+            yield
+            return
+        with self._locks.exclusive_all(os.path.basename(filepath) for filepath in filepaths):
+            yield
+
+    # Unit of Work
+    @contextmanager
+    def unit_of_work(self):
+        """
+        Buffers every mutation made inside the block and commits them as one
+        atomic batch on exit; nothing is written if the block raises.
+        Nested blocks join the outermost one. Ledger appends made inside the
+        block are not visible to ledger reads until it commits.
+        """
+        if self._batch is not None:
+            yield
+            return
+        with self._writing():
+            self._begin_batch()
+            self._batch = PendingBatch()
+            try:
+                yield
+            except BaseException:
+                batch, self._batch = self._batch, None
+                self._abort_batch(batch)
+                raise
+            batch, self._batch = self._batch, None
+            self._commit_batch(batch)
+
+    def _begin_batch(self):
+        pass
+
+    def _commit_batch(self, batch: PendingBatch):
+        self._commit_files(batch.files, batch.ledger_records)
+
+    def _abort_batch(self, batch: PendingBatch):
+        pass
+
+    def _commit_files(self, files: Dict[str, Any], ledger_records: List[Dict]):
+        """
+        Applies a set of whole-file writes plus ledger appends atomically.
+        Each file is first written to a temp file, then a journal naming the
+        renames and appends is written, and only then are they applied. A crash
+        after the journal exists is rolled forward by _recover_journal.
+        """
+        if not files and not ledger_records:
+            return
+        if len(files) == 1 and not ledger_records:
+            filepath, data = next(iter(files.items()))
+            self._write_file(filepath, data)
+            return
+        with self._locked_exclusive(list(files)):
+            renames = []
+            for filepath, data in files.items():
+                tmp_path = filepath + ".tmp"
+                self._write_temp(tmp_path, data)
+                renames.append([tmp_path, filepath])
+            journal = {"renames": renames, "ledger_position": None, "ledger_records": ledger_records}
+            if ledger_records:
+                journal["ledger_position"] = self.ledger.position()
+            self._write_file(self.journal_file, journal)
+            self._apply_journal(journal)
+            os.remove(self.journal_file)
+
+    def _apply_journal(self, journal: Dict):
+        for tmp_path, filepath in journal["renames"]:
+            if os.path.exists(tmp_path):
+                os.replace(tmp_path, filepath)
+        if journal["ledger_records"]:
+            self.ledger.truncate(journal["ledger_position"])
+            self.ledger.append_many(journal["ledger_records"])
+            if self.fsync_writes:
+                self.ledger.sync()
+        self._sync_directory()
+
+    def _recover_journal(self):
+        if not os.path.exists(self.journal_file):
+            return
+        try:
+            journal = self._read_file(self.journal_file)
+        except ValueError:
+            # Torn journal: the batch never reached its commit point, so none of it was applied.
+            os.remove(self.journal_file)
+            return
+        self._apply_journal(journal)
+        os.remove(self.journal_file)
+
+    def close(self):
+        """Releases resources held by the layer. Plain JSON writes are immediate."""
+        self.ledger.close()
 
     # User Operations
     def save_user(self, user_dict: Dict):
-        users = self._load_json(self.users_file)
-        users[user_dict["user_id"]] = user_dict
-        self._save_json(self.users_file, users)
+        with self._writing():
+            users = self._load_json(self.users_file)
+            users[user_dict["user_id"]] = user_dict
+            self._save_json(self.users_file, users)
 
     def get_user(self, user_id: str) -> Dict:
         users = self._load_json(self.users_file)
@@ -57,9 +273,18 @@ class PersistenceLayer:
 
     # Account Operations
     def save_account(self, account_dict: Dict):
-        accounts = self._load_json(self.accounts_file)
-        accounts[account_dict["account_id"]] = account_dict
-        self._save_json(self.accounts_file, accounts)
+        with self._writing():
+            accounts = self._load_json(self.accounts_file)
+            accounts[account_dict["account_id"]] = account_dict
+            self._save_json(self.accounts_file, accounts)
+
+    def save_accounts(self, account_dicts: List[Dict]):
+        """Saves many accounts with one read and one write of the accounts file."""
+        with self._writing():
+            accounts = self._load_json(self.accounts_file)
+            for account_dict in account_dicts:
+                accounts[account_dict["account_id"]] = account_dict
+            self._save_json(self.accounts_file, accounts)
 
     def get_account(self, account_id: str) -> Dict:
         accounts = self._load_json(self.accounts_file)
@@ -69,24 +294,55 @@ class PersistenceLayer:
         accounts = self._load_json(self.accounts_file)
         return [acc for acc in accounts.values() if acc["user_id"] == user_id]
 
+    def get_all_accounts(self) -> List[Dict]:
+        accounts = self._load_json(self.accounts_file)
+        return list(accounts.values())
+
     # Transaction Operations
     def log_transaction(self, transaction_dict: Dict):
-        transactions = self._load_json(self.transactions_file)
-        transactions.append(transaction_dict)
-        self._save_json(self.transactions_file, transactions)
+        with self._writing():
+            if self._batch is not None and self.ledger.append_only:
+                self._batch.ledger_records.append(transaction_dict)
+                return
+            self.ledger.append(transaction_dict)
 
-    def get_transactions_for_account(self, account_id: str) -> List[Dict]:
-        transactions = self._load_json(self.transactions_file)
-        return [t for t in transactions if t["account_id"] == account_id]
+    def log_transactions(self, transaction_dicts: List[Dict]):
+        """Appends many transactions to the ledger in one write."""
+        with self._writing():
+            if self._batch is not None and self.ledger.append_only:
+                self._batch.ledger_records.extend(transaction_dicts)
+                return
+            self.ledger.append_many(transaction_dicts)
+
+    def get_transactions_for_account(self, account_id: str, start: Bound = None, end: Bound = None) -> List[Dict]:
+        """Transactions of one account, optionally limited to timestamps in [start, end)."""
+        return self.ledger.for_account(account_id, start, end)
     
     def get_all_transactions(self) -> List[Dict]:
-        return self._load_json(self.transactions_file)
+        return self.ledger.all()
+
+    def get_ledger_records(self) -> List[Dict]:
+        """The ledger records as stored: a journal entry is one record with its postings, not two legs."""
+        return list(self.ledger.iter_records())
+
+    # Balance Checkpoints
+    def save_balance_checkpoints(self, checkpoint_dict: Dict):
+        """Replaces an account's checkpoints: {"account_id": ..., "checkpoints": [{"as_of", "balance"}, ...]}."""
+        with self._writing():
+            checkpoints = self._load_json(self.checkpoints_file)
+            checkpoints[checkpoint_dict["account_id"]] = checkpoint_dict
+            self._save_json(self.checkpoints_file, checkpoints)
+
+    def get_balance_checkpoints(self, account_id: str) -> List[Dict]:
+        checkpoints = self._load_json(self.checkpoints_file)
+        return checkpoints.get(account_id, {}).get("checkpoints", [])
 
     # Loan Operations
     def save_loan(self, loan_dict: Dict):
-        loans = self._load_json(self.loans_file)
-        loans[loan_dict["loan_id"]] = loan_dict
-        self._save_json(self.loans_file, loans)
+        with self._writing():
+            loans = self._load_json(self.loans_file)
+            loans[loan_dict["loan_id"]] = loan_dict
+            self._save_json(self.loans_file, loans)
 
     def get_loan(self, loan_id: str) -> Dict:
         loans = self._load_json(self.loans_file)
@@ -102,9 +358,16 @@ class PersistenceLayer:
 
     # Fraud Operations
     def save_fraud_flag(self, flag_dict: Dict):
-        flags = self._load_json(self.fraud_file)
-        flags.append(flag_dict)
-        self._save_json(self.fraud_file, flags)
+        with self._writing():
+            flags = self._load_json(self.fraud_file)
+            flags.append(flag_dict)
+            self._save_json(self.fraud_file, flags)
+
+    def save_fraud_flags(self, flag_dicts: List[Dict]):
+        with self._writing():
+            flags = self._load_json(self.fraud_file)
+            flags.extend(flag_dicts)
+            self._save_json(self.fraud_file, flags)
 
     def get_fraud_flags(self) -> List[Dict]:
         return self._load_json(self.fraud_file)
@@ -0,0 +1,27 @@
+import atexit
+import weakref
+
+# Objects whose close() still has work to do at interpreter exit (a cached
+# layer's pending writes, a fraud pipeline's queued checks). Held weakly, so
+# registering here does not keep an otherwise unreachable instance alive; a
+# dict rather than a set, so they are closed newest first.
+_OPEN = weakref.WeakKeyDictionary()
+
+
+def close_at_exit(obj):
+    """
+    Calls obj.close() at interpreter exit if it is still alive. Objects are
+    closed in reverse order of registration, so a pipeline drains into the
+    persistence layer it was created on before that layer flushes.
+    """
+    _OPEN[obj] = None
+
+
+def discard_at_exit(obj):
+    _OPEN.pop(obj, None)
+
+
+@atexit.register
+def _close_open_objects():
+    for obj in reversed(list(_OPEN.keys())):
+        obj.close()
@@ -0,0 +1,321 @@
+import json
+import os
+import sqlite3
+import sys
+from contextlib import contextmanager
+from typing import Dict, List
+
+from src.models.transaction import legs_for_account, transaction_legs
+from src.utils.ledger import Bound, iso_bound
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_users_username ON users (username);
+
+CREATE TABLE IF NOT EXISTS accounts (
+    account_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    account_type TEXT,
+    balance REAL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_accounts_user_id ON accounts (user_id);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    transaction_id TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    timestamp TEXT,
+    data TEXT NOT NULL,
+    counterparty_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_account_id_timestamp ON transactions (account_id, timestamp);
+
+CREATE TABLE IF NOT EXISTS loans (
+    loan_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    status TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_loans_user_id_status ON loans (user_id, status);
+
+CREATE TABLE IF NOT EXISTS balance_checkpoints (
+    account_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS fraud_flags (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    transaction_id TEXT,
+    data TEXT NOT NULL
+);
+"""
+
+# Run after SCHEMA, once databases created before the column existed have it.
+COUNTERPARTY_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_transactions_counterparty_id_timestamp ON transactions (counterparty_id, timestamp);
+"""
+
+# The tables import_json_dir() fills; it only imports into a database where all are empty.
+IMPORTED_TABLES = ("users", "accounts", "transactions", "loans", "fraud_flags", "balance_checkpoints")
+
+INSERT_TRANSACTION = (
+    "INSERT INTO transactions (transaction_id, account_id, timestamp, data, counterparty_id) VALUES (?, ?, ?, ?, ?)"
+)
+
+def _transaction_row(t: Dict) -> tuple:
+    # A journal entry is also found through the account it credits.
+    counterparty = t.get("related_account_id") if "postings" in t else None
+    return (t["transaction_id"], t["account_id"], t.get("timestamp"), json.dumps(t), counterparty)
+
+class SqlitePersistenceLayer:
+    """
+    Drop-in replacement for PersistenceLayer backed by a single SQLite database.
+
+    Lookup columns (ids, username, account type, status, ...) are real indexed
+    columns; the full record is kept alongside as JSON so callers get back
+    exactly the dict they saved. The database runs in WAL mode and every query
+    is a fixed, parameterised statement, so sqlite3's statement cache reuses
+    the prepared form. A unit of work maps onto one SQLite transaction.
+
+    A transfer journal entry is one row, indexed under the sending account
+    (account_id) and the receiving one (counterparty_id).
+
+    Not `thread_safe`: the sqlite3 connection belongs to the thread that
+    opened it, so this layer cannot back services that call it from other
+    threads, such as the async facades or a FraudPipeline.
+    """
+    thread_safe = False
+
+    def __init__(self, db_path: str = "data/banking.db"):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(transactions)")}
+        if "counterparty_id" not in columns:
+            self.conn.execute("ALTER TABLE transactions ADD COLUMN counterparty_id TEXT")
+        self.conn.executescript(COUNTERPARTY_INDEX)
+        self.conn.commit()
+        self._uow_depth = 0
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def unit_of_work(self):
+        """Runs the block in one transaction; it is rolled back if the block raises."""
+        self._uow_depth += 1
+        try:
+            yield
+        except BaseException:
+            self._uow_depth -= 1
+            if self._uow_depth == 0:
+                self.conn.rollback()
+            raise
+        self._uow_depth -= 1
+        if self._uow_depth == 0:
+            self.conn.commit()
+
+    def _write(self, sql: str, params: tuple):
+        self.conn.execute(sql, params)
+        if self._uow_depth == 0:
+            self.conn.commit()
+
+    def _write_many(self, sql: str, rows: List[tuple]):
+        self.conn.executemany(sql, rows)
+        if self._uow_depth == 0:
+            self.conn.commit()
+
+    def _fetch_one(self, sql: str, params: tuple) -> Dict:
+        row = self.conn.execute(sql, params).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _fetch_all(self, sql: str, params: tuple = ()) -> List[Dict]:
+        return [json.loads(row[0]) for row in self.conn.execute(sql, params)]
+
+    # User Operations
+    def save_user(self, user_dict: Dict):
+        self._write(
+            "INSERT OR REPLACE INTO users (user_id, username, data) VALUES (?, ?, ?)",
+            (user_dict["user_id"], user_dict["username"], json.dumps(user_dict))
+        )
+
+    def get_user(self, user_id: str) -> Dict:
+        return self._fetch_one("SELECT data FROM users WHERE user_id = ?", (user_id,))
+
+    def get_user_by_username(self, username: str) -> Dict:
+        return self._fetch_one("SELECT data FROM users WHERE username = ? LIMIT 1", (username,))
+
+    def get_all_users(self) -> List[Dict]:
+        return self._fetch_all("SELECT data FROM users ORDER BY rowid")
+
+    # Account Operations
+    def save_account(self, account_dict: Dict):
+        self._write(
+            "INSERT OR REPLACE INTO accounts (account_id, user_id, account_type, balance, data) VALUES (?, ?, ?, ?, ?)",
+            (account_dict["account_id"], account_dict["user_id"], account_dict.get("account_type"),
+             account_dict.get("balance"), json.dumps(account_dict))
+        )
+
+    def save_accounts(self, account_dicts: List[Dict]):
+        self._write_many(
+            "INSERT OR REPLACE INTO accounts (account_id, user_id, account_type, balance, data) VALUES (?, ?, ?, ?, ?)",
+            [(a["account_id"], a["user_id"], a.get("account_type"), a.get("balance"), json.dumps(a))
+             for a in account_dicts]
+        )
+
+    def get_account(self, account_id: str) -> Dict:
+        return self._fetch_one("SELECT data FROM accounts WHERE account_id = ?", (account_id,))
+
+    def get_accounts_for_user(self, user_id: str) -> List[Dict]:
+        return self._fetch_all("SELECT data FROM accounts WHERE user_id = ? ORDER BY rowid", (user_id,))
+
+    def get_all_accounts(self) -> List[Dict]:
+        return self._fetch_all("SELECT data FROM accounts ORDER BY rowid")
+
+    # Transaction Operations
+    def log_transaction(self, transaction_dict: Dict):
+        self._write(INSERT_TRANSACTION, _transaction_row(transaction_dict))
+
+    def log_transactions(self, transaction_dicts: List[Dict]):
+        self._write_many(INSERT_TRANSACTION, [_transaction_row(t) for t in transaction_dicts])
+
+    def get_transactions_for_account(self, account_id: str, start: Bound = None, end: Bound = None) -> List[Dict]:
+        sql = "SELECT data FROM transactions WHERE (account_id = ? OR counterparty_id = ?)"
+        params = [account_id, account_id]
+        if start is not None:
+            sql += " AND timestamp >= ?"
+            params.append(iso_bound(start))
+        if end is not None:
+            sql += " AND timestamp < ?"
+            params.append(iso_bound(end))
+        return [leg for record in self._fetch_all(sql + " ORDER BY seq", tuple(params))
+                for leg in legs_for_account(record, account_id)]
+
+    def get_all_transactions(self) -> List[Dict]:
+        return [leg for record in self.get_ledger_records() for leg in transaction_legs(record)]
+
+    def get_ledger_records(self) -> List[Dict]:
+        return self._fetch_all("SELECT data FROM transactions ORDER BY seq")
+
+    # Balance Checkpoints
+    def save_balance_checkpoints(self, checkpoint_dict: Dict):
+        self._write(
+            "INSERT OR REPLACE INTO balance_checkpoints (account_id, data) VALUES (?, ?)",
+            (checkpoint_dict["account_id"], json.dumps(checkpoint_dict))
+        )
+
+    def get_balance_checkpoints(self, account_id: str) -> List[Dict]:
+        record = self._fetch_one("SELECT data FROM balance_checkpoints WHERE account_id = ?", (account_id,))
+        return record["checkpoints"] if record else []
+
+    # Loan Operations
+    def save_loan(self, loan_dict: Dict):
+        self._write(
+            "INSERT OR REPLACE INTO loans (loan_id, user_id, status, data) VALUES (?, ?, ?, ?)",
+            (loan_dict["loan_id"], loan_dict["user_id"], loan_dict.get("status"), json.dumps(loan_dict))
+        )
+
+    def get_loan(self, loan_id: str) -> Dict:
+        return self._fetch_one("SELECT data FROM loans WHERE loan_id = ?", (loan_id,))
+
+    def get_loans_for_user(self, user_id: str) -> List[Dict]:
+        return self._fetch_all("SELECT data FROM loans WHERE user_id = ? ORDER BY rowid", (user_id,))
+
+    def get_all_loans(self) -> List[Dict]:
+        return self._fetch_all("SELECT data FROM loans ORDER BY rowid")
+
+    # Fraud Operations
+    def save_fraud_flag(self, flag_dict: Dict):
+        self._write(
+            "INSERT INTO fraud_flags (transaction_id, data) VALUES (?, ?)",
+            (flag_dict.get("transaction_id"), json.dumps(flag_dict))
+        )
+
+    def save_fraud_flags(self, flag_dicts: List[Dict]):
+        self._write_many(
+            "INSERT INTO fraud_flags (transaction_id, data) VALUES (?, ?)",
+            [(f.get("transaction_id"), json.dumps(f)) for f in flag_dicts]
+        )
+
+    def get_fraud_flags(self) -> List[Dict]:
+        return self._fetch_all("SELECT data FROM fraud_flags ORDER BY seq")
+
+    # Import
+    def import_json_dir(self, data_dir: str = "data") -> Dict[str, int]:
+        """
+        Loads the users/accounts/transactions/loans/fraud/balance checkpoint
+        JSON files written by PersistenceLayer into this database in one
+        transaction. Returns the number of records imported per collection.
+
+        Ledger rows and fraud flags have no key to merge on, so importing
+        twice would duplicate them: the database must be empty (ValueError
+        otherwise).
+        """
+        from src.utils.persistence import PersistenceLayer
+        for table in IMPORTED_TABLES:
+            if self.conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                raise ValueError(f"{self.db_path} already holds {table}; import into a new database")
+        source = PersistenceLayer(data_dir=data_dir)
+        users = source.get_all_users()
+        accounts = source._load_json(source.accounts_file).values()
+        transactions = source.get_ledger_records()
+        loans = source.get_all_loans()
+        flags = source.get_fraud_flags()
+        checkpoints = source._load_json(source.checkpoints_file).values()
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO users (user_id, username, data) VALUES (?, ?, ?)",
+                [(u["user_id"], u["username"], json.dumps(u)) for u in users]
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO accounts (account_id, user_id, account_type, balance, data) VALUES (?, ?, ?, ?, ?)",
+                [(a["account_id"], a["user_id"], a.get("account_type"), a.get("balance"), json.dumps(a)) for a in accounts]
+            )
+            self.conn.executemany(INSERT_TRANSACTION, [_transaction_row(t) for t in transactions])
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO loans (loan_id, user_id, status, data) VALUES (?, ?, ?, ?)",
+                [(l["loan_id"], l["user_id"], l.get("status"), json.dumps(l)) for l in loans]
+            )
+            self.conn.executemany(
+                "INSERT INTO fraud_flags (transaction_id, data) VALUES (?, ?)",
+                [(f.get("transaction_id"), json.dumps(f)) for f in flags]
+            )
+            self.conn.executemany(
+                "INSERT INTO balance_checkpoints (account_id, data) VALUES (?, ?)",
+                [(c["account_id"], json.dumps(c)) for c in checkpoints]
+            )
+        return {
+            "users": len(users),
+            "accounts": len(accounts),
+            "transactions": len(transactions),
+            "loans": len(loans),
+            "fraud": len(flags),
+            "balance_checkpoints": len(checkpoints)
+        }
+
+
+if __name__ == "__main__":
+    # Import tool: python -m src.utils.sqlite_persistence <db_path> [data_dir]
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python -m src.utils.sqlite_persistence <db_path> [data_dir]")
+        sys.exit(1)
+    layer = SqlitePersistenceLayer(sys.argv[1])
+    try:
+        counts = layer.import_json_dir(sys.argv[2] if len(sys.argv) == 3 else "data")
+    except ValueError as e:
+        print(f"Import failed: {e}")
+        sys.exit(1)
+    finally:
+        layer.close()
+    print(", ".join(f"{name}: {count}" for name, count in counts.items()))
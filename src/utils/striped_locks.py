@@ -0,0 +1,34 @@
+import threading
+from contextlib import contextmanager, ExitStack
+from typing import Hashable, List
+
+class StripedLocks:
+    """
+    A fixed table of locks shared out by hashing keys onto it ("lock striping").
+
+    Keys on different stripes never contend, and memory stays constant however
+    many keys there are. hold() takes every stripe it needs in ascending stripe
+    order, so two callers locking the same keys in opposite order (a transfer
+    A->B racing B->A) cannot deadlock.
+    """
+    def __init__(self, stripes: int = 64):
+        if stripes < 1:
+            raise ValueError("stripes must be at least 1")
+        self._locks: List[threading.RLock] = [threading.RLock() for _ in range(stripes)]
+
+    def stripe(self, key: Hashable) -> int:
+        return hash(key) % len(self._locks)
+
+    @contextmanager
+    def hold(self, *keys: Hashable):
+        with ExitStack() as stack:
+            for index in sorted({self.stripe(key) for key in keys}):
+                stack.enter_context(self._locks[index])
+            yield
+
+    @contextmanager
+    def hold_all(self):
+        with ExitStack() as stack:
+            for lock in self._locks:
+                stack.enter_context(lock)
+            yield
@@ -0,0 +1,49 @@
+import pytest
+from src.services.audit_service import AuditService
+from src.services.bank_service import BankService
+from src.utils.cached_persistence import CachedPersistenceLayer
+from src.utils.persistence import PersistenceLayer
+from src.utils.sqlite_persistence import SqlitePersistenceLayer
+
+def open_persistence(kind, tmp_path, **options):
+    """
+    A persistence layer storing its data under tmp_path. `kind` is "sqlite",
+    "cached" (JSON ledger), "cached_jsonl", "cached_wal" (JSON-Lines ledger
+    with a batch write-ahead log), or a PersistenceLayer ledger format
+    ("json", "jsonl", "partitioned", "binary"). `options` go to the layer.
+    """
+    if kind == "sqlite":
+        return SqlitePersistenceLayer(str(tmp_path / "bank.db"), **options)
+    if kind.startswith("cached"):
+        options.setdefault("flush_interval", None)
+        if kind != "cached":
+            options.setdefault("ledger_format", "jsonl")
+        if kind == "cached_wal":
+            options.setdefault("durability", "batch")
+        return CachedPersistenceLayer(data_dir=str(tmp_path), **options)
+    return PersistenceLayer(data_dir=str(tmp_path), ledger_format=kind, **options)
+
+def account_record(account_id, account_type, balance, user_id="u1"):
+    return {
+        "account_id": account_id,
+        "user_id": user_id,
+        "balance": balance,
+        "created_at": "2024-01-01T00:00:00",
+        "is_active": True,
+        "account_type": account_type
+    }
+
+@pytest.fixture
+def persistence(request, tmp_path):
+    """A layer of the kind given by indirect parametrization (a JSON PersistenceLayer by default)."""
+    layer = open_persistence(getattr(request, "param", "json"), tmp_path)
+    yield layer
+    layer.close()
+
+@pytest.fixture
+def bank(persistence, tmp_path):
+    """A BankService on `persistence` that audits to tmp_path instead of data/audit.log."""
+    service = BankService(persistence)
+    service.audit_service = AuditService(str(tmp_path / "audit.log"))
+    yield service
+    service.close()
@@ -0,0 +1,104 @@
+import pytest
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.services.async_services import AsyncBankService, AsyncLoanService, AsyncReportService
+from src.services.audit_service import AuditService
+from src.services.auth_service import AuthService
+from src.utils.cached_persistence import CachedPersistenceLayer
+from src.utils.sqlite_persistence import SqlitePersistenceLayer
+from src.utils.validators import ValidationError
+
+class TestAsyncServices:
+
+    @pytest.fixture
+    def persistence(self, tmp_path):
+        layer = CachedPersistenceLayer(data_dir=str(tmp_path), flush_interval=None)
+        yield layer
+        layer.close()
+
+    @pytest.fixture
+    def user(self, persistence):
+        return AuthService(persistence).register("async", "Password123", "a@test.com", "1234567890")
+
+    def _bank(self, persistence, tmp_path, **kwargs):
+        bank = AsyncBankService(persistence, **kwargs)
+        bank.service.audit_service = AuditService(os.path.join(str(tmp_path), "audit.log"))
+        return bank
+
+    def test_concurrent_clients(self, persistence, user, tmp_path):
+        bank = self._bank(persistence, tmp_path, max_workers=4)
+
+        async def main():
+            accounts = await asyncio.gather(*[bank.create_account(user, "CURRENT", 100.0) for _ in range(10)])
+            ids = [a.account_id for a in accounts]
+            await asyncio.gather(*[bank.deposit(ids[i % 10], 1.0) for i in range(200)],
+                                 *[bank.transfer(ids[i % 10], ids[(i + 1) % 10], 5.0) for i in range(50)])
+            return ids
+
+        ids = asyncio.run(main())
+        bank.close()
+        assert sum(persistence.get_account(a)["balance"] for a in ids) == pytest.approx(1200.0)
+        assert all(persistence.get_account(a)["balance"] == pytest.approx(120.0) for a in ids)
+
+    def test_calls_run_off_the_event_loop(self, persistence, user, tmp_path):
+        bank = self._bank(persistence, tmp_path)
+        loop_thread = []
+        call_threads = []
+        original = bank.service.deposit
+        bank.service.deposit = lambda *args: call_threads.append(threading.get_ident()) or original(*args)
+
+        async def main():
+            loop_thread.append(threading.get_ident())
+            account = await bank.create_account(user, "SAVINGS", 1000.0)
+            await bank.deposit(account.account_id, 10.0)
+
+        asyncio.run(main())
+        bank.close()
+        assert call_threads and call_threads[0] != loop_thread[0]
+
+    def test_errors_propagate(self, persistence, user, tmp_path):
+        bank = self._bank(persistence, tmp_path)
+
+        async def main():
+            account = await bank.create_account(user, "SAVINGS", 1000.0)
+            await bank.withdraw(account.account_id, 900.0)
+
+        with pytest.raises(ValidationError):
+            asyncio.run(main())
+        bank.close()
+
+    def test_shared_executor_for_loans_and_reports(self, persistence, user, tmp_path):
+        executor = ThreadPoolExecutor(max_workers=2)
+        bank = self._bank(persistence, tmp_path, executor=executor)
+        loans = AsyncLoanService(persistence, executor=executor)
+        reports = AsyncReportService(persistence, executor=executor)
+
+        async def main():
+            account = await bank.create_account(user, "SAVINGS", 1000.0)
+            loan = await loans.apply_for_loan(user, 500.0, 12)
+            await loans.approve_loan(loan.loan_id)
+            await asyncio.gather(*[loans.repay_loan(loan.loan_id, 50.0) for _ in range(10)])
+            statement, admin = await asyncio.gather(reports.generate_account_statement(account.account_id),
+                                                    reports.generate_admin_report())
+            return loan, statement, admin, await loans.get_user_loans(user.user_id)
+
+        loan, statement, admin, user_loans = asyncio.run(main())
+        # Sharing the executor: closing a facade must not shut it down
+        for facade in (bank, loans, reports):
+            facade.close()
+        assert executor.submit(lambda: 1).result() == 1
+        executor.shutdown()
+
+        # No repayment lost: all ten reductions applied
+        assert user_loans[0].remaining_amount == pytest.approx(max(loan.remaining_amount - 500.0, 0.0))
+        assert "Current Balance: $1000.00" in statement
+        assert "Total Accounts: 1" in admin
+
+    def test_refuses_a_layer_bound_to_one_thread(self, tmp_path):
+        sqlite = SqlitePersistenceLayer(str(tmp_path / "bank.db"))
+        for facade in (AsyncBankService, AsyncLoanService, AsyncReportService):
+            with pytest.raises(ValueError, match="SqlitePersistenceLayer is not thread_safe"):
+                facade(sqlite)
+        sqlite.close()
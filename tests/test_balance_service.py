@@ -0,0 +1,102 @@
+import pytest
+from datetime import datetime
+from src.models.transaction import signed_amount
+from src.services.balance_service import BalanceService
+from src.services.interest_engine import InterestEngine
+from src.services.report_service import ReportService
+from src.utils.persistence import PersistenceLayer
+from conftest import account_record
+
+def _tx(tx_id, amount, tx_type, ts, description=""):
+    return {
+        "transaction_id": tx_id,
+        "account_id": "acc1",
+        "amount": amount,
+        "transaction_type": tx_type,
+        "timestamp": ts,
+        "description": description,
+        "related_account_id": None
+    }
+
+HISTORY = [
+    _tx("t1", 1000.0, "DEPOSIT", "2024-01-05T10:00:00", "Initial Deposit"),
+    _tx("t2", 200.0, "WITHDRAWAL", "2024-01-20T10:00:00"),
+    _tx("t3", 300.0, "TRANSFER", "2024-03-02T10:00:00", "Transfer to acc2"),
+    _tx("t4", 50.0, "TRANSFER", "2024-03-10T10:00:00", "Transfer from acc2"),
+    _tx("t5", 10.0, "FEE", "2024-03-31T23:59:59"),
+    _tx("t6", 5.0, "INTEREST", "2024-04-01T00:00:00"),
+]
+
+@pytest.mark.parametrize("persistence", ["json", "cached", "sqlite"], indirect=True)
+class TestBalanceService:
+
+    @pytest.fixture(autouse=True)
+    def history(self, persistence):
+        for tx in HISTORY:
+            persistence.log_transaction(tx)
+
+    def test_balance_at_dates(self, persistence):
+        service = BalanceService(persistence)
+        assert service.balance_at("acc1", datetime(2024, 1, 1)) == 0.0
+        assert service.balance_at("acc1", datetime(2024, 2, 1)) == 800.0
+        assert service.balance_at("acc1", datetime(2024, 3, 5)) == 500.0
+        assert service.balance_at("acc1", datetime(2024, 4, 1)) == 540.0
+        assert service.balance_at("acc1", datetime(2024, 5, 1)) == 545.0
+
+    def test_checkpoints_saved_while_replaying(self, persistence):
+        service = BalanceService(persistence)
+        service.balance_at("acc1", datetime(2024, 5, 1))
+        checkpoints = persistence.get_balance_checkpoints("acc1")
+        assert checkpoints == [
+            {"as_of": "2024-02-01T00:00:00", "balance": 800.0},
+            {"as_of": "2024-04-01T00:00:00", "balance": 540.0},
+            {"as_of": "2024-05-01T00:00:00", "balance": 545.0},
+        ]
+
+    def test_only_transactions_after_checkpoint_are_read(self, persistence, monkeypatch):
+        service = BalanceService(persistence)
+        service.rebuild_checkpoints()
+
+        ranges = []
+        original = persistence.get_transactions_for_account
+        monkeypatch.setattr(persistence, "get_transactions_for_account",
+                            lambda account_id, start=None, end=None: ranges.append(start) or original(account_id, start, end))
+        assert service.balance_at("acc1", datetime(2024, 3, 15)) == 550.0
+        assert ranges == ["2024-02-01T00:00:00"]
+
+    def test_rebuild_replaces_stale_checkpoints(self, persistence):
+        service = BalanceService(persistence)
+        persistence.save_balance_checkpoints({"account_id": "acc1", "checkpoints": [{"as_of": "2024-02-01T00:00:00", "balance": 1.0}]})
+        assert service.balance_at("acc1", datetime(2024, 2, 2)) == 1.0
+
+        assert service.rebuild_checkpoints() == 3
+        assert service.balance_at("acc1", datetime(2024, 2, 2)) == 800.0
+
+    def test_backdated_interest_invalidates_later_checkpoints(self, persistence):
+        service = BalanceService(persistence)
+        service.balance_at("acc1", datetime(2024, 5, 1))
+        persistence.save_account(account_record("acc1", "SAVINGS", 545.0))
+
+        summary = InterestEngine(persistence).apply(as_of=datetime(2024, 2, 15))
+        assert persistence.get_balance_checkpoints("acc1") == [{"as_of": "2024-02-01T00:00:00", "balance": 800.0}]
+        assert service.balance_at("acc1", datetime(2024, 3, 5)) == 500.0 + summary.total_interest
+        assert service.balance_at("acc1", datetime(2024, 5, 1)) == 545.0 + summary.total_interest
+
+
+class TestSignedHistory:
+
+    def test_signed_amounts(self):
+        assert [signed_amount(tx) for tx in HISTORY] == [1000.0, -200.0, -300.0, 50.0, -10.0, 5.0]
+
+    def test_period_statement_with_running_balance(self, tmp_path):
+        persistence = PersistenceLayer(data_dir=str(tmp_path))
+        persistence.save_account({"account_id": "acc1", "user_id": "u1", "balance": 545.0, "account_type": "SAVINGS"})
+        for tx in HISTORY:
+            persistence.log_transaction(tx)
+
+        statement = ReportService(persistence).generate_account_statement(
+            "acc1", datetime(2024, 3, 1), datetime(2024, 4, 1), running_balance=True)
+        lines = statement.splitlines()
+        assert "Opening Balance: $800.00" in lines
+        assert lines[-2].startswith("2024-03-02T10:00:00  | TRANSFER     | $300.00    | $500.00")
+        assert lines[-4].startswith("2024-03-31T23:59:59  | FEE          | $10.00     | $540.00")
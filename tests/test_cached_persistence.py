@@ -0,0 +1,109 @@
+import pytest
+import json
+import os
+from src.services.auth_service import AuthService
+from src.services.bank_service import BankService
+from src.utils.cached_persistence import CachedPersistenceLayer
+from src.utils.persistence import PersistenceLayer
+
+class TestCachedPersistence:
+
+    @pytest.fixture
+    def persistence(self, tmp_path):
+        return CachedPersistenceLayer(data_dir=str(tmp_path), flush_interval=None)
+
+    def _read_file(self, path):
+        with open(path) as f:
+            return json.load(f)
+
+    def test_writes_stay_in_memory_until_commit(self, persistence):
+        persistence.save_user({"user_id": "u1", "username": "alice", "accounts": []})
+
+        assert persistence.get_user("u1")["username"] == "alice"
+        assert persistence.is_dirty()
+        assert self._read_file(persistence.users_file) == {}
+
+        persistence.commit()
+        assert not persistence.is_dirty()
+        assert self._read_file(persistence.users_file)["u1"]["username"] == "alice"
+
+    def test_close_flushes_pending_writes(self, persistence):
+        persistence.log_transaction({"transaction_id": "t1", "account_id": "a1"})
+        persistence.close()
+        assert self._read_file(persistence.transactions_file) == [{"transaction_id": "t1", "account_id": "a1"}]
+
+    def test_flush_interval_zero_is_write_through(self, tmp_path):
+        p = CachedPersistenceLayer(data_dir=str(tmp_path), flush_interval=0)
+        p.save_account({"account_id": "a1", "user_id": "u1", "balance": 10.0})
+        assert not p.is_dirty()
+        assert self._read_file(p.accounts_file)["a1"]["balance"] == 10.0
+
+    def test_does_not_reparse_unchanged_file(self, persistence, monkeypatch):
+        persistence.get_all_users()
+        calls = []
+        original = PersistenceLayer._load_json
+        monkeypatch.setattr(PersistenceLayer, "_load_json", lambda self, path: calls.append(path) or original(self, path))
+
+        persistence.get_all_users()
+        persistence.get_user_by_username("nobody")
+        assert calls == []
+
+    def test_reloads_when_file_changes_on_disk(self, persistence, tmp_path):
+        assert persistence.get_user("u2") is None
+
+        # Another process writes the file behind our back
+        other = PersistenceLayer(data_dir=str(tmp_path))
+        other.save_user({"user_id": "u2", "username": "bob", "accounts": []})
+
+        assert persistence.get_user("u2")["username"] == "bob"
+
+    def test_bank_operations_round_trip(self, persistence, tmp_path):
+        auth = AuthService(persistence)
+        bank = BankService(persistence)
+        user = auth.register("cached", "Password123", "c@test.com", "1234567890")
+        acc1 = bank.create_account(user, "SAVINGS", 1000.0)
+        acc2 = bank.create_account(user, "CURRENT", 0.0)
+        bank.transfer(acc1.account_id, acc2.account_id, 250.0)
+        persistence.commit()
+
+        fresh = PersistenceLayer(data_dir=str(tmp_path))
+        assert fresh.get_account(acc1.account_id)["balance"] == 750.0
+        assert fresh.get_account(acc2.account_id)["balance"] == 250.0
+        assert len(fresh.get_transactions_for_account(acc2.account_id)) == 1
+        assert set(fresh.get_user(user.user_id)["accounts"]) == {acc1.account_id, acc2.account_id}
+
+    # --- Secondary Indexes ---
+    def test_username_index_follows_renames(self, persistence):
+        persistence.save_user({"user_id": "u1", "username": "alice", "accounts": []})
+        assert persistence.get_user_by_username("alice")["user_id"] == "u1"
+
+        persistence.save_user({"user_id": "u1", "username": "alicia", "accounts": []})
+        assert persistence.get_user_by_username("alice") is None
+        assert persistence.get_user_by_username("alicia")["user_id"] == "u1"
+
+    def test_per_user_and_per_account_lookups(self, persistence):
+        for i, user_id in enumerate(["u1", "u2", "u1"]):
+            persistence.save_account({"account_id": f"a{i}", "user_id": user_id, "balance": 0.0})
+            persistence.save_loan({"loan_id": f"l{i}", "user_id": user_id, "status": "PENDING"})
+            persistence.log_transaction({"transaction_id": f"t{i}", "account_id": f"a{i % 2}"})
+        # Look up once so the indexes exist, then keep writing
+        assert [a["account_id"] for a in persistence.get_accounts_for_user("u1")] == ["a0", "a2"]
+        assert [t["transaction_id"] for t in persistence.get_transactions_for_account("a0")] == ["t0", "t2"]
+
+        persistence.save_account({"account_id": "a1", "user_id": "u1", "balance": 0.0})
+        persistence.log_transaction({"transaction_id": "t3", "account_id": "a0"})
+
+        assert sorted(a["account_id"] for a in persistence.get_accounts_for_user("u1")) == ["a0", "a1", "a2"]
+        assert persistence.get_accounts_for_user("u2") == []
+        assert [l["loan_id"] for l in persistence.get_loans_for_user("u1")] == ["l0", "l2"]
+        assert [t["transaction_id"] for t in persistence.get_transactions_for_account("a0")] == ["t0", "t2", "t3"]
+
+    def test_indexes_rebuilt_after_external_change(self, persistence, tmp_path):
+        persistence.save_account({"account_id": "a1", "user_id": "u1", "balance": 0.0})
+        persistence.commit()
+        assert len(persistence.get_accounts_for_user("u1")) == 1
+
+        other = PersistenceLayer(data_dir=str(tmp_path))
+        other.save_account({"account_id": "a2", "user_id": "u1", "balance": 0.0})
+
+        assert [a["account_id"] for a in persistence.get_accounts_for_user("u1")] == ["a1", "a2"]
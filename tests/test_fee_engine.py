@@ -0,0 +1,61 @@
+import pytest
+from datetime import datetime
+import src.services.fee_engine as fee_module
+from src.services.fee_engine import FeeEngine
+from src.utils.validators import ValidationError
+from conftest import account_record, open_persistence
+
+@pytest.fixture(params=["json", "cached", "sqlite"])
+def persistence(request, tmp_path):
+    layer = open_persistence(request.param, tmp_path)
+    layer.save_accounts([
+        account_record("c1", "CURRENT", -730.0),
+        account_record("c2", "CURRENT", 200.0),
+        account_record("c3", "CURRENT", 5000.0),
+        account_record("s1", "SAVINGS", -100.0),
+    ])
+    yield layer
+    layer.close()
+
+def test_overdraft_interest_and_maintenance_fees(persistence):
+    as_of = datetime(2024, 6, 30)
+    summary = FeeEngine(persistence, overdraft_rate=0.1825, maintenance_fee=5.0).apply(30, as_of=as_of)
+
+    # 730 overdrawn for 30 days at 18.25% a year is 10.95.
+    assert summary.accounts == 2
+    assert summary.overdraft_interest == pytest.approx(10.95)
+    assert summary.maintenance_fees == 10.0
+    assert summary.to_dict()["total_fees"] == pytest.approx(20.95)
+    assert persistence.get_account("c1")["balance"] == pytest.approx(-745.95)
+    assert persistence.get_account("c2")["balance"] == 195.0
+    assert persistence.get_account("c3")["balance"] == 5000.0
+    assert persistence.get_account("s1")["balance"] == -100.0
+
+    fees = persistence.get_transactions_for_account("c1")
+    assert [(t["transaction_type"], t["description"]) for t in fees] == [
+        ("FEE", "Overdraft Interest (30 days)"), ("FEE", "Maintenance Fee")]
+    assert fees[0]["timestamp"] == as_of.isoformat()
+    assert persistence.get_transactions_for_account("c3") == []
+
+def test_maintenance_fee_disabled(persistence):
+    summary = FeeEngine(persistence, maintenance_fee=0.0).apply(30)
+    assert summary.accounts == 1
+    assert summary.maintenance_fees == 0.0
+    assert persistence.get_account("c2")["balance"] == 200.0
+
+def test_invalid_period(persistence):
+    with pytest.raises(ValidationError):
+        FeeEngine(persistence).apply(period_days=0)
+    assert persistence.get_account("c1")["balance"] == -730.0
+
+def test_compute_charges_overdrawn_and_low_balances():
+    interest, fees = FeeEngine(None, overdraft_rate=0.365).compute([-1000.0, 200.0, 5000.0, 1000.0], 10)
+    assert interest == [pytest.approx(10.0), 0.0, 0.0, 0.0]
+    assert fees == [5.0, 5.0, 0.0, 0.0]
+
+def test_numpy_path_matches_pure_python(monkeypatch):
+    pytest.importorskip("numpy")
+    balances = [-730.0, 200.0, 5000.0, -1.0, 999.99]
+    vectorized = FeeEngine(None).compute(balances, 30)
+    monkeypatch.setattr(fee_module, "np", None)
+    assert FeeEngine(None).compute(balances, 30) == vectorized
@@ -0,0 +1,94 @@
+import pytest
+import uuid
+from datetime import datetime, timedelta
+from src.models.transaction import credit_leg_id, journal_entry
+from src.services.fraud_backfill import FraudBackfillService
+from src.services.fraud_rules import FraudRule, LargeAmountRule
+from src.services.fraud_service import FraudDetectionService
+from src.services.velocity_tracker import VelocityTracker
+from src.utils.persistence import PersistenceLayer
+
+START = datetime(2024, 5, 1, 9, 0, 0)
+
+class SmallWithdrawalRule(FraudRule):
+    name = "Small withdrawal"
+    cost = 0.5
+
+    def check(self, transaction, hits):
+        return [self.name] if transaction.transaction_type.value == "WITHDRAWAL" and transaction.amount < 100 else []
+
+@pytest.mark.parametrize("persistence", ["json", "jsonl", "binary", "cached_jsonl", "sqlite"], indirect=True)
+class TestFraudBackfill:
+
+    @pytest.fixture
+    def ledger(self, persistence):
+        a, b, c = (str(uuid.uuid4()) for _ in range(3))
+        def tx(account_id, amount, tx_type, minutes, description=""):
+            return {"transaction_id": str(uuid.uuid4()), "account_id": account_id, "amount": amount,
+                    "transaction_type": tx_type, "timestamp": (START + timedelta(minutes=minutes)).isoformat(),
+                    "description": description, "related_account_id": None}
+        records = [
+            tx(a, 20000.0, "DEPOSIT", 0, "Deposit"),
+            tx(a, 50.0, "WITHDRAWAL", 1, "crypto exchange"),
+            tx(c, 99999.0, "INTEREST", 2, "Annual Interest Applied"),   # not a scored movement
+        ]
+        # Four quick deposits into b: the fourth breaks a limit of three per hour.
+        records += [tx(b, 10.0, "DEPOSIT", 10 + n, "Deposit") for n in range(4)]
+        entry = journal_entry(str(uuid.uuid4()), a, b, 15000.0, (START + timedelta(minutes=30)).isoformat())
+        records.append(entry)
+        persistence.log_transactions(records)
+        return records, entry
+
+    def _service(self, persistence, workers=2, chunk_size=2):
+        fraud = FraudDetectionService(persistence, VelocityTracker(max_count=3, max_amount=1e9))
+        return FraudBackfillService(persistence, fraud, workers=workers, chunk_size=chunk_size)
+
+    def test_flags_whole_ledger_and_dedupes(self, persistence, ledger):
+        records, entry = ledger
+        persistence.save_fraud_flag(FraudDetectionService.flag_dict(records[0]["transaction_id"],
+                                                                    records[0]["timestamp"], ["Large transaction amount"]))
+
+        report = self._service(persistence).run()
+
+        assert report.scanned == 8  # the interest row is not scored
+        assert report.already_flagged == 1
+        assert report.new_flags == 4
+        assert report.rule_counts == {"High risk merchant": 1, "High velocity": 2, "Large transaction amount": 2}
+        assert report.tx_per_second > 0
+        flagged = {f["transaction_id"]: f["reasons"] for f in persistence.get_fraud_flags()}
+        assert flagged[credit_leg_id(entry["transaction_id"])] == [
+            "Large transaction amount", "High velocity: 5 transactions within 60 minutes"]
+        assert flagged[records[1]["transaction_id"]] == ["High risk merchant"]
+        # The sending leg is scored too.
+        assert flagged[entry["transaction_id"]] == ["Large transaction amount"]
+
+        # A second run finds nothing new.
+        again = self._service(persistence, workers=1).run()
+        assert again.new_flags == 0
+        assert again.already_flagged == 5
+
+    def test_serial_and_parallel_runs_agree(self, persistence, ledger, tmp_path):
+        records, _ = ledger
+        self._service(persistence, workers=1).run()
+        serial = sorted((f["transaction_id"], f["reasons"]) for f in persistence.get_fraud_flags())
+
+        other = PersistenceLayer(data_dir=str(tmp_path / "copy"), ledger_format="jsonl")
+        other.log_transactions(records)
+        self._service(other, workers=2, chunk_size=1).run()
+        assert sorted((f["transaction_id"], f["reasons"]) for f in other.get_fraud_flags()) == serial
+        other.close()
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_uses_the_services_configured_rules(self, persistence, ledger, workers):
+        records, _ = ledger
+        fraud = FraudDetectionService(persistence, VelocityTracker(max_count=100, max_amount=1e9))
+        fraud.engine.register(LargeAmountRule(limit=9.0), replace=True)
+        fraud.engine.register(SmallWithdrawalRule())
+
+        report = FraudBackfillService(persistence, fraud, workers=workers, chunk_size=2).run()
+
+        assert report.new_flags == 8
+        flagged = {f["transaction_id"]: f["reasons"] for f in persistence.get_fraud_flags()}
+        # The 10.00 deposits are only above the tuned limit; the cheaper added rule catches the withdrawal.
+        assert flagged[records[3]["transaction_id"]] == ["Large transaction amount"]
+        assert flagged[records[1]["transaction_id"]] == ["Small withdrawal"]
@@ -0,0 +1,137 @@
+import pytest
+import threading
+import time
+from src.models.transaction import Transaction, TransactionType
+from src.services.auth_service import AuthService
+from src.services.fraud_pipeline import FraudPipeline
+from src.services.fraud_service import FraudDetectionService
+from src.services.velocity_tracker import VelocityTracker
+
+def _tx(n, amount=50.0, description="Deposit"):
+    return Transaction(f"t{n}", "a1", amount, TransactionType.DEPOSIT, description=description)
+
+@pytest.mark.parametrize("persistence", ["jsonl"], indirect=True)
+class TestFraudPipeline:
+
+    def test_flags_are_saved_in_the_background(self, bank, persistence, tmp_path):
+        pipeline = bank.start_fraud_pipeline(sync_threshold=float("inf"))
+        user = AuthService(persistence).register("pipeline", "Password123", "p@test.com", "1234567890")
+        account_id = bank.create_account(user, "SAVINGS", 0.0).account_id
+
+        bank.deposit(account_id, 15000.0)
+        bank.deposit(account_id, 10.0)
+        pipeline.drain()
+
+        [flag] = persistence.get_fraud_flags()
+        assert flag["reasons"] == ["Large transaction amount"]
+        assert pipeline.processed == 2 and pipeline.flagged == 1
+        assert "FRAUD_ALERT" in (tmp_path / "audit.log").read_text()
+
+    def test_batch_legs_queue_behind_earlier_transfers(self, bank, persistence):
+        pipeline = bank.start_fraud_pipeline(sync_threshold=float("inf"))
+        release = threading.Event()
+        evaluate = bank.fraud_service.evaluate
+        def slow_evaluate(transaction):
+            release.wait(5)  # bounded, so a check run inline fails the test instead of hanging it
+            return evaluate(transaction)
+        bank.fraud_service.evaluate = slow_evaluate
+        user = AuthService(persistence).register("batch", "Password123", "b@test.com", "1234567890")
+        try:
+            a = bank.create_account(user, "SAVINGS", 0.0).account_id
+            b = bank.create_account(user, "CURRENT", 0.0).account_id
+            bank.deposit(a, 1000.0)
+            bank.transfer(a, b, 10.0)
+            report = bank.execute_batch([
+                {"from_account_id": a, "to_account_id": b, "amount": 20.0},
+                {"from_account_id": b, "to_account_id": a, "amount": 5.0},
+            ])
+            bank.transfer(b, a, 1.0)
+            # Nothing was checked inline: every leg waits in the queue.
+            evaluations = bank.fraud_service.engine.stats["High velocity"].evaluations
+        finally:
+            release.set()
+        assert report.succeeded == 2 and evaluations == 0
+
+        pipeline.drain()
+        assert bank.fraud_service.engine.stats["High velocity"].evaluations == 9
+        window = [timestamp for timestamp, _ in bank.fraud_service.velocity._windows[a]]
+        assert len(window) == 5 and window == sorted(window)
+
+    def test_high_risk_transactions_are_checked_synchronously(self, persistence):
+        fraud = FraudDetectionService(persistence)
+        pipeline = FraudPipeline(fraud, sync_threshold=1000.0)
+        try:
+            assert pipeline.submit(_tx(1, amount=15000.0)) is True
+            assert len(persistence.get_fraud_flags()) == 1
+            assert pipeline.submit(_tx(2, description="crypto exchange")) is False
+        finally:
+            pipeline.close()
+        assert len(persistence.get_fraud_flags()) == 2
+
+    def test_velocity_sees_high_risk_transactions_in_order(self, persistence):
+        fraud = FraudDetectionService(persistence, VelocityTracker(max_count=2))
+        release = threading.Event()
+        evaluate = fraud.evaluate
+        def slow_evaluate(transaction):
+            release.wait()
+            return evaluate(transaction)
+        fraud.evaluate = slow_evaluate
+        pipeline = FraudPipeline(fraud, batch_size=1, sync_threshold=1000.0)
+
+        first, large, last = _tx(1), _tx(2, amount=15000.0), _tx(3)
+        pipeline.submit(first)
+        assert pipeline.submit(large) is True  # screened at once, while t1 is still queued
+        assert fraud.engine.stats["High velocity"].evaluations == 0
+        pipeline.submit(last)
+        release.set()
+        pipeline.close()
+
+        window = fraud.velocity._windows["a1"]
+        assert [timestamp for timestamp, _ in window] == [first.timestamp, large.timestamp, last.timestamp]
+        flags = {flag["transaction_id"]: flag["reasons"] for flag in persistence.get_fraud_flags()}
+        assert flags == {"t2": ["Large transaction amount"], "t3": ["High velocity: 3 transactions within 60 minutes"]}
+
+    def test_flags_are_persisted_in_batches(self, persistence, monkeypatch):
+        calls = []
+        save = persistence.save_fraud_flags
+        monkeypatch.setattr(persistence, "save_fraud_flags", lambda flags: calls.append(len(flags)) or save(flags))
+        pipeline = FraudPipeline(FraudDetectionService(persistence), batch_size=50, flush_interval=1.0)
+        for n in range(50):
+            pipeline.submit(_tx(n, description="gambling"))
+        pipeline.close()
+        assert calls == [50]
+        assert len(persistence.get_fraud_flags()) == 50
+
+    def test_backpressure_and_drain_on_close(self, persistence):
+        fraud = FraudDetectionService(persistence)
+        release = threading.Event()
+        evaluate = fraud.evaluate
+        def slow_evaluate(transaction):
+            release.wait()
+            return evaluate(transaction)
+        fraud.evaluate = slow_evaluate
+        pipeline = FraudPipeline(fraud, max_queue=2, batch_size=1)
+
+        pipeline.submit(_tx(0))
+        time.sleep(0.05)  # the worker takes t0 and waits on it
+        pipeline.submit(_tx(1))
+        pipeline.submit(_tx(2))
+        blocked = threading.Thread(target=pipeline.submit, args=(_tx(3),))
+        blocked.start()
+        blocked.join(0.1)
+        assert blocked.is_alive()  # the queue is full, so the producer waits
+
+        release.set()
+        blocked.join(5)
+        pipeline.close()
+        assert pipeline.processed == 4
+        assert pipeline.pending() == 0
+        # Once closed, transactions are checked on the caller's thread.
+        assert pipeline.submit(_tx(4, description="crypto")) is True
+
+
+@pytest.mark.parametrize("persistence", ["sqlite"], indirect=True)
+def test_refuses_a_layer_bound_to_one_thread(bank):
+    with pytest.raises(ValueError, match="SqlitePersistenceLayer is not thread_safe"):
+        bank.start_fraud_pipeline()
+    assert bank.fraud_pipeline is None
@@ -0,0 +1,135 @@
+import pytest
+from src.models.transaction import Transaction, TransactionType
+from src.services.fraud_rules import FraudRule, LargeAmountRule, RoundAmountRule, RuleEngine
+from src.services.fraud_service import FraudDetectionService
+from src.services.velocity_tracker import VelocityTracker
+from src.utils.keyword_matcher import KeywordMatcher
+from src.utils.persistence import PersistenceLayer
+
+def _tx(n, amount=50.0, description="Deposit"):
+    return Transaction(f"t{n}", "a1", amount, TransactionType.DEPOSIT, description=description)
+
+class CountingRule(FraudRule):
+    def __init__(self, name, cost=1.0, weight=1.0, depends_on=(), stateful=False, fires=False):
+        self.name, self.cost, self.weight = name, cost, weight
+        self.depends_on, self.stateful, self.fires = depends_on, stateful, fires
+        self.seen = []
+
+    def check(self, transaction, hits):
+        self.seen.append(dict(hits))
+        return [self.name] if self.fires else []
+
+class TestRuleEngine:
+
+    def test_orders_by_cost_after_dependencies(self):
+        engine = RuleEngine([
+            CountingRule("slow", cost=10),
+            CountingRule("needs slow", cost=1, depends_on=("slow",)),
+            CountingRule("cheap", cost=2),
+            CountingRule("cheapest", cost=0.5),
+        ])
+        assert engine.order == ["cheapest", "cheap", "slow", "needs slow"]
+
+    def test_rejects_unknown_and_cyclic_dependencies(self):
+        with pytest.raises(ValueError, match="unknown rule"):
+            RuleEngine([CountingRule("a", depends_on=("missing",))])
+        with pytest.raises(ValueError, match="cycle"):
+            RuleEngine([CountingRule("a", depends_on=("b",)), CountingRule("b", depends_on=("a",))])
+        engine = RuleEngine([CountingRule("b")])
+        with pytest.raises(ValueError, match="already registered"):
+            engine.register(CountingRule("b"))
+        assert engine.order == ["b"]
+
+    def test_short_circuits_but_runs_stateful_rules(self):
+        cheap = CountingRule("cheap", cost=1, fires=True)
+        costly = CountingRule("costly", cost=5, fires=True)
+        history = CountingRule("history", cost=10, stateful=True)
+        engine = RuleEngine([costly, history, cheap], risk_threshold=1.0)
+
+        verdict = engine.evaluate(_tx(1))
+        assert verdict.flagged and verdict.reasons == ["cheap"] and verdict.score == 1.0
+        assert costly.seen == [] and len(history.seen) == 1
+        report = engine.stats_report()
+        assert list(report) == ["cheap", "costly", "history"]
+        assert report["costly"]["skipped"] == 1 and report["costly"]["evaluations"] == 0
+
+        # Rules a worker can run without history leave the stateful ones out.
+        engine.evaluate(_tx(2), stateful=False)
+        assert len(history.seen) == 1
+
+    def test_weak_hits_add_up_to_the_threshold(self):
+        engine = RuleEngine([CountingRule("weak", weight=0.5, fires=True)])
+        assert not engine.evaluate(_tx(1)).flagged
+        engine.register(CountingRule("also weak", cost=2, weight=0.5, depends_on=("weak",), fires=True))
+        verdict = engine.evaluate(_tx(2))
+        assert verdict.flagged and verdict.reasons == ["weak", "also weak"]
+        assert engine.rules["also weak"].seen == [{"weak": ["weak"]}]
+
+    def test_records_counts_hit_rates_and_time(self):
+        engine = RuleEngine([LargeAmountRule(), RoundAmountRule()])
+        for n, amount in enumerate([50.0, 2000.0, 20000.0, 75.0]):
+            engine.evaluate(_tx(n, amount))
+        large, round_amount = engine.stats["Large transaction amount"], engine.stats["Round amount"]
+        assert (large.evaluations, large.hits, large.hit_rate) == (4, 1, 0.25)
+        # 20000 is flagged by the large-amount rule first, so the round-amount rule is skipped.
+        assert (round_amount.evaluations, round_amount.hits, round_amount.skipped) == (3, 1, 1)
+        assert large.total_time > 0 and large.mean_time == large.total_time / 4
+
+        engine.reset_stats()
+        assert engine.stats["Round amount"].evaluations == 0
+
+    def test_unregister(self):
+        engine = RuleEngine([LargeAmountRule(), CountingRule("other", cost=3)])
+        engine.unregister("other")
+        assert engine.order == ["Large transaction amount"]
+
+    def test_replace_keeps_dependents(self):
+        engine = RuleEngine([LargeAmountRule(), RoundAmountRule()])
+        engine.evaluate(_tx(1, 600.0))
+        with pytest.raises(ValueError, match="Round amount"):
+            engine.unregister("Large transaction amount")
+        with pytest.raises(ValueError, match="already registered"):
+            engine.register(LargeAmountRule(limit=500.0))
+
+        engine.register(LargeAmountRule(limit=500.0), replace=True)
+        assert engine.order == ["Large transaction amount", "Round amount"]
+        assert engine.rules["Large transaction amount"].limit == 500.0
+        assert engine.stats["Large transaction amount"].evaluations == 0
+        verdict = engine.evaluate(_tx(2, 2000.0))
+        assert verdict.reasons == ["Large transaction amount"]
+        # The replacement reaches the threshold, so the round-amount rule is skipped.
+        assert engine.stats["Round amount"].skipped == 1
+
+
+class TestFraudServiceRules:
+
+    @pytest.fixture
+    def fraud(self, tmp_path):
+        persistence = PersistenceLayer(data_dir=str(tmp_path), ledger_format="jsonl")
+        yield FraudDetectionService(persistence, VelocityTracker(max_count=3),
+                                    merchants=KeywordMatcher(["casino"]))
+        persistence.close()
+
+    def test_round_amount_is_a_weak_signal(self, fraud):
+        assert fraud.evaluate(_tx(1, 5000.0)) == []
+        assert fraud.evaluate(_tx(2, 5000.0, "Casino Royale")) == ["Round amount", "High risk merchant"]
+        assert fraud.evaluate(_tx(3, 15000.0, "Casino Royale")) == ["Large transaction amount"]
+
+    def test_velocity_sees_every_transaction(self, fraud):
+        fraud.evaluate(_tx(1, 15000.0))
+        fraud.evaluate(_tx(2, 15000.0))
+        fraud.evaluate(_tx(3))
+        assert fraud.evaluate(_tx(4)) == ["High velocity: 4 transactions within 60 minutes"]
+        assert fraud.engine.stats["High velocity"].evaluations == 4
+        assert fraud.engine.stats["High risk merchant"].skipped == 2
+
+    def test_custom_rules_can_be_registered(self, fraud):
+        class DormantAccountRule(FraudRule):
+            name = "Dormant account"
+            cost = 0.1
+            def check(self, transaction, hits):
+                return [self.name] if transaction.account_id == "a1" else []
+
+        fraud.engine.register(DormantAccountRule())
+        assert fraud.engine.order[0] == "Dormant account"
+        assert fraud.evaluate(_tx(1)) == ["Dormant account"]
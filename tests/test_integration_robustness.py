@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, MagicMock, patch
 from src.services.bank_service import BankService
 from src.models.user import User
 from src.models.account import SavingsAccount
@@ -14,7 +14,8 @@ class TestIntegrationRobustness:
 
     @pytest.fixture
     def mock_persistence(self):
-        return Mock()
+        # MagicMock so persistence.unit_of_work() works as a context manager
+        return MagicMock()
 
     @pytest.fixture
     def bank_service(self, mock_persistence):
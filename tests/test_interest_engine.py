@@ -0,0 +1,72 @@
+import pytest
+from datetime import datetime
+import src.services.interest_engine as interest_module
+from src.services.fee_engine import FeeEngine
+from src.services.interest_engine import InterestEngine
+from src.utils.validators import ValidationError
+from conftest import account_record, open_persistence
+
+@pytest.fixture(params=["json", "cached", "sqlite"])
+def persistence(request, tmp_path):
+    layer = open_persistence(request.param, tmp_path)
+    layer.save_accounts([
+        account_record("s1", "SAVINGS", 1000.0),
+        account_record("s2", "SAVINGS", 2500.0),
+        account_record("s3", "SAVINGS", 0.0),
+        account_record("c1", "CURRENT", -500.0),
+    ])
+    yield layer
+    layer.close()
+
+def test_annual_interest(persistence):
+    as_of = datetime(2024, 12, 31)
+    summary = InterestEngine(persistence).apply(as_of=as_of)
+
+    assert summary.accounts == 2
+    assert summary.total_interest == pytest.approx(105.0)
+    assert persistence.get_account("s1")["balance"] == pytest.approx(1030.0)
+    assert persistence.get_account("s2")["balance"] == pytest.approx(2575.0)
+    assert persistence.get_account("s3")["balance"] == 0.0
+    assert persistence.get_account("c1")["balance"] == -500.0
+
+    [tx] = persistence.get_transactions_for_account("s1")
+    assert tx["transaction_type"] == "INTEREST"
+    assert tx["description"] == "Annual Interest Applied"
+    assert tx["timestamp"] == as_of.isoformat()
+    assert persistence.get_transactions_for_account("s3") == []
+
+def test_daily_compounding(persistence):
+    summary = InterestEngine(persistence).apply(period_days=30, compounding="daily")
+    expected = 1000.0 * ((1 + 0.03 / 365) ** 30 - 1)
+    assert persistence.get_account("s1")["balance"] == pytest.approx(1000.0 + expected)
+    assert summary.to_dict()["compounding"] == "daily"
+    [tx] = persistence.get_transactions_for_account("s1")
+    assert tx["description"] == "Interest Applied (30 days, daily)"
+
+def test_invalid_parameters(persistence):
+    engine = InterestEngine(persistence)
+    with pytest.raises(ValidationError):
+        engine.apply(compounding="monthly")
+    with pytest.raises(ValidationError):
+        engine.apply(period_days=0)
+    assert persistence.get_account("s1")["balance"] == 1000.0
+
+@pytest.mark.parametrize("engine, account_id, balance", [(InterestEngine, "s1", 1000.0), (FeeEngine, "c1", -500.0)])
+def test_failed_write_changes_no_balance(persistence, monkeypatch, engine, account_id, balance):
+    def fail(records):
+        raise IOError("disk full")
+    monkeypatch.setattr(persistence, "log_transactions", fail)
+    with pytest.raises(IOError):
+        engine(persistence).apply()
+    assert persistence.get_account(account_id)["balance"] == balance
+    assert persistence.get_all_transactions() == []
+
+def test_compute_credits_positive_balances_only():
+    assert InterestEngine(None).compute([1000.0, -5.0, 0.0, 123.45], 0.03) == [30.0, 0.0, 0.0, 123.45 * 0.03]
+
+def test_numpy_path_matches_pure_python(monkeypatch):
+    pytest.importorskip("numpy")
+    balances = [1000.0, -5.0, 0.0, 123.45]
+    vectorized = InterestEngine(None).compute(balances, 0.03)
+    monkeypatch.setattr(interest_module, "np", None)
+    assert InterestEngine(None).compute(balances, 0.03) == vectorized
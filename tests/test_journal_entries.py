@@ -0,0 +1,105 @@
+import pytest
+import uuid
+from src.models.transaction import credit_leg_id, journal_entry, transaction_legs
+from src.services.auth_service import AuthService
+from src.services.fraud_rules import LargeAmountRule
+from src.services.reconciliation_service import ReconciliationService
+from src.services.report_service import ReportService
+from src.utils.ledger import BinaryLedger
+
+@pytest.mark.parametrize("persistence", ["json", "jsonl", "partitioned", "binary", "cached_jsonl", "cached", "sqlite"], indirect=True)
+class TestJournalEntries:
+
+    @pytest.fixture
+    def accounts(self, bank, persistence):
+        user = AuthService(persistence).register("journal", "Password123", "j@test.com", "1234567890")
+        a = bank.create_account(user, "SAVINGS", 1000.0).account_id
+        b = bank.create_account(user, "CURRENT", 200.0).account_id
+        return a, b
+
+    def test_transfer_writes_one_record(self, bank, persistence, accounts):
+        a, b = accounts
+        bank.transfer(a, b, 150.0)
+
+        entries = [r for r in persistence.get_ledger_records() if r["transaction_type"] == "TRANSFER"]
+        assert len(entries) == 1
+        assert entries[0]["postings"] == [{"account_id": a, "amount": -150.0}, {"account_id": b, "amount": 150.0}]
+        assert persistence.get_account(a)["balance"] == 850.0
+        assert persistence.get_account(b)["balance"] == 350.0
+
+    def test_both_legs_are_fraud_checked(self, bank, persistence, accounts):
+        a, b = accounts
+        bank.fraud_service.engine.register(LargeAmountRule(limit=100.0), replace=True)
+        bank.transfer(a, b, 150.0)
+
+        [entry] = [r for r in persistence.get_ledger_records() if r["transaction_type"] == "TRANSFER"]
+        flagged = {flag["transaction_id"] for flag in persistence.get_fraud_flags()}
+        assert flagged == {entry["transaction_id"], credit_leg_id(entry["transaction_id"])}
+
+    def test_both_statements_show_their_leg(self, bank, persistence, accounts):
+        a, b = accounts
+        bank.transfer(a, b, 150.0)
+
+        debit = [t for t in bank.get_account_transactions(a) if t.transaction_type.value == "TRANSFER"]
+        credit = [t for t in bank.get_account_transactions(b) if t.transaction_type.value == "TRANSFER"]
+        assert [(t.description, t.related_account_id) for t in debit] == [(f"Transfer to {b}", b)]
+        assert [(t.description, t.related_account_id) for t in credit] == [(f"Transfer from {a}", a)]
+        assert credit[0].transaction_id == credit_leg_id(debit[0].transaction_id)
+        assert len(persistence.get_all_transactions()) == 4
+
+        statement = ReportService(persistence).generate_account_statement(b)
+        assert f"Transfer from {a}" in statement
+
+    def test_batch_writes_one_record_per_payment(self, bank, persistence, accounts):
+        a, b = accounts
+        report = bank.execute_batch([
+            {"from_account_id": a, "to_account_id": b, "amount": 10.0, "reference": "rent"},
+            {"from_account_id": b, "to_account_id": a, "amount": 5.0},
+        ])
+        assert report.succeeded == 2
+
+        entries = [r for r in persistence.get_ledger_records() if r["transaction_type"] == "TRANSFER"]
+        assert len(entries) == 2
+        received = [t for t in persistence.get_transactions_for_account(b) if t["transaction_type"] == "TRANSFER"]
+        assert [t["description"] for t in received] == [f"Transfer from {a} - rent", f"Transfer to {a}"]
+        assert report.results[0].transaction_id == received[0]["transaction_id"]
+
+    def test_reconciles(self, bank, persistence, accounts):
+        a, b = accounts
+        bank.transfer(a, b, 150.0)
+        bank.execute_batch([{"from_account_id": b, "to_account_id": a, "amount": 40.0}])
+        report = ReconciliationService(persistence, workers=2).reconcile()
+        assert report.ok, report.issues
+
+
+@pytest.mark.parametrize("persistence", ["json", "jsonl", "binary", "cached", "sqlite"], indirect=True)
+def test_unbalanced_entry_is_reported(persistence):
+    a, b = str(uuid.uuid4()), str(uuid.uuid4())
+    broken = journal_entry(str(uuid.uuid4()), a, b, 20.0, "2024-05-01T10:00:00")
+    broken["postings"][1]["amount"] = 25.0
+    if isinstance(getattr(persistence, "ledger", None), BinaryLedger):
+        # Binary rows imply the postings from the amount, so the entry is refused instead.
+        with pytest.raises(ValueError, match="postings"):
+            persistence.log_transaction(broken)
+        return
+    persistence.log_transaction(broken)
+    report = ReconciliationService(persistence, workers=1).reconcile()
+    assert ("UNBALANCED_ENTRY", broken["transaction_id"]) in {(i.kind, i.subject) for i in report.issues}
+
+
+class TestTransactionLegs:
+
+    def test_plain_record_is_its_own_leg(self):
+        record = {"transaction_id": "t1", "account_id": "a", "amount": 5.0, "transaction_type": "DEPOSIT",
+                  "timestamp": "2024-05-01T10:00:00", "description": "", "related_account_id": None}
+        assert transaction_legs(record) == [record]
+
+    def test_journal_entry_legs(self):
+        entry = journal_entry("e1", "a", "b", 12.5, "2024-05-01T10:00:00", "invoice 7")
+        debit, credit = transaction_legs(entry)
+        assert debit == {"transaction_id": "e1", "account_id": "a", "amount": 12.5, "transaction_type": "TRANSFER",
+                         "timestamp": "2024-05-01T10:00:00", "description": "Transfer to b - invoice 7",
+                         "related_account_id": "b"}
+        assert credit["transaction_id"] == credit_leg_id("e1")
+        assert (credit["account_id"], credit["amount"], credit["related_account_id"]) == ("b", 12.5, "a")
+        assert credit["description"] == "Transfer from a - invoice 7"
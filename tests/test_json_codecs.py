@@ -0,0 +1,46 @@
+import pytest
+import json
+import os
+from src.utils import json_codecs
+from src.utils.cached_persistence import CachedPersistenceLayer
+from src.utils.persistence import PersistenceLayer
+
+class TestJsonCodecs:
+
+    def test_pretty_is_default_format(self, tmp_path):
+        p = PersistenceLayer(data_dir=str(tmp_path))
+        p.save_user({"user_id": "u1", "username": "a", "accounts": []})
+        with open(p.users_file) as f:
+            assert f.read().startswith('{\n    "u1"')
+
+    def test_compact_has_no_whitespace(self, tmp_path):
+        p = PersistenceLayer(data_dir=str(tmp_path), codec="compact")
+        p.save_user({"user_id": "u1", "username": "a", "accounts": []})
+        with open(p.users_file) as f:
+            assert f.read() == '{"u1":{"user_id":"u1","username":"a","accounts":[]}}'
+
+    @pytest.mark.parametrize("writer, reader", [("pretty", "compact"), ("compact", "pretty"), ("fast", "pretty"), ("pretty", "fast")])
+    def test_existing_files_readable_after_switching(self, tmp_path, writer, reader):
+        PersistenceLayer(data_dir=str(tmp_path), codec=writer).save_account({"account_id": "a1", "user_id": "u1", "balance": 0.1})
+        p = PersistenceLayer(data_dir=str(tmp_path), codec=reader)
+        assert p.get_account("a1") == {"account_id": "a1", "user_id": "u1", "balance": 0.1}
+        p.save_account({"account_id": "a2", "user_id": "u1", "balance": 1.5})
+        with open(p.accounts_file) as f:
+            assert set(json.load(f)) == {"a1", "a2"}
+
+    def test_fast_falls_back_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(json_codecs, "orjson", None)
+        assert isinstance(json_codecs.get_codec("fast"), json_codecs.CompactJsonCodec)
+        assert json_codecs.loads(b'{"a": 1}') == {"a": 1}
+        with pytest.raises(ValueError):
+            json_codecs.get_codec("orjson")
+
+    def test_unknown_codec_rejected(self, tmp_path):
+        with pytest.raises(ValueError):
+            PersistenceLayer(data_dir=str(tmp_path), codec="yaml")
+
+    def test_cached_layer_flushes_with_codec(self, tmp_path):
+        p = CachedPersistenceLayer(data_dir=str(tmp_path), flush_interval=None, codec="compact")
+        p.save_account({"account_id": "a1", "user_id": "u1", "balance": 1.0})
+        p.close()
+        assert os.path.getsize(p.accounts_file) == len('{"a1":{"account_id":"a1","user_id":"u1","balance":1.0}}')
@@ -0,0 +1,52 @@
+import pytest
+import random
+from src.models.transaction import Transaction, TransactionType
+from src.services.fraud_service import FraudDetectionService
+from src.utils.keyword_matcher import KeywordMatcher, ReloadingKeywordMatcher
+
+class TestKeywordMatcher:
+
+    def test_overlapping_keywords(self):
+        matcher = KeywordMatcher(["he", "she", "his", "hers"])
+        assert matcher.find_all("ushers") == ["she", "he", "hers"]
+        assert matcher.find_all("this") == ["his"]
+        assert matcher.find_all("nothing to see") == []
+
+    def test_case_insensitive_and_deduplicated(self):
+        matcher = KeywordMatcher(["Crypto", "crypto ", "", "GAMBLING"])
+        assert len(matcher) == 2
+        assert matcher.find_all("CryptoCoin and crypto gambling") == ["crypto", "gambling"]
+        assert matcher.search("Online GamBling Ltd")
+
+    def test_matches_naive_search(self):
+        rng = random.Random(3)
+        words = ["".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(40)]
+        matcher = KeywordMatcher(words)
+        for _ in range(200):
+            text = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 20)))
+            assert set(matcher.find_all(text)) == {w for w in matcher.keywords if w in text}
+
+    def test_from_file_skips_comments(self, tmp_path):
+        path = tmp_path / "merchants.txt"
+        path.write_text("# high risk\ncasino\n\n  # indented comment\nbetting\n")
+        assert KeywordMatcher.from_file(str(path)).keywords == ["casino", "betting"]
+
+    def test_reloads_when_file_changes(self, tmp_path):
+        path = tmp_path / "merchants.txt"
+        matcher = ReloadingKeywordMatcher(str(path), fallback=["crypto"], check_interval=0)
+        assert matcher.find_all("crypto casino") == ["crypto"]
+
+        path.write_text("casino\n")
+        assert matcher.find_all("crypto casino") == ["casino"]
+        path.write_text("casino\nbetting shop\n")
+        assert matcher.find_all("Betting Shop near the casino") == ["betting shop", "casino"]
+
+        path.unlink()
+        assert matcher.find_all("crypto casino") == ["crypto"]
+
+    def test_fraud_rule_uses_matcher(self):
+        fraud = FraudDetectionService(None, merchants=KeywordMatcher(["casino"]))
+        tx = Transaction("t1", "a1", 20.0, TransactionType.WITHDRAWAL, description="Casino Royale")
+        assert fraud.transaction_reasons(tx) == ["High risk merchant"]
+        tx.description = "crypto exchange"
+        assert fraud.transaction_reasons(tx) == []
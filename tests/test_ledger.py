@@ -0,0 +1,306 @@
+import pytest
+import json
+import os
+import uuid
+from datetime import datetime
+from src.services.auth_service import AuthService
+from src.services.bank_service import BankService
+from src.services.report_service import ReportService
+from src.utils.ledger import BinaryLedger
+from src.utils.persistence import PersistenceLayer
+
+class TestJsonLinesLedger:
+
+    @pytest.fixture
+    def persistence(self, tmp_path):
+        return PersistenceLayer(data_dir=str(tmp_path), ledger_format="jsonl")
+
+    def _tx(self, tx_id, account_id, ts="2023-01-01T10:00:00"):
+        return {
+            "transaction_id": tx_id,
+            "account_id": account_id,
+            "amount": 10.0,
+            "transaction_type": "DEPOSIT",
+            "timestamp": ts,
+            "description": "Deposit",
+            "related_account_id": None
+        }
+
+    def test_initialization_creates_empty_ledger(self, persistence, tmp_path):
+        assert persistence.transactions_file == os.path.join(str(tmp_path), "transactions.jsonl")
+        assert os.path.getsize(persistence.transactions_file) == 0
+        assert not os.path.exists(os.path.join(str(tmp_path), "transactions.json"))
+        assert persistence.get_all_transactions() == []
+
+    def test_each_transaction_is_one_line(self, persistence):
+        persistence.log_transaction(self._tx("t1", "a1"))
+        persistence.log_transaction(self._tx("t2", "a2"))
+        persistence.log_transaction(self._tx("t3", "a1"))
+
+        with open(persistence.transactions_file) as f:
+            lines = f.readlines()
+        assert [json.loads(line)["transaction_id"] for line in lines] == ["t1", "t2", "t3"]
+
+        assert [t["transaction_id"] for t in persistence.get_transactions_for_account("a1")] == ["t1", "t3"]
+        assert [t["transaction_id"] for t in persistence.get_all_transactions()] == ["t1", "t2", "t3"]
+
+    def test_account_filter_is_exact(self, persistence):
+        persistence.log_transaction(self._tx("t1", "a1"))
+        persistence.log_transaction(dict(self._tx("t2", "a10"), related_account_id="a1"))
+        assert [t["transaction_id"] for t in persistence.get_transactions_for_account("a1")] == ["t1"]
+
+    def test_migrates_legacy_array_once(self, tmp_path):
+        legacy = PersistenceLayer(data_dir=str(tmp_path))
+        legacy.log_transaction(self._tx("t1", "a1"))
+        legacy.log_transaction(self._tx("t2", "a1"))
+
+        migrated = PersistenceLayer(data_dir=str(tmp_path), ledger_format="jsonl")
+        assert [t["transaction_id"] for t in migrated.get_transactions_for_account("a1")] == ["t1", "t2"]
+        assert not os.path.exists(os.path.join(str(tmp_path), "transactions.json"))
+        assert os.path.exists(os.path.join(str(tmp_path), "transactions.json.migrated"))
+
+        migrated.log_transaction(self._tx("t3", "a1"))
+        reopened = PersistenceLayer(data_dir=str(tmp_path), ledger_format="jsonl")
+        assert len(reopened.get_all_transactions()) == 3
+
+    def test_torn_final_line_is_dropped(self, persistence):
+        persistence.log_transaction(self._tx("t1", "a1"))
+        with open(persistence.transactions_file, "a") as f:
+            f.write('{"transaction_id": "t2", "acc')
+
+        reopened = PersistenceLayer(data_dir=persistence.data_dir, ledger_format="jsonl")
+        assert [t["transaction_id"] for t in reopened.get_all_transactions()] == ["t1"]
+        reopened.log_transaction(self._tx("t3", "a1"))
+        assert [t["transaction_id"] for t in reopened.get_all_transactions()] == ["t1", "t3"]
+
+    def test_statement_from_jsonl_ledger(self, persistence):
+        auth = AuthService(persistence)
+        bank = BankService(persistence)
+        user = auth.register("ledger", "Password123", "l@test.com", "1234567890")
+        acc = bank.create_account(user, "SAVINGS", 1000.0)
+        bank.deposit(acc.account_id, 250.0)
+
+        statement = ReportService(persistence).generate_account_statement(acc.account_id)
+        assert "Current Balance: $1250.00" in statement
+        assert "Initial Deposit" in statement
+        assert "DEPOSIT" in statement
+
+    def test_unknown_format_rejected(self, tmp_path):
+        with pytest.raises(ValueError):
+            PersistenceLayer(data_dir=str(tmp_path), ledger_format="xml")
+
+    def test_offset_index_sees_appends_from_other_writers(self, persistence):
+        persistence.log_transaction(self._tx("t1", "a1"))
+        assert len(persistence.get_transactions_for_account("a1")) == 1
+
+        other = PersistenceLayer(data_dir=persistence.data_dir, ledger_format="jsonl")
+        other.log_transaction(self._tx("t2", "a1"))
+        persistence.log_transaction(self._tx("t3", "a2"))
+
+        assert [t["transaction_id"] for t in persistence.get_transactions_for_account("a1")] == ["t1", "t2"]
+        assert [t["transaction_id"] for t in persistence.get_transactions_for_account("a2")] == ["t3"]
+
+    def test_sidecar_index_persisted_on_close(self, tmp_path):
+        p = PersistenceLayer(data_dir=str(tmp_path), ledger_format="jsonl", persist_indexes=True)
+        p.log_transaction(self._tx("t1", "a1"))
+        p.get_transactions_for_account("a1")
+        p.close()
+        assert os.path.exists(p.transactions_file + ".idx")
+
+        # Appended after the sidecar was written: only this tail needs indexing
+        with open(p.transactions_file, "a") as f:
+            f.write(json.dumps(self._tx("t2", "a1")) + "\n")
+
+        reopened = PersistenceLayer(data_dir=str(tmp_path), ledger_format="jsonl", persist_indexes=True)
+        assert [t["transaction_id"] for t in reopened.get_transactions_for_account("a1")] == ["t1", "t2"]
+
+
+class TestBinaryLedger:
+
+    @pytest.fixture
+    def persistence(self, tmp_path):
+        return PersistenceLayer(data_dir=str(tmp_path), ledger_format="binary")
+
+    def _tx(self, account_id, related=None, description="Deposit", ts="2023-01-01T10:00:00.123456"):
+        return {
+            "transaction_id": str(uuid.uuid4()),
+            "account_id": account_id,
+            "amount": 12.5,
+            "transaction_type": "TRANSFER" if related else "DEPOSIT",
+            "timestamp": ts,
+            "description": description,
+            "related_account_id": related
+        }
+
+    def test_records_round_trip(self, persistence):
+        a1, a2 = str(uuid.uuid4()), str(uuid.uuid4())
+        records = [self._tx(a1), self._tx(a2, related=a1, description="Transfer from ü"), self._tx(a1, description="", ts="2023-01-02T00:00:00")]
+        for record in records:
+            persistence.log_transaction(record)
+
+        assert persistence.get_all_transactions() == records
+        assert os.path.getsize(persistence.transactions_file) == 3 * BinaryLedger.RECORD.size
+
+    def test_account_scan_skips_related_matches(self, persistence):
+        a1, a2 = str(uuid.uuid4()), str(uuid.uuid4())
+        first = self._tx(a1)
+        persistence.log_transaction(first)
+        persistence.log_transaction(self._tx(a2, related=a1))
+        last = self._tx(a1)
+        persistence.log_transaction(last)
+
+        assert persistence.get_transactions_for_account(a1) == [first, last]
+        assert persistence.get_transactions_for_account(str(uuid.uuid4())) == []
+
+    def test_iter_records_streams_in_batches(self, persistence, monkeypatch):
+        monkeypatch.setattr(BinaryLedger, "ITER_BATCH", 2)
+        account_id = str(uuid.uuid4())
+        records = [self._tx(account_id, description=f"Deposit {i}") for i in range(5)]
+        for record in records:
+            persistence.log_transaction(record)
+
+        stream = persistence.ledger.iter_records()
+        assert next(stream) == records[0]
+        # Reads between batches do not disturb the stream
+        assert persistence.get_transactions_for_account(account_id) == records
+        assert list(stream) == records[1:]
+
+    def test_non_uuid_ids_rejected(self, persistence):
+        with pytest.raises(ValueError):
+            persistence.log_transaction(self._tx("a1"))
+
+    def test_torn_record_is_dropped(self, persistence):
+        account_id = str(uuid.uuid4())
+        persistence.log_transaction(self._tx(account_id))
+        with open(persistence.transactions_file, "ab") as f:
+            f.write(b"\x00" * 10)
+
+        reopened = PersistenceLayer(data_dir=persistence.data_dir, ledger_format="binary")
+        reopened.log_transaction(self._tx(account_id))
+        assert len(reopened.get_transactions_for_account(account_id)) == 2
+
+    def test_migrates_legacy_array(self, tmp_path):
+        account_id = str(uuid.uuid4())
+        legacy = PersistenceLayer(data_dir=str(tmp_path))
+        legacy.log_transaction(self._tx(account_id))
+
+        migrated = PersistenceLayer(data_dir=str(tmp_path), ledger_format="binary")
+        assert len(migrated.get_transactions_for_account(account_id)) == 1
+        assert os.path.exists(os.path.join(str(tmp_path), "transactions.json.migrated"))
+
+    def test_bank_flow_and_statement(self, persistence):
+        auth = AuthService(persistence)
+        bank = BankService(persistence)
+        user = auth.register("binary", "Password123", "b@test.com", "1234567890")
+        acc1 = bank.create_account(user, "SAVINGS", 1000.0)
+        acc2 = bank.create_account(user, "CURRENT", 0.0)
+        bank.transfer(acc1.account_id, acc2.account_id, 100.0)
+
+        assert len(persistence.get_transactions_for_account(acc1.account_id)) == 2
+        statement = ReportService(persistence).generate_account_statement(acc2.account_id)
+        assert "Current Balance: $100.00" in statement
+        assert "Transfer from" in statement
+        persistence.close()
+
+
+def _dated_tx(account_id, ts):
+    return {
+        "transaction_id": str(uuid.uuid4()),
+        "account_id": account_id,
+        "amount": 1.0,
+        "transaction_type": "DEPOSIT",
+        "timestamp": ts,
+        "description": "",
+        "related_account_id": None
+    }
+
+@pytest.mark.parametrize("ledger_format", ["json", "jsonl", "binary", "partitioned"])
+def test_date_range_filter(tmp_path, ledger_format):
+    p = PersistenceLayer(data_dir=str(tmp_path), ledger_format=ledger_format)
+    account_id = str(uuid.uuid4())
+    for ts in ["2024-01-31T23:59:59.999999", "2024-02-01T00:00:00", "2024-02-15T12:00:00", "2024-03-01T00:00:00"]:
+        p.log_transaction(_dated_tx(account_id, ts))
+
+    february = p.get_transactions_for_account(account_id, datetime(2024, 2, 1), datetime(2024, 3, 1))
+    assert [t["timestamp"] for t in february] == ["2024-02-01T00:00:00", "2024-02-15T12:00:00"]
+    assert len(p.get_transactions_for_account(account_id, start="2024-02-15T12:00:00")) == 2
+    assert len(p.get_transactions_for_account(account_id)) == 4
+    p.close()
+
+
+class TestPartitionedLedger:
+
+    @pytest.fixture
+    def persistence(self, tmp_path):
+        return PersistenceLayer(data_dir=str(tmp_path), ledger_format="partitioned")
+
+    def test_one_file_per_month(self, persistence):
+        a1 = str(uuid.uuid4())
+        persistence.log_transaction(_dated_tx(a1, "2024-01-05T10:00:00"))
+        persistence.log_transaction(_dated_tx(a1, "2024-02-05T10:00:00"))
+        persistence.log_transaction(_dated_tx(a1, "2024-01-20T10:00:00"))
+
+        assert sorted(os.listdir(persistence.transactions_file)) == ["2024-01.jsonl", "2024-02.jsonl"]
+        assert [t["timestamp"][:10] for t in persistence.get_all_transactions()] == ["2024-01-05", "2024-01-20", "2024-02-05"]
+
+    def test_queries_open_only_matching_partitions(self, persistence):
+        a1, a2 = str(uuid.uuid4()), str(uuid.uuid4())
+        for month in range(1, 7):
+            persistence.log_transaction(_dated_tx(a1, f"2024-{month:02d}-10T10:00:00"))
+        persistence.log_transaction(_dated_tx(a2, "2024-03-10T10:00:00"))
+        ledger = persistence.ledger
+
+        assert ledger.partitions_for(a1, datetime(2024, 5, 1), datetime(2024, 6, 1)) == ["2024-05"]
+        assert ledger.partitions_for(a2) == ["2024-03"]
+        assert ledger.partitions_for(a2, start=datetime(2024, 4, 1)) == []
+        assert len(persistence.get_transactions_for_account(a1, start=datetime(2024, 5, 1))) == 2
+
+    def test_manifest_saved_and_caught_up(self, persistence):
+        a1 = str(uuid.uuid4())
+        persistence.log_transaction(_dated_tx(a1, "2024-01-05T10:00:00"))
+        persistence.close()
+        with open(os.path.join(persistence.transactions_file, "manifest.json")) as f:
+            manifest = json.load(f)["partitions"]
+        assert manifest["2024-01"]["accounts"] == [a1]
+        assert manifest["2024-01"]["min"] == manifest["2024-01"]["max"] == "2024-01-05T10:00:00"
+
+        # Appended by another writer after the manifest was saved
+        other = PersistenceLayer(data_dir=persistence.data_dir, ledger_format="partitioned")
+        a2 = str(uuid.uuid4())
+        other.log_transaction(_dated_tx(a2, "2024-01-25T10:00:00"))
+
+        reopened = PersistenceLayer(data_dir=persistence.data_dir, ledger_format="partitioned")
+        assert reopened.ledger.partitions_for(a2) == ["2024-01"]
+
+    def test_migrates_legacy_array(self, tmp_path):
+        a1 = str(uuid.uuid4())
+        legacy = PersistenceLayer(data_dir=str(tmp_path))
+        legacy.log_transaction(_dated_tx(a1, "2023-12-31T10:00:00"))
+        legacy.log_transaction(_dated_tx(a1, "2024-01-01T10:00:00"))
+
+        migrated = PersistenceLayer(data_dir=str(tmp_path), ledger_format="partitioned")
+        assert migrated.ledger.partitions_for(a1) == ["2023-12", "2024-01"]
+        assert os.path.exists(os.path.join(str(tmp_path), "transactions.json.migrated"))
+
+    def test_journal_truncate_removes_new_partitions(self, persistence):
+        a1 = str(uuid.uuid4())
+        persistence.log_transaction(_dated_tx(a1, "2024-01-05T10:00:00"))
+        position = persistence.ledger.position()
+        persistence.log_transaction(_dated_tx(a1, "2024-01-06T10:00:00"))
+        persistence.log_transaction(_dated_tx(a1, "2024-02-06T10:00:00"))
+
+        persistence.ledger.truncate(position)
+        assert [t["timestamp"] for t in persistence.get_transactions_for_account(a1)] == ["2024-01-05T10:00:00"]
+        assert persistence.ledger.partitions_for(a1) == ["2024-01"]
+
+    def test_monthly_statement(self, persistence):
+        auth = AuthService(persistence)
+        bank = BankService(persistence)
+        user = auth.register("monthly", "Password123", "m@test.com", "1234567890")
+        acc = bank.create_account(user, "SAVINGS", 100.0)
+        persistence.log_transaction(dict(_dated_tx(acc.account_id, "2020-06-10T10:00:00"), description="Old deposit"))
+
+        statement = ReportService(persistence).generate_account_statement(acc.account_id, datetime(2020, 6, 1), datetime(2020, 7, 1))
+        assert "Old deposit" in statement
+        assert "Initial Deposit" not in statement
+        assert "Period: 2020-06-01 to 2020-07-01" in statement
@@ -0,0 +1,102 @@
+import pytest
+import json
+from src.services.auth_service import AuthService
+from src.utils.payment_files import read_payments, write_report
+
+@pytest.mark.parametrize("persistence", ["json", "cached", "sqlite"], indirect=True)
+class TestPaymentBatch:
+
+    @pytest.fixture
+    def accounts(self, bank, persistence):
+        auth = AuthService(persistence)
+        employer = auth.register("employer", "Password123", "e@test.com", "1234567890")
+        staff = auth.register("staff", "Password123", "s@test.com", "1234567890")
+        payroll = bank.create_account(employer, "SAVINGS", 2000.0).account_id
+        alice = bank.create_account(staff, "CURRENT", 0.0).account_id
+        bob = bank.create_account(staff, "SAVINGS", 500.0).account_id
+        return employer, staff, payroll, alice, bob
+
+    def test_rows_apply_in_order(self, bank, persistence, accounts):
+        employer, _, payroll, alice, bob = accounts
+        report = bank.execute_batch([
+            {"from_account_id": payroll, "to_account_id": alice, "amount": "1000", "reference": "March"},
+            # Would break the payroll account's 500 minimum now...
+            {"from_account_id": payroll, "to_account_id": bob, "amount": 1000.0},
+            {"from_account_id": alice, "to_account_id": payroll, "amount": 600.0},
+            # ...but not once a later row has refunded it.
+            {"from_account_id": payroll, "to_account_id": bob, "amount": 1000.0},
+        ], requested_by=None)
+
+        assert [r.success for r in report.results] == [True, False, True, True]
+        assert report.results[1].error == "Insufficient funds for transfer."
+        assert report.succeeded == 3 and report.total_amount == 2600.0
+        assert persistence.get_account(payroll)["balance"] == pytest.approx(600.0)
+        assert persistence.get_account(alice)["balance"] == pytest.approx(400.0)
+        assert persistence.get_account(bob)["balance"] == pytest.approx(1500.0)
+
+        ledger = persistence.get_transactions_for_account(alice)
+        assert ledger[0]["description"] == f"Transfer from {payroll} - March"
+        assert report.results[0].transaction_id == ledger[0]["transaction_id"]
+
+    def test_invalid_rows_are_reported(self, bank, persistence, accounts):
+        _, _, payroll, alice, _ = accounts
+        report = bank.execute_batch([
+            {"from_account_id": payroll, "to_account_id": alice, "amount": "abc"},
+            {"from_account_id": payroll, "to_account_id": alice, "amount": -5},
+            {"from_account_id": payroll, "to_account_id": payroll, "amount": 5},
+            {"from_account_id": payroll, "to_account_id": "", "amount": 5},
+            {"from_account_id": payroll, "to_account_id": "missing", "amount": 5},
+            {"from_account_id": payroll, "to_account_id": alice, "amount": "nan"},
+        ])
+        assert [r.error for r in report.results] == [
+            "Invalid amount.", "Amount must be positive.", "Cannot transfer to the same account.",
+            "Missing account id.", "Account not found.", "Amount must be positive."]
+        assert persistence.get_account(payroll)["balance"] == 2000.0
+
+    def test_customers_may_only_debit_their_accounts(self, bank, persistence, accounts):
+        employer, staff, payroll, alice, bob = accounts
+        report = bank.execute_batch([
+            {"from_account_id": payroll, "to_account_id": alice, "amount": 10},
+            {"from_account_id": bob, "to_account_id": payroll, "amount": 10},
+        ], requested_by=employer)
+        assert [r.error for r in report.results] == ["", "Access denied to source account."]
+
+    def test_fraud_flags_and_audit(self, bank, persistence, accounts, tmp_path):
+        employer, _, payroll, alice, _ = accounts
+        report = bank.execute_batch([
+            {"from_account_id": payroll, "to_account_id": alice, "amount": 10, "reference": "crypto"},
+            {"from_account_id": payroll, "to_account_id": alice, "amount": 10},
+        ], requested_by=employer)
+        assert [r.flagged for r in report.results] == [True, False]
+        # The memo is on both legs, so the debit from the payroll account is flagged as well.
+        flags = persistence.get_fraud_flags()
+        assert len(flags) == 2
+        assert report.results[0].transaction_id in {flag["transaction_id"] for flag in flags}
+        audit = (tmp_path / "audit.log").read_text()
+        assert audit.count("ACTION:FRAUD_ALERT") == 2
+        assert audit.count("ACTION:TRANSFER") == 2
+        assert "ACTION:BATCH_TRANSFER STATUS:SUCCESS DETAILS:Rows: 2, Succeeded: 2, Failed: 0" in audit
+
+    def test_payment_files(self, bank, accounts, tmp_path):
+        _, _, payroll, alice, bob = accounts
+        csv_path = tmp_path / "payroll.csv"
+        csv_path.write_text(f"from_account_id,to_account_id,amount,reference\n"
+                            f"{payroll},{alice},100.50,March\n{payroll},{bob},x,\n")
+        jsonl_path = tmp_path / "payroll.jsonl"
+        jsonl_path.write_text(json.dumps({"from_account_id": payroll, "to_account_id": bob, "amount": 1}) + "\n\n")
+
+        payments = read_payments(str(csv_path)) + read_payments(str(jsonl_path))
+        assert [p["amount"] for p in payments] == ["100.50", "x", 1]
+        report = bank.execute_batch(payments)
+        report_path = tmp_path / "report.csv"
+        write_report(str(report_path), report)
+        lines = report_path.read_text().splitlines()
+        assert lines[0].startswith("row,from_account_id")
+        assert [line.split(",")[4] for line in lines[1:]] == ["OK", "FAILED", "OK"]
+
+        (tmp_path / "bad.csv").write_text("from,to\n")
+        with pytest.raises(ValueError, match="Missing CSV column"):
+            read_payments(str(tmp_path / "bad.csv"))
+        (tmp_path / "bad.jsonl").write_text("{\n")
+        with pytest.raises(ValueError, match="Line 1"):
+            read_payments(str(tmp_path / "bad.jsonl"))
@@ -0,0 +1,85 @@
+import pytest
+import multiprocessing
+import os
+from src.services.audit_service import AuditService
+from src.services.auth_service import AuthService
+from src.services.bank_service import BankService
+from src.utils import file_locks
+from src.utils.file_locks import FileLock
+from src.utils.persistence import PersistenceLayer
+
+pytestmark = pytest.mark.skipif(file_locks.fcntl is None or "fork" not in multiprocessing.get_all_start_methods(),
+                                reason="needs fcntl and fork")
+
+PROCESSES = 4
+DEPOSITS = 25
+
+def _deposit_worker(data_dir, ledger_format, account_ids, start):
+    persistence = PersistenceLayer(data_dir=data_dir, ledger_format=ledger_format, process_safe=True)
+    bank = BankService(persistence)
+    bank.audit_service = AuditService(os.path.join(data_dir, "audit.log"))
+    start.wait()
+    for i in range(DEPOSITS):
+        # Alternate between a deposit and a transfer so several files change per operation
+        if i % 2:
+            bank.transfer(account_ids[0], account_ids[1], 1.0)
+        else:
+            bank.deposit(account_ids[0], 2.0)
+    persistence.close()
+
+class TestProcessLocking:
+
+    @pytest.mark.parametrize("ledger_format", ["json", "jsonl"])
+    def test_no_lost_updates_across_processes(self, tmp_path, ledger_format):
+        data_dir = str(tmp_path)
+        persistence = PersistenceLayer(data_dir=data_dir, ledger_format=ledger_format, process_safe=True)
+        user = AuthService(persistence).register("locker", "Password123", "l@test.com", "1234567890")
+        bank = BankService(persistence)
+        bank.audit_service = AuditService(os.path.join(data_dir, "audit.log"))
+        acc1 = bank.create_account(user, "CURRENT", 0.0)
+        acc2 = bank.create_account(user, "CURRENT", 0.0)
+
+        ctx = multiprocessing.get_context("fork")
+        start = ctx.Event()
+        workers = [ctx.Process(target=_deposit_worker, args=(data_dir, ledger_format, [acc1.account_id, acc2.account_id], start))
+                   for _ in range(PROCESSES)]
+        for w in workers:
+            w.start()
+        start.set()
+        for w in workers:
+            w.join(timeout=60)
+            assert w.exitcode == 0
+
+        deposits = PROCESSES * ((DEPOSITS + 1) // 2)
+        transfers = PROCESSES * (DEPOSITS // 2)
+        final = PersistenceLayer(data_dir=data_dir, ledger_format=ledger_format)
+        assert final.get_account(acc1.account_id)["balance"] == 2.0 * deposits - transfers
+        assert final.get_account(acc2.account_id)["balance"] == 1.0 * transfers
+        assert len(final.get_transactions_for_account(acc1.account_id)) == deposits + transfers
+
+    def test_shared_locks_coexist_exclusive_waits(self, tmp_path):
+        path = str(tmp_path / "accounts.json.lock")
+        lock = FileLock(path)
+        other = os.open(path, os.O_RDWR | os.O_CREAT)
+        try:
+            with lock.shared():
+                file_locks.fcntl.flock(other, file_locks.fcntl.LOCK_SH | file_locks.fcntl.LOCK_NB)
+                file_locks.fcntl.flock(other, file_locks.fcntl.LOCK_UN)
+                with pytest.raises(BlockingIOError):
+                    file_locks.fcntl.flock(other, file_locks.fcntl.LOCK_EX | file_locks.fcntl.LOCK_NB)
+                with lock.shared():
+                    pass  # re-entrant
+            with lock.exclusive():
+                with pytest.raises(BlockingIOError):
+                    file_locks.fcntl.flock(other, file_locks.fcntl.LOCK_SH | file_locks.fcntl.LOCK_NB)
+                with lock.shared():
+                    pass  # already covered by the exclusive hold
+        finally:
+            os.close(other)
+
+    def test_shared_lock_cannot_upgrade(self, tmp_path):
+        lock = FileLock(str(tmp_path / "x.lock"))
+        with lock.shared():
+            with pytest.raises(RuntimeError):
+                with lock.exclusive():
+                    pass
@@ -0,0 +1,84 @@
+import pytest
+import uuid
+from src.services.auth_service import AuthService
+from src.services.reconciliation_service import ReconciliationService
+
+@pytest.mark.parametrize("persistence", ["json", "jsonl", "partitioned", "binary", "cached_jsonl", "sqlite"], indirect=True)
+class TestReconciliation:
+
+    @pytest.fixture
+    def accounts(self, bank, persistence):
+        user = AuthService(persistence).register("recon", "Password123", "r@test.com", "1234567890")
+        a = bank.create_account(user, "SAVINGS", 1000.0).account_id
+        b = bank.create_account(user, "CURRENT", 200.0).account_id
+        bank.transfer(a, b, 150.0)
+        bank.withdraw(b, 50.0)
+        return user, a, b
+
+    def _tx(self, account_id, amount, tx_type, description="", related=None):
+        return {"transaction_id": str(uuid.uuid4()), "account_id": account_id, "amount": amount,
+                "transaction_type": tx_type, "timestamp": "2024-05-01T10:00:00",
+                "description": description, "related_account_id": related}
+
+    def test_consistent_data(self, persistence, accounts, request):
+        service = ReconciliationService(persistence, workers=2)
+        assert service.parallel_scan == (request.node.callspec.params["persistence"] not in ("json", "sqlite"))
+        report = service.reconcile()
+        assert report.ok, report.issues
+        assert report.transactions_scanned == 5
+        assert report.accounts_checked == 2
+        assert not report.incremental
+
+    def test_detects_problems(self, persistence, accounts):
+        user, a, b = accounts
+        account = persistence.get_account(a)
+        persistence.save_account(dict(account, balance=account["balance"] + 1))
+        # A debit leg whose credit was never written
+        persistence.log_transaction(self._tx(b, 25.0, "TRANSFER", f"Transfer to {a}", a))
+        persistence.save_account(dict(persistence.get_account(b), balance=persistence.get_account(b)["balance"] - 25))
+        ghost = str(uuid.uuid4())
+        persistence.log_transaction(self._tx(ghost, 5.0, "DEPOSIT"))
+        persistence.save_user(dict(persistence.get_user(user.user_id), accounts=[a, b, "missing"]))
+        stray = str(uuid.uuid4())
+        persistence.save_account(dict(persistence.get_account(b), account_id=stray, user_id="nobody", balance=0.0))
+
+        report = ReconciliationService(persistence, workers=1).reconcile()
+        found = {(i.kind, i.subject) for i in report.issues}
+        assert found == {
+            ("BALANCE_MISMATCH", a),
+            ("UNPAIRED_TRANSFER", b),
+            ("UNKNOWN_ACCOUNT", ghost),
+            ("DANGLING_ACCOUNT_REF", user.user_id),
+            ("ORPHAN_ACCOUNT", stray),
+        }
+
+    def test_incremental_only_scans_new_records(self, persistence, bank, accounts, tmp_path):
+        _, a, b = accounts
+        service = ReconciliationService(persistence, workers=1)
+        assert service.reconcile(incremental=True).ok
+
+        bank.deposit(a, 10.0)
+        bank.transfer(b, a, 20.0)
+        report = service.reconcile(incremental=True)
+        assert report.incremental and report.ok
+        assert report.transactions_scanned == 3
+        assert report.accounts_checked == 2
+
+        # A mismatch in an untouched account is not seen incrementally...
+        account = persistence.get_account(a)
+        persistence.save_account(dict(account, balance=account["balance"] + 1))
+        assert service.reconcile(incremental=True).ok
+        # ...but a full run finds it, and later incremental runs keep rechecking it.
+        assert [i.kind for i in service.reconcile().issues] == ["BALANCE_MISMATCH"]
+        report = service.reconcile(incremental=True)
+        assert report.transactions_scanned == 0
+        assert [i.subject for i in report.issues] == [a]
+
+    def test_transfer_legs_carry_across_runs(self, persistence, accounts):
+        _, a, b = accounts
+        service = ReconciliationService(persistence, workers=1)
+        persistence.log_transaction(self._tx(a, 5.0, "TRANSFER", f"Transfer to {b}", b))
+        assert [i.kind for i in service.reconcile(incremental=True).issues] == ["BALANCE_MISMATCH", "UNPAIRED_TRANSFER"]
+        persistence.log_transaction(self._tx(b, 5.0, "TRANSFER", f"Transfer from {a}", a))
+        report = service.reconcile(incremental=True)
+        assert "UNPAIRED_TRANSFER" not in {i.kind for i in report.issues}
@@ -0,0 +1,79 @@
+import pytest
+from datetime import datetime
+from src.models.account import Account, ACCOUNT_TYPES, CurrentAccount, FixedDepositAccount, SavingsAccount
+from src.models.loan import Loan, LoanStatus
+from src.models.serialization import LazyTimestamp
+from src.models.transaction import Transaction, TransactionType
+from src.models.user import User
+from src.utils.validators import ValidationError
+
+class TestGeneratedSerializers:
+
+    def _models(self):
+        created = datetime(2024, 3, 1, 12, 30, 15, 250)
+        user = User("u1", "alice", "hash", "a@test.com", "1234567890", created_at=created, accounts=["a1"])
+        return [
+            Transaction("t1", "a1", 25.0, TransactionType.TRANSFER, created, "Transfer to a2", "a2"),
+            SavingsAccount(account_id="a1", user_id="u1", balance=900.0, created_at=created),
+            CurrentAccount(account_id="a2", user_id="u1", balance=-50.0, created_at=created, is_active=False),
+            FixedDepositAccount(account_id="a3", user_id="u1", balance=5000.0, created_at=created, term_months=6),
+            Loan("l1", "u1", 1000.0, 0.05, 12, LoanStatus.APPROVED, created),
+            user,
+        ]
+
+    @pytest.mark.parametrize("lazy", [False, True])
+    def test_round_trip(self, lazy):
+        for model in self._models():
+            data = model.to_dict()
+            loader = Account.from_dict if isinstance(model, Account) else type(model).from_dict
+            restored = loader(data, lazy_timestamps=lazy)
+            assert type(restored) is type(model)
+            assert restored.to_dict() == data
+            assert restored == model
+
+    def test_to_dict_format(self):
+        transaction, savings, _, fixed, loan, user = self._models()
+        assert transaction.to_dict() == {
+            "transaction_id": "t1", "account_id": "a1", "amount": 25.0, "transaction_type": "TRANSFER",
+            "timestamp": "2024-03-01T12:30:15.000250", "description": "Transfer to a2", "related_account_id": "a2"
+        }
+        assert list(savings.to_dict()) == ["account_id", "user_id", "balance", "created_at", "is_active",
+                                           "account_type"]
+        assert fixed.to_dict()["maturity_date"] == "2024-08-28T12:30:15.000250"
+        assert loan.to_dict()["status"] == "APPROVED"
+        assert user.to_dict()["accounts"] == ["a1"]
+
+    def test_lazy_timestamp_parsed_on_first_read(self):
+        data = self._models()[0].to_dict()
+        tx = Transaction.from_dict(data, lazy_timestamps=True)
+        slot = Transaction.__dict__["timestamp"]
+        assert isinstance(slot, LazyTimestamp)
+        assert slot.slot.__get__(tx) == data["timestamp"]
+        assert tx.timestamp == datetime(2024, 3, 1, 12, 30, 15, 250)
+        assert isinstance(slot.slot.__get__(tx), datetime)
+
+    def test_optional_fields_and_defaults(self):
+        tx = Transaction.from_dict({"transaction_id": "t1", "account_id": "a1", "amount": 5.0,
+                                    "transaction_type": "DEPOSIT", "timestamp": "2024-01-01T00:00:00"})
+        assert tx.description == "" and tx.related_account_id is None
+        fixed = FixedDepositAccount(account_id="a3", user_id="u1").to_dict()
+        del fixed["term_months"]
+        restored = Account.from_dict(fixed)
+        assert restored.term_months == 12 and restored.interest_rate == 0.06
+        assert SavingsAccount.from_dict_specific(SavingsAccount(account_id="a1", user_id="u1").to_dict()).min_balance == 500.0
+
+    def test_invalid_records(self):
+        data = self._models()[0].to_dict()
+        with pytest.raises(ValueError):
+            Transaction.from_dict(dict(data, transaction_type="REFUND"))
+        with pytest.raises(ValueError, match="Unknown account type"):
+            Account.from_dict(dict(self._models()[1].to_dict(), account_type="GENERIC"))
+        with pytest.raises(ValidationError):
+            User.from_dict(dict(self._models()[-1].to_dict(), email="not-an-email"))
+        assert set(ACCOUNT_TYPES) == {"SAVINGS", "CURRENT", "FIXED_DEPOSIT"}
+
+    def test_loaded_lists_are_copies(self):
+        data = self._models()[-1].to_dict()
+        user = User.from_dict(data)
+        user.add_account("a9")
+        assert data["accounts"] == ["a1"]
@@ -0,0 +1,108 @@
+import pytest
+import os
+import sqlite3
+import uuid
+from datetime import datetime
+from src.models.transaction import Transaction, TransactionType, journal_entry
+from src.services.auth_service import AuthService
+from src.services.balance_service import BalanceService
+from src.services.bank_service import BankService
+from src.services.loan_service import LoanService
+from src.services.report_service import ReportService
+from src.utils.persistence import PersistenceLayer
+from src.utils.sqlite_persistence import SqlitePersistenceLayer
+
+class TestSqlitePersistence:
+
+    @pytest.fixture
+    def persistence(self, tmp_path):
+        layer = SqlitePersistenceLayer(os.path.join(str(tmp_path), "banking.db"))
+        yield layer
+        layer.close()
+
+    def test_wal_mode_and_indexes(self, persistence):
+        assert persistence.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        indexes = {row[0] for row in persistence.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"idx_users_username", "idx_accounts_user_id",
+                "idx_transactions_account_id_timestamp", "idx_transactions_counterparty_id_timestamp",
+                "idx_loans_user_id_status"} <= indexes
+
+    def test_transactions_in_date_range(self, persistence):
+        for ts in ["2024-01-31T23:00:00", "2024-02-10T10:00:00", "2024-03-01T00:00:00"]:
+            persistence.log_transaction({"transaction_id": ts, "account_id": "a1", "timestamp": ts})
+        february = persistence.get_transactions_for_account("a1", datetime(2024, 2, 1), datetime(2024, 3, 1))
+        assert [t["timestamp"] for t in february] == ["2024-02-10T10:00:00"]
+        assert len(persistence.get_transactions_for_account("a1", start="2024-02-01")) == 2
+
+    def test_records_round_trip_unchanged(self, persistence):
+        user = {"user_id": "u1", "username": "alice", "accounts": ["a1"]}
+        persistence.save_user(user)
+        assert persistence.get_user("u1") == user
+        assert persistence.get_user_by_username("alice") == user
+        assert persistence.get_user_by_username("nobody") is None
+
+        persistence.save_account({"account_id": "a1", "user_id": "u1", "balance": 10.0})
+        persistence.save_account({"account_id": "a1", "user_id": "u1", "balance": 20.0})
+        assert persistence.get_accounts_for_user("u1") == [{"account_id": "a1", "user_id": "u1", "balance": 20.0}]
+
+        persistence.save_fraud_flag({"transaction_id": "t1", "reasons": ["x"]})
+        assert persistence.get_fraud_flags() == [{"transaction_id": "t1", "reasons": ["x"]}]
+
+    def test_services_on_sqlite(self, persistence):
+        auth = AuthService(persistence)
+        bank = BankService(persistence)
+        loans = LoanService(persistence)
+        user = auth.register("sqlite", "Password123", "s@test.com", "1234567890")
+        acc1 = bank.create_account(user, "SAVINGS", 1000.0)
+        acc2 = bank.create_account(user, "CURRENT", 0.0)
+        bank.transfer(acc1.account_id, acc2.account_id, 300.0)
+
+        assert bank._get_account(acc1.account_id).balance == 700.0
+        assert bank._get_account(acc2.account_id).balance == 300.0
+        assert len(bank.get_user_accounts(user.user_id)) == 2
+        assert [t.transaction_type.value for t in bank.get_account_transactions(acc1.account_id)] == ["DEPOSIT", "TRANSFER"]
+
+        loan = loans.apply_for_loan(user, 5000.0, 12)
+        loans.approve_loan(loan.loan_id)
+        assert loans.get_user_loans(user.user_id)[0].status.value == "APPROVED"
+        assert "Current Balance: $300.00" in ReportService(persistence).generate_account_statement(acc2.account_id)
+
+    def test_import_json_dir(self, persistence, tmp_path):
+        source = PersistenceLayer(data_dir=os.path.join(str(tmp_path), "json"))
+        auth = AuthService(source)
+        bank = BankService(source)
+        user = auth.register("importer", "Password123", "i@test.com", "1234567890")
+        acc = bank.create_account(user, "SAVINGS", 1000.0)
+        bank.deposit(acc.account_id, 50.0)
+        LoanService(source).apply_for_loan(user, 100.0, 6)
+        source.log_transaction(Transaction(str(uuid.uuid4()), acc.account_id, 10.0, TransactionType.INTEREST,
+                                           timestamp=datetime(2024, 1, 5)).to_dict())
+        BalanceService(source).rebuild_checkpoints()
+
+        counts = persistence.import_json_dir(source.data_dir)
+
+        assert counts == {"users": 1, "accounts": 1, "transactions": 3, "loans": 1, "fraud": 0,
+                          "balance_checkpoints": 1}
+        assert persistence.get_balance_checkpoints(acc.account_id) == [{"as_of": "2024-02-01T00:00:00", "balance": 10.0}]
+        assert persistence.get_user_by_username("importer")["user_id"] == user.user_id
+        assert persistence.get_account(acc.account_id)["balance"] == 1050.0
+        assert persistence.get_transactions_for_account(acc.account_id) == source.get_transactions_for_account(acc.account_id)
+        assert persistence.get_loans_for_user(user.user_id) == source.get_loans_for_user(user.user_id)
+
+        # A second import would duplicate the ledger and the flags.
+        with pytest.raises(ValueError, match="already holds users"):
+            persistence.import_json_dir(source.data_dir)
+        assert len(persistence.get_all_transactions()) == 3
+
+    def test_adds_counterparty_column_to_old_databases(self, tmp_path):
+        path = os.path.join(str(tmp_path), "old.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE transactions (seq INTEGER PRIMARY KEY AUTOINCREMENT, transaction_id TEXT NOT NULL, "
+                     "account_id TEXT NOT NULL, timestamp TEXT, data TEXT NOT NULL)")
+        conn.commit()
+        conn.close()
+
+        layer = SqlitePersistenceLayer(path)
+        layer.log_transaction(journal_entry("e1", "a1", "a2", 5.0, "2024-05-01T10:00:00"))
+        assert [t["description"] for t in layer.get_transactions_for_account("a2")] == ["Transfer from a1"]
+        layer.close()
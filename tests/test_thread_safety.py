@@ -0,0 +1,111 @@
+import pytest
+import os
+import random
+import threading
+from src.models.transaction import signed_amount
+from src.services.audit_service import AuditService
+from src.services.auth_service import AuthService
+from src.services.bank_service import BankService
+from src.utils.striped_locks import StripedLocks
+from src.utils.validators import ValidationError
+from conftest import open_persistence
+
+THREADS = 8
+OPERATIONS = 40
+
+class TestThreadSafeBankService:
+
+    @pytest.fixture(params=["jsonl", "cached", "cached_wal"])
+    def persistence(self, request, tmp_path):
+        # The cached layers flush in the background while the threads write.
+        options = {"flush_interval": 0.01} if request.param.startswith("cached") else {}
+        layer = open_persistence(request.param, tmp_path, **options)
+        yield layer
+        layer.close()
+
+    def _setup(self, persistence, tmp_path, accounts=4):
+        user = AuthService(persistence).register("threads", "Password123", "t@test.com", "1234567890")
+        bank = BankService(persistence, thread_safe=True, lock_stripes=16)
+        bank.audit_service = AuditService(os.path.join(str(tmp_path), "audit.log"))
+        return bank, [bank.create_account(user, "CURRENT", 100.0).account_id for _ in range(accounts)]
+
+    def _run(self, worker):
+        errors = []
+
+        def guarded(n):
+            try:
+                worker(n)
+            except Exception as e:  # surfaced below; a thread exception would otherwise be lost
+                errors.append(e)
+
+        threads = [threading.Thread(target=guarded, args=(n,)) for n in range(THREADS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=60)
+        assert not errors
+
+    def test_concurrent_transfers_conserve_money(self, persistence, tmp_path):
+        bank, account_ids = self._setup(persistence, tmp_path)
+
+        def worker(n):
+            rng = random.Random(n)
+            for _ in range(OPERATIONS):
+                source, target = rng.sample(account_ids, 2)
+                try:
+                    bank.transfer(source, target, rng.choice([5.0, 30.0, 60.0]))
+                except ValidationError:
+                    pass  # overdraft limit reached
+
+        self._run(worker)
+        balances = [persistence.get_account(a)["balance"] for a in account_ids]
+        assert sum(balances) == pytest.approx(400.0)
+        for account_id, balance in zip(account_ids, balances):
+            # Every committed balance matches its own ledger history
+            ledger_balance = sum(signed_amount(t) for t in persistence.get_transactions_for_account(account_id))
+            assert ledger_balance == pytest.approx(balance)
+
+    def test_no_lost_deposits_on_shared_account(self, persistence, tmp_path):
+        bank, account_ids = self._setup(persistence, tmp_path, accounts=1)
+        self._run(lambda n: [bank.deposit(account_ids[0], 1.0) for _ in range(OPERATIONS)])
+        assert persistence.get_account(account_ids[0])["balance"] == 100.0 + THREADS * OPERATIONS
+
+    def test_withdrawals_never_overdraw(self, persistence, tmp_path):
+        bank, account_ids = self._setup(persistence, tmp_path, accounts=1)
+
+        def worker(n):
+            for _ in range(OPERATIONS):
+                try:
+                    bank.withdraw(account_ids[0], 50.0)
+                except ValidationError:
+                    pass
+
+        self._run(worker)
+        # A current account may go 1000 below zero and no further
+        assert persistence.get_account(account_ids[0])["balance"] == -1000.0
+
+
+class TestStripedLocks:
+
+    def test_opposite_order_does_not_deadlock(self):
+        locks = StripedLocks(8)
+        done = []
+
+        def worker(a, b):
+            for _ in range(1000):
+                with locks.hold(a, b):
+                    pass
+            done.append(True)
+
+        threads = [threading.Thread(target=worker, args=("x", "y")), threading.Thread(target=worker, args=("y", "x"))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=10)
+        assert len(done) == 2
+
+    def test_same_key_shares_a_stripe(self):
+        locks = StripedLocks(4)
+        assert locks.stripe("acc1") == locks.stripe("acc1")
+        with pytest.raises(ValueError):
+            StripedLocks(0)
@@ -0,0 +1,85 @@
+import pytest
+import sys
+import uuid
+from datetime import datetime
+from src.models.account import FixedDepositAccount, SavingsAccount
+from src.models.transaction import Transaction, TransactionType, signed_amount
+from src.models.transaction_batch import TransactionBatch
+from src.services.audit_service import AuditService
+from src.services.auth_service import AuthService
+from src.services.bank_service import BankService
+from src.utils.persistence import PersistenceLayer
+
+class TestSlottedModels:
+
+    def test_models_have_no_instance_dict(self):
+        tx = Transaction("t1", "a1", 10.0, TransactionType.DEPOSIT)
+        account = SavingsAccount(account_id="a1", user_id="u1")
+        assert not hasattr(tx, "__dict__")
+        assert not hasattr(account, "__dict__")
+        with pytest.raises(AttributeError):
+            tx.unknown_field = 1
+
+    def test_fixed_deposit_round_trip(self):
+        account = FixedDepositAccount(account_id="a1", user_id="u1", balance=1000.0, term_months=6)
+        data = account.to_dict()
+        assert data["term_months"] == 6
+        assert FixedDepositAccount.from_dict_specific(data).maturity_date == account.maturity_date
+
+
+class TestTransactionBatch:
+
+    def _records(self):
+        a, b = str(uuid.uuid4()), str(uuid.uuid4())
+        return [
+            Transaction(str(uuid.uuid4()), a, 100.0, TransactionType.DEPOSIT, datetime(2024, 1, 1, 9, 30, 0, 5),
+                        "Deposit").to_dict(),
+            Transaction(str(uuid.uuid4()), a, 40.0, TransactionType.TRANSFER, datetime(2024, 1, 2),
+                        f"Transfer to {b}", b).to_dict(),
+            Transaction(str(uuid.uuid4()), b, 40.0, TransactionType.TRANSFER, datetime(2024, 1, 2),
+                        f"Transfer from {a}", a).to_dict(),
+            Transaction("legacy-id", a, 5.0, TransactionType.FEE, datetime(2024, 1, 3), "Fee").to_dict(),
+        ]
+
+    def test_round_trip(self):
+        records = self._records()
+        batch = TransactionBatch(records)
+        assert len(batch) == 4
+        assert batch.to_dicts() == records
+        assert batch[-1].transaction_id == "legacy-id"
+        assert batch[1].related_account_id == records[1]["related_account_id"]
+        assert batch[0].related_account_id is None
+        with pytest.raises(IndexError):
+            batch[4]
+
+    def test_rows_convert_to_transactions(self):
+        records = self._records()
+        transactions = [row.to_transaction() for row in TransactionBatch(records)]
+        assert transactions == [Transaction.from_dict(r) for r in records]
+
+    def test_signed_amounts(self):
+        records = self._records()
+        batch = TransactionBatch(records)
+        assert list(batch.signed_amounts()) == [signed_amount(r) for r in records]
+        assert batch.net_change() == pytest.approx(95.0)
+
+    def test_batch_is_smaller_than_objects(self):
+        batch = TransactionBatch(self._records() * 250)
+        columns = (batch.amounts, batch.timestamps, batch.type_codes, batch._account_refs,
+                   batch._related_refs, batch._description_refs, batch._ids)
+        size = sum(sys.getsizeof(c) for c in columns)
+        objects = [row.to_transaction() for row in batch]
+        assert size < sum(sys.getsizeof(t) for t in objects)
+
+    def test_bank_service_batch(self, tmp_path):
+        persistence = PersistenceLayer(str(tmp_path))
+        bank = BankService(persistence)
+        bank.audit_service = AuditService(str(tmp_path / "audit.log"))
+        user = AuthService(persistence).register("batch", "Password123", "b@test.com", "1234567890")
+        account = bank.create_account(user, "SAVINGS", 1000.0)
+        bank.deposit(account.account_id, 250.0)
+        bank.withdraw(account.account_id, 100.0)
+
+        batch = bank.get_account_transaction_batch(account.account_id)
+        assert [row.to_transaction() for row in batch] == bank.get_account_transactions(account.account_id)
+        assert batch.net_change() == pytest.approx(1150.0)
@@ -0,0 +1,154 @@
+import pytest
+import json
+import os
+import threading
+from src.services.auth_service import AuthService
+from src.services.bank_service import BankService
+from src.utils.cached_persistence import CachedPersistenceLayer
+from src.utils.persistence import PersistenceLayer
+from src.utils.sqlite_persistence import SqlitePersistenceLayer
+from src.utils.validators import ValidationError
+
+both_ledgers = pytest.mark.parametrize("persistence", ["json", "jsonl"], indirect=True)
+
+class TestUnitOfWork:
+
+    @both_ledgers
+    def test_changes_invisible_on_disk_until_exit(self, persistence):
+        with persistence.unit_of_work():
+            persistence.save_account({"account_id": "a1", "user_id": "u1", "balance": 5.0})
+            persistence.log_transaction({"transaction_id": "t1", "account_id": "a1"})
+            # Reads inside the block see buffered collection writes
+            assert persistence.get_account("a1")["balance"] == 5.0
+            assert PersistenceLayer(data_dir=persistence.data_dir).get_account("a1") is None
+
+        assert persistence.get_account("a1")["balance"] == 5.0
+        assert [t["transaction_id"] for t in persistence.get_transactions_for_account("a1")] == ["t1"]
+        assert not os.path.exists(persistence.journal_file)
+
+    @both_ledgers
+    def test_exception_discards_batch(self, persistence):
+        with pytest.raises(RuntimeError):
+            with persistence.unit_of_work():
+                persistence.save_user({"user_id": "u1", "username": "x", "accounts": []})
+                persistence.log_transaction({"transaction_id": "t1", "account_id": "a1"})
+                raise RuntimeError("boom")
+
+        assert persistence.get_user("u1") is None
+        assert persistence.get_all_transactions() == []
+
+    @both_ledgers
+    def test_nested_blocks_join_outer(self, persistence):
+        with persistence.unit_of_work():
+            with persistence.unit_of_work():
+                persistence.save_user({"user_id": "u1", "username": "x", "accounts": []})
+            assert PersistenceLayer(data_dir=persistence.data_dir).get_user("u1") is None
+        assert persistence.get_user("u1") is not None
+
+    @both_ledgers
+    def test_transfer_is_one_commit(self, persistence, monkeypatch):
+        auth = AuthService(persistence)
+        bank = BankService(persistence)
+        user = auth.register("uow", "Password123", "u@test.com", "1234567890")
+        acc1 = bank.create_account(user, "SAVINGS", 1000.0)
+        acc2 = bank.create_account(user, "CURRENT", 0.0)
+
+        commits = []
+        original = PersistenceLayer._commit_files
+        monkeypatch.setattr(PersistenceLayer, "_commit_files",
+                            lambda self, files, records: commits.append((sorted(files), len(records))) or original(self, files, records))
+        bank.transfer(acc1.account_id, acc2.account_id, 200.0)
+
+        assert len(commits) == 1
+        assert bank._get_account(acc1.account_id).balance == 800.0
+        assert bank._get_account(acc2.account_id).balance == 200.0
+        assert len(persistence.get_transactions_for_account(acc1.account_id)) == 2
+
+    @both_ledgers
+    def test_failed_transfer_writes_nothing(self, persistence):
+        auth = AuthService(persistence)
+        bank = BankService(persistence)
+        user = auth.register("uowfail", "Password123", "u@test.com", "1234567890")
+        acc1 = bank.create_account(user, "SAVINGS", 1000.0)
+        acc2 = bank.create_account(user, "CURRENT", 0.0)
+        before = len(persistence.get_all_transactions())
+
+        with pytest.raises(ValidationError):
+            bank.transfer(acc1.account_id, acc2.account_id, 900.0)
+
+        assert len(persistence.get_all_transactions()) == before
+        assert bank._get_account(acc1.account_id).balance == 1000.0
+
+    @both_ledgers
+    def test_journal_rolled_forward_on_startup(self, persistence):
+        persistence.log_transaction({"transaction_id": "t0", "account_id": "a1"})
+        # Simulate a crash after the journal was written but before it was applied
+        tmp_path = persistence.accounts_file + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"a1": {"account_id": "a1", "user_id": "u1", "balance": 7.0}}, f)
+        journal = {"renames": [[tmp_path, persistence.accounts_file]], "ledger_position": None, "ledger_records": []}
+        if persistence.ledger.append_only:
+            journal["ledger_position"] = persistence.ledger.position()
+            journal["ledger_records"] = [{"transaction_id": "t1", "account_id": "a1"}]
+            persistence.ledger.append({"transaction_id": "t1", "account_id": "a1"})  # half-applied append
+        with open(persistence.journal_file, "w") as f:
+            json.dump(journal, f)
+
+        recovered = PersistenceLayer(data_dir=persistence.data_dir, ledger_format="jsonl" if persistence.ledger.append_only else "json")
+        assert recovered.get_account("a1")["balance"] == 7.0
+        assert not os.path.exists(recovered.journal_file)
+        expected = ["t0", "t1"] if persistence.ledger.append_only else ["t0"]
+        assert [t["transaction_id"] for t in recovered.get_all_transactions()] == expected
+
+    def test_cached_layer_rolls_back_in_memory_changes(self, tmp_path):
+        p = CachedPersistenceLayer(data_dir=str(tmp_path), flush_interval=None)
+        p.save_account({"account_id": "a1", "user_id": "u1", "balance": 1.0})
+        with pytest.raises(RuntimeError):
+            with p.unit_of_work():
+                p.save_account({"account_id": "a1", "user_id": "u1", "balance": 99.0})
+                raise RuntimeError("boom")
+        assert p.get_account("a1")["balance"] == 1.0
+
+        with p.unit_of_work():
+            p.save_account({"account_id": "a1", "user_id": "u1", "balance": 2.0})
+        assert not p.is_dirty()
+        assert PersistenceLayer(data_dir=str(tmp_path)).get_account("a1")["balance"] == 2.0
+
+    def test_cached_layer_writes_through_when_the_last_unit_exits(self, tmp_path):
+        p = CachedPersistenceLayer(data_dir=str(tmp_path), flush_interval=None)
+        p.save_account({"account_id": "a1", "user_id": "u1", "balance": 1.0})
+        p.commit()
+        opened, release = threading.Event(), threading.Event()
+        def other_thread():
+            with p.unit_of_work():
+                p.save_account({"account_id": "a2", "user_id": "u1", "balance": 7.0})
+                opened.set()
+                release.wait(5)
+        worker = threading.Thread(target=other_thread)
+        worker.start()
+        opened.wait(5)
+
+        with p.unit_of_work():
+            p.save_account({"account_id": "a1", "user_id": "u1", "balance": 2.0})
+        # The other thread's unit of work is still open, so nothing is written yet.
+        assert PersistenceLayer(data_dir=str(tmp_path)).get_account("a1")["balance"] == 1.0
+
+        release.set()
+        worker.join(5)
+        on_disk = PersistenceLayer(data_dir=str(tmp_path))
+        assert on_disk.get_account("a1")["balance"] == 2.0
+        assert on_disk.get_account("a2")["balance"] == 7.0
+        assert not p.is_dirty()
+
+    def test_sqlite_unit_of_work(self, tmp_path):
+        p = SqlitePersistenceLayer(os.path.join(str(tmp_path), "bank.db"))
+        with pytest.raises(RuntimeError):
+            with p.unit_of_work():
+                p.save_user({"user_id": "u1", "username": "x"})
+                raise RuntimeError("boom")
+        assert p.get_user("u1") is None
+
+        with p.unit_of_work():
+            p.save_user({"user_id": "u1", "username": "x"})
+        assert p.get_user("u1") == {"user_id": "u1", "username": "x"}
+        p.close()
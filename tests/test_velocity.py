@@ -0,0 +1,84 @@
+import pytest
+from datetime import datetime, timedelta
+from src.services.audit_service import AuditService
+from src.services.auth_service import AuthService
+from src.services.bank_service import BankService
+from src.services.fraud_service import FraudDetectionService
+from src.services.velocity_tracker import VelocityTracker
+from src.utils.persistence import PersistenceLayer
+
+START = datetime(2024, 5, 1, 12, 0, 0)
+
+class TestVelocityTracker:
+
+    def test_count_limit_within_window(self):
+        tracker = VelocityTracker(max_count=3, max_amount=1e9, window=timedelta(minutes=10))
+        reasons = [tracker.observe("a", START + timedelta(minutes=i), 1.0) for i in range(4)]
+        assert reasons[:3] == [[], [], []]
+        assert reasons[3] == ["High velocity: 4 transactions within 10 minutes"]
+        # Other accounts have their own window.
+        assert tracker.observe("b", START + timedelta(minutes=3), 1.0) == []
+
+    def test_window_slides(self):
+        tracker = VelocityTracker(max_count=2, max_amount=1e9, window=timedelta(minutes=10))
+        for minute in (0, 5, 10, 15, 20):
+            assert tracker.observe("a", START + timedelta(minutes=minute), 1.0) == []
+        assert len(tracker._windows["a"]) == 2
+
+    def test_amount_limit(self):
+        tracker = VelocityTracker(max_count=100, max_amount=1000.0, window=timedelta(hours=1))
+        assert tracker.observe("a", START, 600.0) == []
+        assert tracker.observe("a", START + timedelta(minutes=30), 500.0) == [
+            "High velocity: 1100.00 moved within 60 minutes"]
+        # The first 600 has left the window by now.
+        assert tracker.observe("a", START + timedelta(minutes=61), 100.0) == []
+        assert tracker._totals["a"] == pytest.approx(600.0)
+
+    def test_warm_skips_old_and_untracked_records(self):
+        # Both legs of a transfer are tracked; fees and interest are not.
+        tracker = VelocityTracker(max_count=2, max_amount=1e9, window=timedelta(hours=1))
+        records = [
+            {"transaction_id": "old", "account_id": "a", "amount": 1.0, "transaction_type": "DEPOSIT",
+             "timestamp": (START - timedelta(hours=2)).isoformat(), "description": "Deposit"},
+            {"transaction_id": "fee", "account_id": "a", "amount": 1.0, "transaction_type": "FEE",
+             "timestamp": START.isoformat(), "description": "Maintenance Fee"},
+            {"transaction_id": "out", "account_id": "a", "amount": 1.0, "transaction_type": "TRANSFER",
+             "timestamp": START.isoformat(), "description": "Transfer to b"},
+            {"transaction_id": "in", "account_id": "a", "amount": 1.0, "transaction_type": "TRANSFER",
+             "timestamp": START.isoformat(), "description": "Transfer from b"},
+            {"transaction_id": "self", "account_id": "a", "amount": 1.0, "transaction_type": "DEPOSIT",
+             "timestamp": START.isoformat(), "description": "Deposit"},
+        ]
+        tracker.warm(records, now=START + timedelta(minutes=1), exclude=["self"])
+        assert list(tracker._windows["a"]) == [(START, 1.0), (START, 1.0)]
+
+
+class TestVelocityRule:
+
+    @pytest.fixture
+    def persistence(self, tmp_path):
+        layer = PersistenceLayer(data_dir=str(tmp_path), ledger_format="jsonl")
+        yield layer
+        layer.close()
+
+    def _bank(self, persistence, tmp_path):
+        bank = BankService(persistence)
+        bank.audit_service = AuditService(str(tmp_path / "audit.log"))
+        bank.fraud_service = FraudDetectionService(persistence, VelocityTracker(max_count=3, max_amount=1e9))
+        return bank
+
+    def test_flags_rapid_deposits_and_warms_from_ledger(self, persistence, tmp_path):
+        bank = self._bank(persistence, tmp_path)
+        user = AuthService(persistence).register("velocity", "Password123", "v@test.com", "1234567890")
+        account_id = bank.create_account(user, "SAVINGS", 0.0).account_id
+        for _ in range(4):
+            bank.deposit(account_id, 10.0)
+
+        flags = persistence.get_fraud_flags()
+        assert len(flags) == 1
+        assert flags[0]["reasons"] == ["High velocity: 4 transactions within 60 minutes"]
+
+        # A fresh service (e.g. after a restart) remembers the recent deposits.
+        restarted = self._bank(persistence, tmp_path)
+        restarted.deposit(account_id, 10.0)
+        assert len(persistence.get_fraud_flags()) == 2
@@ -0,0 +1,117 @@
+import pytest
+import os
+import threading
+from src.services.auth_service import AuthService
+from src.services.bank_service import BankService
+from src.utils.cached_persistence import CachedPersistenceLayer
+from src.utils.persistence import PersistenceLayer
+from src.utils.shutdown import discard_at_exit
+from src.utils.wal import WriteAheadLog
+
+def crash(layer):
+    """Drops a layer without flushing, as if the process had died."""
+    discard_at_exit(layer)
+    layer.wal.close()
+
+class TestWriteAheadLog:
+
+    def test_replay_returns_records_in_order(self, tmp_path):
+        wal = WriteAheadLog(str(tmp_path), durability="always")
+        for i in range(3):
+            wal.append({"n": i})
+        assert [r["n"] for r in wal.replay()] == [0, 1, 2]
+        assert wal.fsync_count == 3
+
+    def test_replay_stops_at_torn_record(self, tmp_path):
+        wal = WriteAheadLog(str(tmp_path), durability="none")
+        wal.append({"n": 1})
+        wal.close()
+        with open(os.path.join(str(tmp_path), "wal-00000001.log"), "ab") as f:
+            f.write(b'0badc0de {"n": 2')
+        assert [r["n"] for r in WriteAheadLog(str(tmp_path)).replay()] == [1]
+
+    def test_rotate_and_discard(self, tmp_path):
+        wal = WriteAheadLog(str(tmp_path), durability="none")
+        wal.append({"n": 1})
+        closed = wal.rotate()
+        wal.append({"n": 2})
+        assert [r["n"] for r in wal.replay(after_generation=closed)] == [2]
+        wal.discard_through(closed)
+        assert wal.generations() == [closed + 1]
+
+    def test_batch_mode_shares_fsyncs(self, tmp_path):
+        wal = WriteAheadLog(str(tmp_path), durability="batch", group_window=0.02)
+        barrier = threading.Barrier(8)
+
+        def writer(n):
+            barrier.wait()
+            wal.append({"n": n})
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sorted(r["n"] for r in wal.replay()) == list(range(8))
+        assert wal.fsync_count < 8
+
+    def test_unknown_mode_rejected(self, tmp_path):
+        with pytest.raises(ValueError):
+            WriteAheadLog(str(tmp_path), durability="sometimes")
+
+
+class TestCachedPersistenceWithWal:
+
+    @pytest.mark.parametrize("ledger_format", ["json", "jsonl"])
+    def test_unflushed_operations_survive_crash(self, tmp_path, ledger_format):
+        p = CachedPersistenceLayer(data_dir=str(tmp_path), flush_interval=None, ledger_format=ledger_format, durability="batch")
+        auth = AuthService(p)
+        bank = BankService(p)
+        user = auth.register("waluser", "Password123", "w@test.com", "1234567890")
+        acc1 = bank.create_account(user, "SAVINGS", 1000.0)
+        acc2 = bank.create_account(user, "CURRENT", 0.0)
+        bank.transfer(acc1.account_id, acc2.account_id, 100.0)
+        crash(p)
+
+        # Nothing reached the snapshot files...
+        assert PersistenceLayer(data_dir=str(tmp_path), ledger_format=ledger_format).get_account(acc1.account_id) is None
+
+        # ...but reopening replays the log and checkpoints it.
+        recovered = CachedPersistenceLayer(data_dir=str(tmp_path), flush_interval=None, ledger_format=ledger_format, durability="batch")
+        assert recovered.get_account(acc1.account_id)["balance"] == 900.0
+        assert recovered.get_account(acc2.account_id)["balance"] == 100.0
+        assert len(recovered.get_transactions_for_account(acc1.account_id)) == 2
+        plain = PersistenceLayer(data_dir=str(tmp_path), ledger_format=ledger_format)
+        assert plain.get_account(acc2.account_id)["balance"] == 100.0
+        assert len(plain.get_all_transactions()) == 3
+
+        # A second restart must not apply the log again.
+        recovered.close()
+        again = CachedPersistenceLayer(data_dir=str(tmp_path), flush_interval=None, ledger_format=ledger_format, durability="batch")
+        assert len(again.get_all_transactions()) == 3
+        again.close()
+
+    def test_checkpoint_discards_log(self, tmp_path):
+        p = CachedPersistenceLayer(data_dir=str(tmp_path), flush_interval=None, durability="none")
+        p.save_user({"user_id": "u1", "username": "a", "accounts": []})
+        p.commit()
+        assert [r for r in p.wal.replay(after_generation=p.wal.generation - 1)] == []
+        assert p.wal.generations() == [p.wal.generation]
+        p.close()
+
+    def test_aborted_unit_of_work_not_logged(self, tmp_path):
+        p = CachedPersistenceLayer(data_dir=str(tmp_path), flush_interval=None, durability="none")
+        with pytest.raises(RuntimeError):
+            with p.unit_of_work():
+                p.save_user({"user_id": "u1", "username": "a", "accounts": []})
+                raise RuntimeError("boom")
+        with p.unit_of_work():
+            p.save_user({"user_id": "u2", "username": "b", "accounts": []})
+            p.save_account({"account_id": "a2", "user_id": "u2", "balance": 0.0})
+
+        records = list(p.wal.replay())
+        assert len(records) == 1
+        assert [name for name, _ in records[0]["ops"]] == ["save_user", "save_account"]
+        assert p.get_user("u1") is None
+        p.close()